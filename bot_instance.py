@@ -1,6 +1,25 @@
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
 from config import bot_token
+from middleware.retry import RetryRequestMiddleware
 
-bot = Bot(bot_token, default=DefaultBotProperties(parse_mode="HTML"))
+try:  # pragma: no cover - orjson is listed in requirements
+    import orjson
+except ImportError:
+    orjson = None
+
+# Сериализация запросов/ответов Bot API идёт в потоке event loop'а; orjson
+# кодирует и разбирает JSON в C заметно быстрее стандартного json — тот же
+# приём, что и для JSONB в db/database.py.
+if orjson is not None:
+    session = AiohttpSession(
+        json_loads=orjson.loads,
+        json_dumps=lambda obj: orjson.dumps(obj).decode(),
+    )
+else:
+    session = AiohttpSession()
+
+bot = Bot(bot_token, session=session, default=DefaultBotProperties(parse_mode="HTML"))
+bot.session.middleware(RetryRequestMiddleware())
 dp = Dispatcher()
\ No newline at end of file
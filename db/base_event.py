@@ -2,23 +2,51 @@ from __future__ import annotations
 
 import json
 from dataclasses import dataclass, field
-from datetime import datetime, timezone
+
+from psycopg.rows import tuple_row
+from psycopg.types.json import Jsonb
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is listed in requirements
+    orjson = None
+from datetime import date, datetime, timedelta, timezone
 from typing import TYPE_CHECKING, Any, Iterable, Mapping, Optional
 
 if TYPE_CHECKING:
     from db.database import Database
 
 
-def _utcnow_iso() -> str:
-    return datetime.now(timezone.utc).isoformat()
+def _utcnow_iso(_now=datetime.now, _utc=timezone.utc) -> str:
+    # Default-arg bindings freeze the global lookups; this runs on every
+    # repository write in both db modules (database.py imports it from here).
+    return _now(_utc).isoformat()
 
 
 STATUS_PENDING = "pending"
 STATUS_APPROVED = "approved"
 STATUS_REJECTED = "rejected"
 
+# Sentinel for the lazily parsed datetime caches (None is a valid parse result).
+_UNPARSED: Any = object()
+
+
+def _coerce_attendees(raw: Iterable[Any]) -> list[int]:
+    # Attendees are ints everywhere after _prepare_payload; only cast when a
+    # legacy document actually contains something else.
+    values = list(raw)
+    if all(isinstance(value, int) for value in values):
+        return values
+    attendees: list[int] = []
+    for value in values:
+        try:
+            attendees.append(int(value))
+        except (TypeError, ValueError):
+            continue
+    return attendees
+
 
-@dataclass
+@dataclass(slots=True)
 class EventRecord:
     id: Optional[int] = None
     title: str = ""
@@ -43,6 +71,11 @@ class EventRecord:
     moderator_note: Optional[str] = None
     moderation_messages: list[dict[str, int]] = field(default_factory=list)
     scheduled_at: str = ""
+    _sched_dt: Any = field(default=_UNPARSED, init=False, repr=False, compare=False)
+    _end_dt: Any = field(default=_UNPARSED, init=False, repr=False, compare=False)
+    _attendee_ids: Optional[frozenset[int]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     @classmethod
     def from_dict(cls, data: Mapping[str, Any]) -> "EventRecord":
@@ -74,14 +107,8 @@ class EventRecord:
         contact = data.get("contact", "")
         if not contact and contact_name and contact_url:
             contact = f"{contact_name} ({contact_url})"
-        attendees_raw = data.get("attendees") or []
-        attendees: list[int] = []
-        for value in attendees_raw:
-            try:
-                attendees.append(int(value))
-            except (TypeError, ValueError):
-                continue
-        return cls(
+        attendees = _coerce_attendees(data.get("attendees") or [])
+        record = cls(
             id=data.get("id"),
             title=data.get("title", ""),
             starts_at=starts_at,
@@ -106,6 +133,11 @@ class EventRecord:
             moderation_messages=moderation_messages,
             scheduled_at=scheduled_at,
         )
+        # Parse the datetimes eagerly: listings sort and render on them right
+        # after load, and this keeps the try/except out of the sort loop.
+        record.scheduled_datetime()
+        record.end_datetime()
+        return record
 
     def to_dict(self) -> dict[str, Any]:
         return {
@@ -119,7 +151,7 @@ class EventRecord:
             "contact_name": self.contact_name,
             "contact_url": self.contact_url,
             "registration_link": self.registration_link,
-            "attendees": [int(value) for value in self.attendees],
+            "attendees": list(self.attendees),
             "tags": list(self.tags),
             "status": self.status,
             "created_by": self.created_by,
@@ -135,26 +167,43 @@ class EventRecord:
         }
 
     def scheduled_datetime(self) -> Optional[datetime]:
-        date_str = self.starts_at or self.scheduled_at
-        if not date_str:
-            return None
-        try:
-            return datetime.fromisoformat(date_str)
-        except ValueError:
-            return None
+        if self._sched_dt is _UNPARSED:
+            self._sched_dt = None
+            date_str = self.starts_at or self.scheduled_at
+            if date_str:
+                try:
+                    self._sched_dt = datetime.fromisoformat(date_str)
+                except ValueError:
+                    pass
+        return self._sched_dt
+
+    def attendee_set(self) -> frozenset[int]:
+        # O(1) membership for hot signup/signoff checks; records are not
+        # mutated in place (updates go through the repository), so the set
+        # cannot go stale.
+        if self._attendee_ids is None:
+            self._attendee_ids = frozenset(self.attendees)
+        return self._attendee_ids
 
     def end_datetime(self) -> Optional[datetime]:
-        if not self.ends_at:
-            return None
-        try:
-            return datetime.fromisoformat(self.ends_at)
-        except ValueError:
-            return None
+        if self._end_dt is _UNPARSED:
+            self._end_dt = None
+            if self.ends_at:
+                try:
+                    self._end_dt = datetime.fromisoformat(self.ends_at)
+                except ValueError:
+                    pass
+        return self._end_dt
 
 
 class EventsRepository:
     def __init__(self, database: "Database"):
         self._db = database
+        # Monotonic in-process counter bumped on every mutation; read-side
+        # caches compare it to notice that their snapshot went stale without
+        # touching the database. The bot runs as a single process, so this
+        # does not need to survive restarts or cross processes.
+        self.version = 0
 
     def ensure_table(self) -> None:
         with self._db.connection() as conn:
@@ -162,23 +211,39 @@ class EventsRepository:
                 """
                 CREATE TABLE IF NOT EXISTS events (
                     id BIGSERIAL PRIMARY KEY,
-                    data TEXT NOT NULL,
+                    data JSONB NOT NULL,
                     created_at TEXT NOT NULL,
                     updated_at TEXT NOT NULL
                 )
                 """
             )
+            self._db.migrate_data_column_to_jsonb(conn, "events")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS events_status_idx ON events ((data ->> 'status'))"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS events_starts_at_idx ON events ((data ->> 'starts_at'))"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS events_tags_idx ON events USING GIN ((data -> 'tags'))"
+            )
 
     @staticmethod
-    def _serialize(doc: Mapping[str, Any]) -> str:
-        return json.dumps(doc, ensure_ascii=False)
+    def _serialize(doc: Mapping[str, Any]) -> Jsonb:
+        return Jsonb(doc)
 
     @staticmethod
-    def _deserialize(payload: str) -> dict[str, Any]:
+    def _deserialize(payload: Any) -> dict[str, Any]:
+        if isinstance(payload, dict):
+            return payload
+        if orjson is not None:
+            return orjson.loads(payload)
         return json.loads(payload)
 
     def _prepare_payload(self, data: Mapping[str, Any], *, is_new: bool) -> dict[str, Any]:
-        payload = dict(data)
+        # Callers hand over a fresh dict (to_dict() output or an already
+        # copied payload); only non-dict mappings still need materializing.
+        payload = data if isinstance(data, dict) else dict(data)
         now = _utcnow_iso()
         if is_new:
             payload.setdefault("created_at", now)
@@ -201,14 +266,7 @@ class EventsRepository:
             value = payload.get(key)
             if value is None:
                 payload[key] = ""
-        attendees_raw = payload.get("attendees") or []
-        attendees: list[int] = []
-        for value in attendees_raw:
-            try:
-                attendees.append(int(value))
-            except (TypeError, ValueError):
-                continue
-        payload["attendees"] = attendees
+        payload["attendees"] = _coerce_attendees(payload.get("attendees") or [])
         if not payload.get("scheduled_at"):
             payload["scheduled_at"] = payload.get("starts_at", "")
         return payload
@@ -226,29 +284,32 @@ class EventsRepository:
             event_id = int(row["id"]) if row and "id" in row else None
             if event_id is None:
                 raise RuntimeError("Failed to obtain event id from PostgreSQL.")
-            prepared["id"] = event_id
-            updated_payload = self._serialize(prepared)
-            conn.execute(
-                "UPDATE events SET data = %s, updated_at = %s WHERE id = %s",
-                (updated_payload, prepared["updated_at"], event_id),
-            )
+        # Readers inject the id from the primary-key column; no need to
+        # rewrite the payload just to embed it.
+        prepared["id"] = event_id
+        self.version += 1
         return EventRecord.from_dict(prepared)
 
     def update(self, event_id: int, updates: Mapping[str, Any]) -> Optional[EventRecord]:
-        existing = self.get(event_id)
-        if not existing:
-            return None
-        current_payload = existing.to_dict()
-        current_payload.update(updates)
-        if "id" not in current_payload:
-            current_payload["id"] = event_id
-        prepared = self._prepare_payload(current_payload, is_new=False)
-        serialized = self._serialize(prepared)
+        # Read-modify-write on one connection checkout: both statements run
+        # in the same pool transaction instead of two separate ones.
         with self._db.connection() as conn:
+            cursor = conn.execute(
+                "SELECT data FROM events WHERE id = %s",
+                (event_id,),
+            )
+            row = cursor.fetchone()
+            if not row:
+                return None
+            current_payload = self._deserialize(row["data"])
+            current_payload.setdefault("id", event_id)
+            current_payload.update(updates)
+            prepared = self._prepare_payload(current_payload, is_new=False)
             conn.execute(
                 "UPDATE events SET data = %s, updated_at = %s WHERE id = %s",
-                (serialized, prepared["updated_at"], event_id),
+                (self._serialize(prepared), prepared["updated_at"], event_id),
             )
+        self.version += 1
         return EventRecord.from_dict(prepared)
 
     def delete(self, event_id: int) -> bool:
@@ -257,7 +318,10 @@ class EventsRepository:
                 "DELETE FROM events WHERE id = %s",
                 (event_id,),
             )
-            return cursor.rowcount > 0
+            deleted = cursor.rowcount > 0
+        if deleted:
+            self.version += 1
+        return deleted
 
     def get(self, event_id: int) -> Optional[EventRecord]:
         with self._db.connection() as conn:
@@ -268,21 +332,81 @@ class EventsRepository:
             row = cursor.fetchone()
         if not row:
             return None
-        payload = self._deserialize(row["data"] if isinstance(row, Mapping) else row[0])
+        payload = self._deserialize(row["data"])
         payload.setdefault("id", event_id)
         return EventRecord.from_dict(payload)
 
-    def list_all(self) -> list[EventRecord]:
+    def _fetch_events(self, query: str, params: tuple[Any, ...] = ()) -> list[EventRecord]:
         with self._db.connection() as conn:
-            cursor = conn.execute("SELECT id, data FROM events ORDER BY id DESC")
+            # Positional access via tuple_row skips the per-row dict the
+            # default factory would build for this two-column query.
+            cursor = conn.cursor(row_factory=tuple_row)
+            cursor.execute(query, params)
             rows = cursor.fetchall()
         events: list[EventRecord] = []
-        for row in rows:
-            payload = self._deserialize(row["data"] if isinstance(row, Mapping) else row[1])
-            payload.setdefault("id", row["id"] if isinstance(row, Mapping) else row[0])
+        for event_id, data in rows:
+            payload = self._deserialize(data)
+            payload.setdefault("id", event_id)
             events.append(EventRecord.from_dict(payload))
         return events
 
+    def list_all(self) -> list[EventRecord]:
+        return self._fetch_events(
+            "SELECT id, data FROM events ORDER BY (data ->> 'starts_at') NULLS LAST"
+        )
+
+    def list_approved_on(self, day: date) -> list[EventRecord]:
+        """Approved events starting on the given day (by starts_at string).
+
+        starts_at is stored as a local ISO-8601 string, so a lexicographic
+        range on [day, day+1) matches the date prefix and rides the
+        events_starts_at_idx expression index — no full scan, no per-row
+        parsing of events that start on other days.
+        """
+        lower = day.isoformat()
+        upper = (day + timedelta(days=1)).isoformat()
+        return self._fetch_events(
+            "SELECT id, data FROM events"
+            " WHERE (data ->> 'status') = %s"
+            " AND (data ->> 'starts_at') >= %s AND (data ->> 'starts_at') < %s"
+            " ORDER BY (data ->> 'starts_at')",
+            (STATUS_APPROVED, lower, upper),
+        )
+
+    def list_visible(
+        self,
+        user_id: Optional[int],
+        track: Optional[str],
+        *,
+        is_admin: bool = False,
+    ) -> list[EventRecord]:
+        """List events a user may see, filtering in SQL instead of Python.
+
+        Mirrors event_visible_for_user: admins see everything, creators see
+        their own events regardless of status, everyone else sees approved
+        events whose tags are empty, legacy 'all', or include their track.
+        """
+        if is_admin:
+            return self.list_all()
+        tag_clause = (
+            "jsonb_array_length(COALESCE(data -> 'tags', '[]'::jsonb)) = 0"
+            " OR data -> 'tags' ? 'all'"
+        )
+        params: list[Any] = [STATUS_APPROVED]
+        if track:
+            tag_clause += " OR data -> 'tags' ? %s"
+            params.append(track)
+        where = f"(data ->> 'status') = %s AND ({tag_clause})"
+        if user_id is not None:
+            where = f"(data ->> 'created_by')::bigint = %s OR ({where})"
+            params.insert(0, user_id)
+        return self._fetch_events(
+            "SELECT id, data FROM events WHERE "
+            + where
+            + " ORDER BY (data ->> 'starts_at') NULLS LAST",
+            tuple(params),
+        )
+
 
 class FormattingOptions:  # Legacy compatibility stub
     def __init__(self, *args: Any, **kwargs: Any):
@@ -3,14 +3,28 @@ from __future__ import annotations
 import json
 import os
 from contextlib import contextmanager
-from datetime import datetime, timezone
+from functools import partial
 from threading import Lock
-from typing import Any, Dict, List, Mapping, Optional
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional
 
 import psycopg
 from psycopg import sql
 from psycopg.conninfo import make_conninfo
 from psycopg.rows import dict_row
+from psycopg.types.json import Jsonb, set_json_dumps, set_json_loads
+from psycopg_pool import ConnectionPool
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is listed in requirements
+    orjson = None
+
+if orjson is not None:
+    # JSONB columns are parsed/serialized by psycopg; route that through orjson
+    # with the option mask bound once instead of resolved per call.
+    _json_dumps = partial(orjson.dumps, option=orjson.OPT_NON_STR_KEYS)
+    set_json_loads(orjson.loads)
+    set_json_dumps(_json_dumps)
 
 try:
     from config import POSTGRES_CONFIG, POSTGRES_SCHEMA
@@ -18,11 +32,7 @@ except ImportError:  # pragma: no cover - config is always present in production
     POSTGRES_CONFIG: Dict[str, Any] = {}
     POSTGRES_SCHEMA = "public"
 
-from db.base_event import EventsRepository
-
-
-def _utcnow_iso() -> str:
-    return datetime.now(timezone.utc).isoformat()
+from db.base_event import EventsRepository, _utcnow_iso
 
 
 def _normalize_settings(settings: Mapping[str, Any]) -> Dict[str, Any]:
@@ -59,69 +69,251 @@ class UsersRepository:
                 CREATE TABLE IF NOT EXISTS users (
                     id BIGSERIAL PRIMARY KEY,
                     tg_id BIGINT NOT NULL UNIQUE,
-                    data TEXT NOT NULL,
+                    data JSONB NOT NULL,
                     created_at TEXT NOT NULL,
                     updated_at TEXT NOT NULL
                 )
                 """
             )
+            self._db.migrate_data_column_to_jsonb(conn, "users")
+            # Partial expression index matching find_thermometer_due: the
+            # per-minute scheduler probe touches only enabled users ordered
+            # by their denormalized next send timestamp.
+            conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS users_thermo_next_send_idx
+                ON users ((data -> 'thermometer' ->> 'next_send_at'))
+                WHERE COALESCE((data -> 'thermometer' ->> 'enabled')::boolean, TRUE)
+                """
+            )
 
     @staticmethod
     def _ensure_created_updated(doc: Dict[str, Any]) -> Dict[str, Any]:
-        updated = doc.copy()
+        # save() takes ownership of the document, so the timestamps are
+        # stamped in place instead of on a defensive copy.
         now = _utcnow_iso()
-        if "created_at" not in updated:
-            updated["created_at"] = now
-        updated["updated_at"] = now
-        return updated
+        if "created_at" not in doc:
+            doc["created_at"] = now
+        doc["updated_at"] = now
+        return doc
 
     @staticmethod
-    def _serialize(doc: Dict[str, Any]) -> str:
-        return json.dumps(doc, ensure_ascii=False)
+    def _serialize(doc: Dict[str, Any]) -> Jsonb:
+        return Jsonb(doc)
 
     @staticmethod
-    def _deserialize(payload: str) -> Dict[str, Any]:
+    def _deserialize(payload: Any) -> Dict[str, Any]:
+        if isinstance(payload, dict):
+            return payload
+        if orjson is not None:
+            return orjson.loads(payload)
         return json.loads(payload)
 
     def _load_all(self) -> List[Dict[str, Any]]:
         with self._db.connection() as conn:
             cursor = conn.execute("SELECT data FROM users")
             rows = cursor.fetchall()
-        return [self._deserialize(row["data"] if isinstance(row, Mapping) else row[0]) for row in rows]
-
-    def _matches_condition(self, doc: Mapping[str, Any], condition: Mapping[str, Any]) -> bool:
-        if not condition:
-            return True
+        return [self._deserialize(row["data"]) for row in rows]
+
+    def _compile_condition_sql(
+        self, condition: Mapping[str, Any]
+    ) -> Optional[tuple[sql.Composable, List[Any]]]:
+        """Translate a Mongo-style condition into a SQL WHERE fragment.
+
+        Returns None when the condition uses operators we cannot push down,
+        in which case callers fall back to the Python-side filter.
+        """
+        clauses: List[sql.Composable] = []
+        params: List[Any] = []
         for key, value in condition.items():
             if key == "$or":
                 if not isinstance(value, (list, tuple)):
-                    return False
-                return any(self._matches_condition(doc, clause) for clause in value)
-            if isinstance(value, Mapping):
+                    return None
+                sub_parts: List[sql.Composable] = []
+                for clause in value:
+                    compiled = self._compile_condition_sql(clause)
+                    if compiled is None:
+                        return None
+                    sub_sql, sub_params = compiled
+                    sub_parts.append(sql.SQL("({})").format(sub_sql))
+                    params.extend(sub_params)
+                clauses.append(sql.SQL("({})").format(sql.SQL(" OR ").join(sub_parts)))
+            elif isinstance(value, Mapping):
+                for operator, operand in value.items():
+                    if operator != "$ne":
+                        return None
+                    if operand is None:
+                        clauses.append(
+                            sql.SQL("(data ->> {}) IS NOT NULL").format(sql.Literal(key))
+                        )
+                    else:
+                        clauses.append(
+                            sql.SQL("(data ->> {}) IS DISTINCT FROM %s").format(
+                                sql.Literal(key)
+                            )
+                        )
+                        # ->> renders scalars the same way JSON does
+                        # ("true", "5", ...), matching the equality branch.
+                        params.append(
+                            operand if isinstance(operand, str) else json.dumps(operand)
+                        )
+            elif key == "tg_id" and isinstance(value, int):
+                clauses.append(sql.SQL("tg_id = %s"))
+                params.append(value)
+            elif value is None:
+                clauses.append(sql.SQL("(data ->> {}) IS NULL").format(sql.Literal(key)))
+            elif isinstance(value, (str, int, float, bool)):
+                clauses.append(sql.SQL("(data ->> {}) = %s").format(sql.Literal(key)))
+                # ->> renders scalars the same way JSON does ("true", "5", ...).
+                params.append(value if isinstance(value, str) else json.dumps(value))
+            else:
+                return None
+        if not clauses:
+            return None
+        return sql.SQL(" AND ").join(clauses), params
+
+    def _compile_condition(
+        self, condition: Mapping[str, Any]
+    ) -> Callable[[Mapping[str, Any]], bool]:
+        """Compile a Mongo-style condition into a reusable predicate.
+
+        The condition dict is interpreted once here instead of per document,
+        so a collection scan only pays closure calls in the filter loop.
+        """
+        preds: List[Callable[[Mapping[str, Any]], bool]] = []
+        for key, value in condition.items():
+            if key == "$or":
+                if not isinstance(value, (list, tuple)):
+                    preds.append(lambda doc: False)
+                    continue
+                sub_preds = [self._compile_condition(clause) for clause in value]
+                preds.append(
+                    lambda doc, _subs=tuple(sub_preds): any(sub(doc) for sub in _subs)
+                )
+            elif isinstance(value, Mapping):
                 for operator, operand in value.items():
                     if operator == "$ne":
-                        if doc.get(key) == operand:
-                            return False
+                        preds.append(
+                            lambda doc, _k=key, _v=operand: doc.get(_k) != _v
+                        )
                     else:
-                        return False
+                        preds.append(lambda doc: False)
             else:
-                if doc.get(key) != value:
-                    return False
-        return True
+                preds.append(lambda doc, _k=key, _v=value: doc.get(_k) == _v)
+        if not preds:
+            return lambda doc: True
+        if len(preds) == 1:
+            return preds[0]
+        frozen = tuple(preds)
+        return lambda doc: all(pred(doc) for pred in frozen)
+
+    def _matches_condition(self, doc: Mapping[str, Any], condition: Mapping[str, Any]) -> bool:
+        return self._compile_condition(condition)(doc)
 
     def find(self, condition: Optional[Mapping[str, Any]] = None) -> List[Dict[str, Any]]:
-        docs = self._load_all()
         if not condition:
-            return docs
-        return [doc for doc in docs if self._matches_condition(doc, condition)]
+            return self._load_all()
+        compiled = self._compile_condition_sql(condition)
+        if compiled is None:
+            matches = self._compile_condition(condition)
+            return [doc for doc in self._load_all() if matches(doc)]
+        where_sql, params = compiled
+        query = sql.SQL("SELECT data FROM users WHERE {}").format(where_sql)
+        with self._db.connection() as conn:
+            cursor = conn.execute(query, params)
+            rows = cursor.fetchall()
+        return [self._deserialize(row["data"]) for row in rows]
+
+    def find_by_tg_ids(self, tg_ids: Iterable[int]) -> List[Dict[str, Any]]:
+        ids = list(tg_ids)
+        if not ids:
+            return []
+        with self._db.connection() as conn:
+            cursor = conn.execute(
+                "SELECT data FROM users WHERE tg_id = ANY(%s)",
+                (ids,),
+            )
+            rows = cursor.fetchall()
+        return [self._deserialize(row["data"]) for row in rows]
+
+    def find_page_by_tg_ids(
+        self, tg_ids: Iterable[int], *, offset: int, limit: int
+    ) -> List[Dict[str, Any]]:
+        """One page of users ordered by name, paginated in SQL.
+
+        Users without a name sort by their tg_id, matching the Python-side
+        sort key used before pagination was pushed down.
+        """
+        ids = list(tg_ids)
+        if not ids or limit <= 0:
+            return []
+        with self._db.connection() as conn:
+            cursor = conn.execute(
+                """
+                SELECT data FROM users WHERE tg_id = ANY(%s)
+                ORDER BY COALESCE(NULLIF(lower(data ->> 'name'), ''), tg_id::text)
+                OFFSET %s LIMIT %s
+                """,
+                (ids, offset, limit),
+            )
+            rows = cursor.fetchall()
+        return [self._deserialize(row["data"]) for row in rows]
+
+    def find_thermometer_due(self, now_iso: str) -> List[Dict[str, Any]]:
+        """Users whose weekly thermometer check-in may be due.
+
+        Filters in SQL on the denormalized ``thermometer.next_send_at``
+        stamp so the per-minute tick transfers only due users instead of
+        the whole collection. Rows without the stamp (legacy documents or
+        fresh registrations) are included for the caller to evaluate in
+        Python and backfill. All stamps are written with the same fixed
+        UTC offset, so the ISO strings compare lexicographically.
+
+        The registration-complete predicate mirrors
+        ``User.is_registration_complete`` so unfinished profiles never
+        leave the database, and the projection trims each row to the two
+        fields the scheduler actually reads.
+        """
+        with self._db.connection() as conn:
+            cursor = conn.execute(
+                """
+                SELECT jsonb_build_object(
+                           'tg_id', data -> 'tg_id',
+                           'thermometer', data -> 'thermometer'
+                       ) AS data
+                FROM users
+                WHERE COALESCE((data -> 'thermometer' ->> 'enabled')::boolean, TRUE)
+                  AND ((data -> 'thermometer' ->> 'next_send_at') IS NULL
+                       OR (data -> 'thermometer' ->> 'next_send_at') <= %s)
+                  AND COALESCE(data ->> 'name', '') <> ''
+                  AND COALESCE(data ->> 'direction', '') <> ''
+                  AND COALESCE(data ->> 'magistracy_graduation_year', '') <> ''
+                """,
+                (now_iso,),
+            )
+            rows = cursor.fetchall()
+        return [self._deserialize(row["data"]) for row in rows]
 
     def find_one(self, condition: Mapping[str, Any]) -> Optional[Dict[str, Any]]:
         if not condition:
             raise ValueError("find_one requires a condition.")
+        # The overwhelmingly common shape is a plain tg_id lookup; hit the
+        # unique column directly instead of going through the compiler.
+        if set(condition) == {"tg_id"} and isinstance(condition["tg_id"], int):
+            with self._db.connection() as conn:
+                cursor = conn.execute(
+                    "SELECT data FROM users WHERE tg_id = %s LIMIT 1",
+                    (condition["tg_id"],),
+                )
+                row = cursor.fetchone()
+            if not row:
+                return None
+            return self._deserialize(row["data"])
         docs = self.find(condition)
         return docs[0] if docs else None
 
     def save(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Persist a user document. Takes ownership of ``doc`` (mutates it)."""
         if "tg_id" not in doc:
             raise ValueError("User document must contain 'tg_id'.")
 
@@ -142,6 +334,146 @@ class UsersRepository:
             )
         return prepared
 
+    def patch_thermometer(
+        self,
+        tg_id: int,
+        patch: Dict[str, Any],
+        *,
+        toggle_enabled: bool = False,
+    ) -> Dict[str, Any]:
+        """Merge a partial thermometer update atomically, return the result.
+
+        Counterpart of Mongo's find_one_and_update: one statement applies
+        the patch over the stored settings and hands back the merged dict,
+        so callers avoid the read-modify-write pair and its lost-update
+        race. ``toggle_enabled`` flips the ``enabled`` flag against the
+        value currently stored rather than a value read earlier.
+        """
+        now = _utcnow_iso()
+        insert_settings = dict(patch)
+        if toggle_enabled:
+            insert_settings["enabled"] = False
+        doc = {
+            "tg_id": tg_id,
+            "thermometer": insert_settings,
+            "created_at": now,
+            "updated_at": now,
+        }
+        with self._db.connection() as conn:
+            cursor = conn.execute(
+                """
+                INSERT INTO users (tg_id, data, created_at, updated_at)
+                VALUES (%s, %s, %s, %s)
+                ON CONFLICT (tg_id) DO UPDATE
+                SET data = jsonb_set(
+                        users.data,
+                        '{thermometer}',
+                        COALESCE(users.data -> 'thermometer', '{}'::jsonb)
+                        || (EXCLUDED.data -> 'thermometer')
+                        || CASE WHEN %s THEN jsonb_build_object(
+                               'enabled',
+                               NOT COALESCE(
+                                   (users.data -> 'thermometer' ->> 'enabled')::boolean,
+                                   TRUE
+                               )
+                           ) ELSE '{}'::jsonb END
+                    ),
+                    updated_at = EXCLUDED.updated_at
+                RETURNING data -> 'thermometer' AS thermometer
+                """,
+                (tg_id, self._serialize(doc), now, now, toggle_enabled),
+            )
+            row = cursor.fetchone()
+        if row is None or row["thermometer"] is None:
+            return {}
+        return self._deserialize(row["thermometer"])
+
+    def next_thermometer_wakeup(self) -> tuple[Optional[str], int]:
+        """Earliest next-send stamp and the number of rows missing one.
+
+        Lets the scheduler sleep until the first user actually comes due
+        instead of probing every minute. Rows without a stamp (legacy
+        documents, fresh registrations) are counted separately so the
+        caller can keep a short poll interval until they are backfilled.
+        """
+        with self._db.connection() as conn:
+            cursor = conn.execute(
+                """
+                SELECT MIN(data -> 'thermometer' ->> 'next_send_at') AS next_stamp,
+                       COUNT(*) FILTER (
+                           WHERE (data -> 'thermometer' ->> 'next_send_at') IS NULL
+                       ) AS missing
+                FROM users
+                WHERE COALESCE((data -> 'thermometer' ->> 'enabled')::boolean, TRUE)
+                  AND COALESCE(data ->> 'name', '') <> ''
+                  AND COALESCE(data ->> 'direction', '') <> ''
+                  AND COALESCE(data ->> 'magistracy_graduation_year', '') <> ''
+                """
+            )
+            row = cursor.fetchone()
+        if row is None:
+            return None, 0
+        return row["next_stamp"], row["missing"] or 0
+
+    def set_thermometer_many(self, entries: List[tuple[int, Dict[str, Any]]]) -> None:
+        """Write thermometer settings for many existing users in one batch.
+
+        The scheduler updates dozens of documents per tick; executemany
+        pipelines the UPDATEs over a single connection checkout instead of
+        paying a find_one + save round-trip pair per user.
+        """
+        if not entries:
+            return
+        now = _utcnow_iso()
+        with self._db.connection() as conn:
+            conn.cursor().executemany(
+                """
+                UPDATE users
+                SET data = jsonb_set(data, '{thermometer}', %s),
+                    updated_at = %s
+                WHERE tg_id = %s
+                """,
+                [(self._serialize(settings), now, tg_id) for tg_id, settings in entries],
+            )
+
+    def upsert_user_meta_many(self, entries: List[tuple[int, str]]) -> None:
+        """Upsert (tg_id, username) pairs for many users in one batch.
+
+        Fed by the user-meta middleware, which coalesces per-event writes.
+        On conflict the payload is merged over the stored document the way
+        update_one's $set would, except created_at, which keeps its
+        original value for existing rows.
+        """
+        if not entries:
+            return
+        now = _utcnow_iso()
+        with self._db.connection() as conn:
+            conn.cursor().executemany(
+                """
+                INSERT INTO users (tg_id, data, created_at, updated_at)
+                VALUES (%s, %s, %s, %s)
+                ON CONFLICT (tg_id) DO UPDATE
+                SET data = users.data || (EXCLUDED.data - 'created_at'),
+                    updated_at = EXCLUDED.updated_at
+                """,
+                [
+                    (
+                        tg_id,
+                        self._serialize(
+                            {
+                                "tg_id": tg_id,
+                                "username": username,
+                                "created_at": now,
+                                "updated_at": now,
+                            }
+                        ),
+                        now,
+                        now,
+                    )
+                    for tg_id, username in entries
+                ],
+            )
+
     def update_one(
         self,
         condition: Mapping[str, Any],
@@ -187,42 +519,79 @@ class Database:
         self.lectures = _ReadOnlyEmptyCollection()
         self.courses = _ReadOnlyEmptyCollection()
         self.meetups = _ReadOnlyEmptyCollection()
-        self._ensure_schema_exists()
-        self._ensure_schema()
+        # Set BOT_SKIP_MIGRATIONS=1 once the schema is known to be in place
+        # (e.g. multiple workers starting against a migrated database); the
+        # CREATE ... IF NOT EXISTS no-ops still take brief catalog locks.
+        run_migrations = os.getenv("BOT_SKIP_MIGRATIONS") != "1"
+        if run_migrations:
+            self._ensure_schema_exists()
+        self._pool = ConnectionPool(
+            self._conninfo,
+            min_size=2,
+            max_size=10,
+            # prepare_threshold=0 makes every statement server-side prepared,
+            # amortizing parse/plan for the handful of hot repeated queries.
+            kwargs={"row_factory": dict_row, "prepare_threshold": 0},
+            configure=self._configure_connection,
+            open=True,
+        )
+        if run_migrations:
+            self._ensure_schema()
+
+    def _configure_connection(self, conn: psycopg.Connection) -> None:
+        # Runs once per pooled connection, not per checkout.
+        if self._schema:
+            conn.execute(
+                sql.SQL("SET search_path TO {}, public").format(
+                    sql.Identifier(self._schema)
+                )
+            )
+            conn.commit()
 
     @contextmanager
     def connection(self):
-        conn = psycopg.connect(self._conninfo, row_factory=dict_row)
-        try:
-            if self._schema:
-                conn.execute(
-                    sql.SQL("SET search_path TO {}, public").format(
-                        sql.Identifier(self._schema)
-                    )
-                )
+        # The pool commits on clean exit, rolls back on error and
+        # returns the connection instead of closing it.
+        with self._pool.connection() as conn:
             yield conn
-            conn.commit()
-        except Exception:
-            conn.rollback()
-            raise
-        finally:
-            conn.close()
 
     def _ensure_schema_exists(self) -> None:
         if not self._schema or self._schema == "public":
             return
         with psycopg.connect(self._conninfo) as conn:
-            conn.execute(
-                sql.SQL("CREATE SCHEMA IF NOT EXISTS {}").format(
-                    sql.Identifier(self._schema)
-                )
+            cursor = conn.execute(
+                "SELECT 1 FROM pg_namespace WHERE nspname = %s",
+                (self._schema,),
             )
+            if cursor.fetchone() is None:
+                conn.execute(
+                    sql.SQL("CREATE SCHEMA IF NOT EXISTS {}").format(
+                        sql.Identifier(self._schema)
+                    )
+                )
             conn.commit()
 
     def _ensure_schema(self) -> None:
         self._users_repo.ensure_table()
         self.events.ensure_table()
 
+    def migrate_data_column_to_jsonb(self, conn: psycopg.Connection, table: str) -> None:
+        """Upgrade a legacy TEXT payload column to JSONB in place."""
+        cursor = conn.execute(
+            """
+            SELECT data_type FROM information_schema.columns
+            WHERE table_schema = %s AND table_name = %s AND column_name = 'data'
+            """,
+            (self._schema, table),
+        )
+        row = cursor.fetchone()
+        if row and row["data_type"] == "text":
+            conn.execute(
+                sql.SQL(
+                    "ALTER TABLE {} ALTER COLUMN data TYPE JSONB USING data::jsonb"
+                ).format(sql.Identifier(table))
+            )
+
     @property
     def users(self) -> UsersRepository:
         return self._users_repo
@@ -236,6 +605,7 @@ class Database:
         return cls._instance
 
     def close(self) -> None:
+        self._pool.close()
         Database._instance = None
 
 
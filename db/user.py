@@ -6,14 +6,12 @@ from typing import Any, Dict, Optional
 from db.database import Database
 
 
-@dataclass
+@dataclass(slots=True)
 class User:
+    # Callers hand over ownership of the dict (repository reads return fresh
+    # documents), so no defensive copy is made here.
     raw: Dict[str, Any] = field(default_factory=dict)
 
-    def __post_init__(self) -> None:
-        # Work with own copy to avoid accidental external mutations
-        self.raw = dict(self.raw)
-
     @property
     def tg_id(self) -> Optional[int]:
         return self.raw.get("tg_id")
@@ -44,8 +42,7 @@ class User:
     def save_to_db(self) -> Dict[str, Any]:
         if "tg_id" not in self.raw:
             raise ValueError("Cannot save user without 'tg_id'.")
-        saved = Database.get().users.save(self.raw)
-        self.raw = dict(saved)
+        self.raw = Database.get().users.save(self.raw)
         return self.raw
 
     @classmethod
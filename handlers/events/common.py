@@ -1,10 +1,13 @@
 from __future__ import annotations
 
-from datetime import datetime
+import asyncio
+from functools import cache, lru_cache
+from operator import itemgetter
+from time import monotonic
 from typing import Iterable, Optional, Any
 
 from constants import ADMIN_IDS, EVENT_TAGS
-from db.base_event import EventRecord, EventsRepository, STATUS_APPROVED
+from db.base_event import EventRecord, EventsRepository
 from db.database import Database
 from db.user import User
 from utils.users import get_direction_track
@@ -12,19 +15,32 @@ from utils.users import get_direction_track
 TAG_TITLE_BY_SLUG = {slug: title for slug, title in EVENT_TAGS}
 LEGACY_TAG_ALL = "all"
 TAG_ORDER = [slug for slug, _ in EVENT_TAGS]
+TAG_ORDER_SET = frozenset(TAG_ORDER)
+# Display names including the legacy catch-all tag (not selectable in keyboards).
+_TAG_DISPLAY = {**TAG_TITLE_BY_SLUG, LEGACY_TAG_ALL: "Для всех"}
 PARTICIPANTS_PER_PAGE = 10
 
 
+@lru_cache(maxsize=256)
 def number_to_emoji(number: int) -> str:
+    # Номера в списках и клавиатурах — маленькие и повторяются на каждом
+    # рендере (текст и кнопка просят один и тот же индекс), кэш попадает
+    # практически всегда.
     return "".join(f"{int(digit)}️⃣" for digit in str(number))
 
 
+@cache
+def _database() -> Database:
+    # Resolved once per process; skips the singleton's lock dance per call.
+    return Database.get()
+
+
 def events_repo() -> EventsRepository:
-    return Database.get().events
+    return _database().events
 
 
 def load_user(tg_id: int) -> Optional[User]:
-    doc = Database.get().users.find_one({"tg_id": tg_id})
+    doc = _database().users.find_one({"tg_id": tg_id})
     return User(doc) if doc else None
 
 
@@ -34,59 +50,64 @@ def user_track(user: Optional[User]) -> Optional[str]:
     return user.raw.get("direction_track") or get_direction_track(user.get_direction())
 
 
-def event_visible_for_user(event: EventRecord, user: Optional[User]) -> bool:
-    if user and user.tg_id in ADMIN_IDS:
-        return True
-    if user and user.tg_id == event.created_by:
-        return True
-    if event.status != STATUS_APPROVED:
-        return False
-    if not event.tags:
-        return True
-    if LEGACY_TAG_ALL in event.tags:
-        return True
-    track = user_track(user)
-    if not track:
-        return False
-    return track in event.tags
-
-
-def sort_events(events: Iterable[EventRecord]) -> list[EventRecord]:
-    return sorted(
-        events,
-        key=lambda event: event.scheduled_datetime() or datetime.max,
-    )
-
-
 def is_user_registered(event: EventRecord, user_id: int) -> bool:
-    return user_id in event.attendees
+    return user_id in event.attendee_set()
 
 
 def can_manage_event(user_id: int, event: EventRecord) -> bool:
     return user_id in ADMIN_IDS or user_id == event.created_by
 
 
-def load_event_attendees(event: EventRecord) -> list[User]:
+def load_event_attendees(
+    event: EventRecord,
+    *,
+    offset: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> list[User]:
     if not event.attendees:
         return []
-    db = Database.get()
+    db = _database()
+    if offset is not None or limit is not None:
+        # Paged path: ordering, offset and limit are applied in SQL, so only
+        # the requested page of user documents is loaded and materialized.
+        docs = db.users.find_page_by_tg_ids(
+            event.attendee_set(),
+            offset=offset or 0,
+            limit=limit if limit is not None else len(event.attendees),
+        )
+        return [User(doc) for doc in docs]
+    docs_by_id = {
+        doc["tg_id"]: doc
+        for doc in db.users.find_by_tg_ids(event.attendees)
+        if doc.get("tg_id") is not None
+    }
     users: list[User] = []
     seen: set[int] = set()
     for user_id in event.attendees:
         if user_id in seen:
             continue
-        doc = db.users.find_one({"tg_id": user_id})
+        doc = docs_by_id.get(user_id)
         if doc:
             users.append(User(doc))
             seen.add(user_id)
-    return sorted(
-        users,
-        key=lambda item: (item.get_name() or "").lower() or str(item.tg_id or ""),
-    )
+    # Schwartzian transform: compute each sort key once, inline the raw dict
+    # access instead of re-dispatching through get_name() inside the sort.
+    decorated = [
+        ((user.raw.get("name", "") or "").lower() or str(user.tg_id or ""), user)
+        for user in users
+    ]
+    decorated.sort(key=itemgetter(0))
+    return [user for _, user in decorated]
 
 
 def normalize_tags(tags: Iterable[str]) -> list[str]:
-    selected = set(tags)
+    if isinstance(tags, (list, tuple)):
+        # Fast path: tags saved through this function come back already in
+        # canonical order, so a subsequence check avoids the set + rebuild.
+        order = iter(TAG_ORDER)
+        if all(slug in order for slug in tags):
+            return tags if isinstance(tags, list) else list(tags)
+    selected = set(tags) & TAG_ORDER_SET
     return [slug for slug in TAG_ORDER if slug in selected]
 
 
@@ -97,26 +118,124 @@ def build_contact_info(user) -> tuple[str, str]:
 
 
 def format_tags(tags: Iterable[str]) -> str:
-    titles: list[str] = []
-    for tag in tags:
-        if tag == LEGACY_TAG_ALL:
-            titles.append("Для всех")
-        else:
-            titles.append(TAG_TITLE_BY_SLUG.get(tag, tag))
-    return ", ".join(titles) if titles else "Не указано"
+    return ", ".join(_TAG_DISPLAY.get(tag, tag) for tag in tags) or "Не указано"
+
+
+# Готовые строки «дата · время» по исходным ISO-строкам события. Ключ —
+# сами строки, поэтому правка дат даёт новый ключ без явной инвалидации;
+# на переполнении кэш просто сбрасывается (набор активных событий мал).
+_TIME_RANGE_CACHE: dict[tuple[str, str], str] = {}
+_TIME_RANGE_CACHE_MAX = 1024
 
 
 def format_time_range(event: EventRecord) -> str:
+    key = (event.starts_at or event.scheduled_at, event.ends_at)
+    cached = _TIME_RANGE_CACHE.get(key)
+    if cached is not None:
+        return cached
     start_dt = event.scheduled_datetime()
     end_dt = event.end_datetime()
     if not start_dt:
-        return "Дата уточняется"
-    date_part = start_dt.strftime("%d.%m.%Y")
-    time_part = start_dt.strftime("%H:%M")
-    if end_dt:
-        time_part = f"{time_part} – {end_dt.strftime('%H:%M')}"
-    return f"{date_part} · {time_part}"
+        result = "Дата уточняется"
+    else:
+        time_part = start_dt.strftime("%H:%M")
+        if end_dt:
+            time_part = f"{time_part} – {end_dt.strftime('%H:%M')}"
+        result = f"{start_dt.strftime('%d.%m.%Y')} · {time_part}"
+    if len(_TIME_RANGE_CACHE) >= _TIME_RANGE_CACHE_MAX:
+        _TIME_RANGE_CACHE.clear()
+    _TIME_RANGE_CACHE[key] = result
+    return result
+
+
+# Short-lived cache over events_repo().get(): click storms on the same button
+# coalesce into one repository read. Writers must invalidate (or refresh) the
+# entry, which update_event_record does centrally.
+_EVENT_CACHE: dict[int, tuple[float, EventRecord]] = {}
+_EVENT_CACHE_TTL = 1.0
+_EVENT_CACHE_MAX = 512
+
+
+def _store_event_cache(event_id: int, event: Optional[EventRecord], now: float) -> None:
+    if event:
+        if len(_EVENT_CACHE) >= _EVENT_CACHE_MAX:
+            cutoff = now - _EVENT_CACHE_TTL
+            for key in [k for k, (ts, _) in _EVENT_CACHE.items() if ts < cutoff]:
+                del _EVENT_CACHE[key]
+        _EVENT_CACHE[event_id] = (now, event)
+    else:
+        _EVENT_CACHE.pop(event_id, None)
+
+
+def get_event_cached(event_id: int) -> Optional[EventRecord]:
+    now = monotonic()
+    entry = _EVENT_CACHE.get(event_id)
+    if entry and now - entry[0] < _EVENT_CACHE_TTL:
+        return entry[1]
+    event = events_repo().get(event_id)
+    _store_event_cache(event_id, event, now)
+    return event
+
+
+async def aget_event_cached(event_id: int) -> Optional[EventRecord]:
+    # Как get_event_cached, но холодный промах читает базу в worker-потоке:
+    # блокирующий SELECT не останавливает event loop для остальных чатов.
+    now = monotonic()
+    entry = _EVENT_CACHE.get(event_id)
+    if entry and now - entry[0] < _EVENT_CACHE_TTL:
+        return entry[1]
+    event = await asyncio.to_thread(events_repo().get, event_id)
+    _store_event_cache(event_id, event, monotonic())
+    return event
+
+
+def remember_event(event: EventRecord) -> None:
+    if event.id is not None:
+        _EVENT_CACHE[event.id] = (monotonic(), event)
+
+
+def invalidate_event_cache(event_id: int) -> None:
+    _EVENT_CACHE.pop(event_id, None)
 
 
 def update_event_record(event_id: int, updates: dict[str, Any]) -> Optional[EventRecord]:
-    return events_repo().update(event_id, updates)
+    updated = events_repo().update(event_id, updates)
+    if updated is not None:
+        remember_event(updated)
+    else:
+        invalidate_event_cache(event_id)
+    return updated
+
+
+# Digest of the last payload sent per (chat_id, message_id). Editors consult
+# it to skip edits Telegram would reject with "message is not modified" —
+# each such call still counts against the API limits.
+_RENDER_DIGESTS: dict[tuple[int, int], int] = {}
+_RENDER_DIGESTS_MAX = 4096
+
+
+def render_digest(text: str, keyboard) -> int:
+    buttons = ()
+    if keyboard is not None:
+        buttons = tuple(
+            (button.text, button.callback_data, button.url)
+            for row in keyboard.inline_keyboard
+            for button in row
+        )
+    return hash((text, buttons))
+
+
+def render_is_duplicate(key: tuple[int, int], digest: int) -> bool:
+    return _RENDER_DIGESTS.get(key) == digest
+
+
+def remember_render(key: tuple[int, int], digest: int) -> None:
+    if len(_RENDER_DIGESTS) >= _RENDER_DIGESTS_MAX and key not in _RENDER_DIGESTS:
+        # Потеря записей безопасна: худший исход — один лишний edit с
+        # ответом "message is not modified", который снова наполнит кэш.
+        _RENDER_DIGESTS.clear()
+    _RENDER_DIGESTS[key] = digest
+
+
+def forget_render(key: tuple[int, int]) -> None:
+    _RENDER_DIGESTS.pop(key, None)
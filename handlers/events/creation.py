@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from datetime import datetime, time as dt_time
+import asyncio
+from datetime import date as dt_date, datetime, time as dt_time
 from html import escape
 from typing import Optional
 
@@ -17,8 +18,18 @@ from constants import BACK
 from db.base_event import STATUS_PENDING
 from states.events import EventCreation
 
-from .common import TAG_ORDER, TAG_TITLE_BY_SLUG, build_contact_info, events_repo, normalize_tags
-from .details import notify_admins
+from .common import (
+    TAG_ORDER,
+    TAG_TITLE_BY_SLUG,
+    build_contact_info,
+    events_repo,
+    forget_render,
+    normalize_tags,
+    remember_render,
+    render_digest,
+    render_is_duplicate,
+)
+from .details import notify_admins, spawn_notification
 from .listing import edit_events_message
 
 router = Router()
@@ -51,13 +62,44 @@ CREATION_PROMPTS = {
 }
 
 
+# Buttons are immutable aiogram models, so the static ones are built once at
+# import time; per-refresh work is reduced to picking from the two tag maps.
+_TAG_ITEMS = tuple(TAG_TITLE_BY_SLUG.items())
+_TAG_BUTTONS_SELECTED = {
+    slug: InlineKeyboardButton(
+        text=f"✅ {title}", callback_data=f"{CB_CREATE_TAG_PREFIX}{slug}"
+    )
+    for slug, title in _TAG_ITEMS
+}
+_TAG_BUTTONS_UNSELECTED = {
+    slug: InlineKeyboardButton(
+        text=f"⬜️ {title}", callback_data=f"{CB_CREATE_TAG_PREFIX}{slug}"
+    )
+    for slug, title in _TAG_ITEMS
+}
+_TAGS_DONE_BUTTON = InlineKeyboardButton(text="Готово", callback_data=CB_CREATE_TAG_DONE)
+_SUBMIT_BUTTON = InlineKeyboardButton(
+    text="Отправить на модерацию", callback_data=CB_CREATE_SUBMIT
+)
+_BACK_BUTTON = InlineKeyboardButton(text=BACK, callback_data=CB_CREATE_BACK)
+
+
+_STATE_INDEX = {state.state: index for index, state in enumerate(CREATION_SEQUENCE)}
+_NEXT_STATE = {
+    state.state: CREATION_SEQUENCE[index + 1].state
+    for index, state in enumerate(CREATION_SEQUENCE[:-1])
+}
+_PREV_STATE = {
+    state.state: CREATION_SEQUENCE[index - 1].state
+    for index, state in enumerate(CREATION_SEQUENCE)
+    if index > 0
+}
+
+
 def _state_index(state_name: Optional[str]) -> Optional[int]:
     if not state_name:
         return None
-    for index, state in enumerate(CREATION_SEQUENCE):
-        if state.state == state_name:
-            return index
-    return None
+    return _STATE_INDEX.get(state_name)
 
 
 def _prompt_for_state(state_name: Optional[str]) -> str:
@@ -65,54 +107,52 @@ def _prompt_for_state(state_name: Optional[str]) -> str:
 
 
 def _build_summary(data: dict, prompt: str) -> str:
-    lines = ["📋 <b>Новое мероприятие</b>"]
-
     title = data.get("title")
-    if title:
-        lines.append(f"🏷 <b>Название:</b> {escape(title)}")
-
     event_date = data.get("event_date")
     start_time = data.get("start_time")
     end_time = data.get("end_time")
-    if event_date:
-        date_display = datetime.strptime(event_date, "%Y-%m-%d").strftime("%d.%m.%Y")
-        if start_time and end_time:
-            lines.append(f"🕒 <b>Дата и время:</b> {date_display} {start_time} – {end_time}")
-        elif start_time:
-            lines.append(f"🕒 <b>Дата и время:</b> {date_display} {start_time}")
-        else:
-            lines.append(f"🗓 <b>Дата:</b> {date_display}")
-
     location = data.get("location")
-    if location:
-        lines.append(f"📍 <b>Аудитория:</b> {escape(location)}")
-
     description = data.get("short_description")
-    if description:
-        lines.append(f"📝 <b>Описание:</b> {escape(description)}")
-
     contact_name = data.get("contact_name")
     contact_url = data.get("contact_url")
-    if contact_name and contact_url:
-        lines.append(f"☎️ <b>Контакт:</b> {escape(contact_name)} ({contact_url})")
-
     tags = data.get("tags") or []
-    if tags:
-        pretty_tags = ", ".join(TAG_TITLE_BY_SLUG.get(tag, tag) for tag in tags)
-        lines.append(f"🎯 <b>Теги:</b> {escape(pretty_tags)}")
-
     registration_link = data.get("registration_link")
-    if registration_link:
-        lines.append(f"🔗 <b>Ссылка:</b> {registration_link}")
-
-    if prompt:
-        lines.append(f"ℹ️ {prompt}")
-
     error = data.get("error")
-    if error:
-        lines.append(f"⚠️ {escape(error)}")
 
-    return "\n".join(lines)
+    when_line = None
+    if event_date:
+        # The display form is stamped into state when the date is entered;
+        # the strptime fallback only covers sessions started before that.
+        date_display = data.get("event_date_display") or datetime.strptime(
+            event_date, "%Y-%m-%d"
+        ).strftime("%d.%m.%Y")
+        when_line = (
+            f"🕒 <b>Дата и время:</b> {date_display} {start_time} – {end_time}"
+            if start_time and end_time
+            else f"🕒 <b>Дата и время:</b> {date_display} {start_time}"
+            if start_time
+            else f"🗓 <b>Дата:</b> {date_display}"
+        )
+
+    # One candidate per line, joined with a single filter pass — no repeated
+    # append/branch bookkeeping on this per-keystroke path.
+    parts = (
+        "📋 <b>Новое мероприятие</b>",
+        f"🏷 <b>Название:</b> {escape(title)}" if title else None,
+        when_line,
+        f"📍 <b>Аудитория:</b> {escape(location)}" if location else None,
+        f"📝 <b>Описание:</b> {escape(description)}" if description else None,
+        f"☎️ <b>Контакт:</b> {escape(contact_name)} ({contact_url})"
+        if contact_name and contact_url
+        else None,
+        f"🎯 <b>Теги:</b> {escape(', '.join(TAG_TITLE_BY_SLUG.get(tag, tag) for tag in tags))}"
+        if tags
+        else None,
+        f"🔗 <b>Ссылка:</b> {registration_link}" if registration_link else None,
+        f"ℹ️ {prompt}" if prompt else None,
+        f"⚠️ {escape(error)}" if error else None,
+    )
+    return "\n".join(part for part in parts if part)
 
 
 def _build_keyboard(state_name: Optional[str], data: dict) -> InlineKeyboardMarkup:
@@ -120,25 +160,20 @@ def _build_keyboard(state_name: Optional[str], data: dict) -> InlineKeyboardMark
     index = _state_index(state_name)
 
     if state_name == EventCreation.tags.state:
-        selected = set(data.get("tags", []))
-        for slug, title in TAG_TITLE_BY_SLUG.items():
-            prefix = "✅" if slug in selected else "⬜️"
-            rows.append(
-                [
-                    InlineKeyboardButton(
-                        text=f"{prefix} {title}",
-                        callback_data=f"{CB_CREATE_TAG_PREFIX}{slug}",
-                    )
-                ]
+        # tags is kept normalized (ordered, deduplicated) by cb_toggle_tag;
+        # membership on this handful of slugs beats building a set per refresh.
+        selected = data.get("tags", ())
+        for slug, _ in _TAG_ITEMS:
+            button_map = (
+                _TAG_BUTTONS_SELECTED if slug in selected else _TAG_BUTTONS_UNSELECTED
             )
-        rows.append([InlineKeyboardButton(text="Готово", callback_data=CB_CREATE_TAG_DONE)])
+            rows.append([button_map[slug]])
+        rows.append([_TAGS_DONE_BUTTON])
     elif state_name == EventCreation.confirm.state:
-        rows.append([
-            InlineKeyboardButton(text="Отправить на модерацию", callback_data=CB_CREATE_SUBMIT)
-        ])
+        rows.append([_SUBMIT_BUTTON])
 
     if index is not None and index >= 0:
-        rows.append([InlineKeyboardButton(text=BACK, callback_data=CB_CREATE_BACK)])
+        rows.append([_BACK_BUTTON])
 
     return InlineKeyboardMarkup(inline_keyboard=rows)
 
@@ -151,21 +186,45 @@ def _parse_date(value: str) -> Optional[datetime]:
 
 
 def _parse_time(value: str) -> Optional[dt_time]:
-    try:
-        return datetime.strptime(value.strip(), "%H:%M").time()
-    except ValueError:
+    # Hand-parsed: strptime drags in regex and locale machinery for what is
+    # a fixed two-field input, and this runs on every time entry.
+    parts = value.strip().split(":")
+    if len(parts) != 2:
+        return None
+    hours_str, minutes_str = parts
+    if not (0 < len(hours_str) <= 2 and 0 < len(minutes_str) <= 2):
         return None
+    # isdecimal, не isdigit: надстрочные и обведённые цифры проходят
+    # isdigit, но роняют int() с ValueError.
+    if not (hours_str.isdecimal() and minutes_str.isdecimal()):
+        return None
+    hours = int(hours_str)
+    minutes = int(minutes_str)
+    if hours > 23 or minutes > 59:
+        return None
+    return dt_time(hours, minutes)
 
 
-async def _refresh_message(state: FSMContext) -> None:
-    data = await state.get_data()
-    chat_id = data.get("chat_id")
-    message_id = data.get("main_message_id")
-    current_state = await state.get_state()
-    if not chat_id or not message_id or not current_state:
+# Telegram caps message edits per chat (~20/min); burst input on the creation
+# form can exceed that and stall on 429 retries. Edits are therefore coalesced
+# per (chat_id, message_id): within the debounce window only the latest
+# payload is sent, at most one flusher task per message.
+_EDIT_DEBOUNCE = 0.25
+_pending_edits: dict[tuple[int, int], tuple[str, InlineKeyboardMarkup]] = {}
+_edit_flushers: dict[tuple[int, int], asyncio.Task] = {}
+
+
+async def _flush_edit(key: tuple[int, int]) -> None:
+    await asyncio.sleep(_EDIT_DEBOUNCE)
+    payload = _pending_edits.pop(key, None)
+    _edit_flushers.pop(key, None)
+    if payload is None:
+        return
+    summary, keyboard = payload
+    chat_id, message_id = key
+    digest = render_digest(summary, keyboard)
+    if render_is_duplicate(key, digest):
         return
-    summary = _build_summary(data, _prompt_for_state(current_state))
-    keyboard = _build_keyboard(current_state, data)
     try:
         await bot.edit_message_text(
             summary,
@@ -175,7 +234,38 @@ async def _refresh_message(state: FSMContext) -> None:
             disable_web_page_preview=True,
         )
     except TelegramBadRequest as exc:
-        logger.warning(f"Failed to edit event creation message: {exc}")
+        if "message is not modified" in str(exc):
+            remember_render(key, digest)
+        else:
+            forget_render(key)
+            logger.warning(f"Failed to edit event creation message: {exc}")
+    else:
+        remember_render(key, digest)
+
+
+async def _refresh_message(state: FSMContext) -> None:
+    data = await state.get_data()
+    chat_id = data.get("chat_id")
+    message_id = data.get("main_message_id")
+    current_state = await state.get_state()
+    if not chat_id or not message_id or not current_state:
+        return
+    summary = _build_summary(data, _prompt_for_state(current_state))
+    keyboard = _build_keyboard(current_state, data)
+    key = (chat_id, message_id)
+    _pending_edits[key] = (summary, keyboard)
+    if key not in _edit_flushers:
+        _edit_flushers[key] = asyncio.create_task(_flush_edit(key))
+
+
+def _cancel_pending_form_edit(chat_id: int, message_id: int) -> None:
+    # Дальше сообщение перерисует другой обработчик — отложенный рендер
+    # формы с уже очищенным состоянием не должен перетереть его результат.
+    key = (chat_id, message_id)
+    _pending_edits.pop(key, None)
+    flusher = _edit_flushers.pop(key, None)
+    if flusher is not None:
+        flusher.cancel()
 
 
 async def _set_error(state: FSMContext, error: str) -> None:
@@ -184,17 +274,15 @@ async def _set_error(state: FSMContext, error: str) -> None:
 
 
 def _next_state(state_name: Optional[str]) -> Optional[str]:
-    index = _state_index(state_name)
-    if index is None or index + 1 >= len(CREATION_SEQUENCE):
+    if not state_name:
         return None
-    return CREATION_SEQUENCE[index + 1].state
+    return _NEXT_STATE.get(state_name)
 
 
 def _prev_state(state_name: Optional[str]) -> Optional[str]:
-    index = _state_index(state_name)
-    if index is None or index == 0:
+    if not state_name:
         return None
-    return CREATION_SEQUENCE[index - 1].state
+    return _PREV_STATE.get(state_name)
 
 
 async def _set_defaults(state: FSMContext, user) -> None:
@@ -238,7 +326,10 @@ async def _handle_input(message: Message, state: FSMContext, value: str) -> None
         if not parsed:
             await _set_error(state, "Не удалось распознать дату. Используйте формат ДД.ММ.ГГГГ.")
             return
-        await state.update_data(event_date=parsed.date().isoformat())
+        await state.update_data(
+            event_date=parsed.date().isoformat(),
+            event_date_display=parsed.strftime("%d.%m.%Y"),
+        )
     elif current_state == EventCreation.start_time.state:
         parsed = _parse_time(value)
         if not parsed:
@@ -253,9 +344,8 @@ async def _handle_input(message: Message, state: FSMContext, value: str) -> None
         data = await state.get_data()
         start_str = data.get("start_time")
         if start_str:
-            start_dt = datetime.strptime(start_str, "%H:%M")
-            end_dt = datetime.strptime(parsed.strftime("%H:%M"), "%H:%M")
-            if end_dt <= start_dt:
+            start_parsed = _parse_time(start_str)
+            if start_parsed and parsed <= start_parsed:
                 await _set_error(state, "Время окончания должно быть позже времени начала.")
                 return
         await state.update_data(end_time=parsed.strftime("%H:%M"))
@@ -345,6 +435,7 @@ async def cb_creation_back(callback: CallbackQuery, state: FSMContext) -> None:
         data = await state.get_data()
         page = int(data.get("origin_page", 0))
         show_past = bool(int(data.get("origin_show_past", 0)))
+        _cancel_pending_form_edit(callback.message.chat.id, callback.message.message_id)
         await state.clear()
         await edit_events_message(callback, page, show_past)
         await callback.answer("Создание отменено")
@@ -359,17 +450,30 @@ async def cb_creation_back(callback: CallbackQuery, state: FSMContext) -> None:
 @router.callback_query(EventCreation.confirm, F.data == CB_CREATE_SUBMIT)
 async def cb_creation_submit(callback: CallbackQuery, state: FSMContext) -> None:
     data = await state.get_data()
+    # Validate everything before assembling the payload or touching the
+    # repository — an invalid submit must not cost a DB round-trip.
+    title = data.get("title") or ""
     event_date = data.get("event_date")
     start = data.get("start_time")
     end = data.get("end_time")
-    if not (event_date and start and end):
+    if not (title and event_date and start and end):
+        await callback.answer("Не удалось собрать данные события.", show_alert=True)
+        return
+
+    start_time = _parse_time(start)
+    end_time = _parse_time(end)
+    try:
+        event_day = dt_date.fromisoformat(event_date)
+    except ValueError:
+        event_day = None
+    if not (event_day and start_time and end_time):
         await callback.answer("Не удалось собрать данные события.", show_alert=True)
         return
 
-    starts_at = datetime.strptime(f"{event_date} {start}", "%Y-%m-%d %H:%M")
-    ends_at = datetime.strptime(f"{event_date} {end}", "%Y-%m-%d %H:%M")
+    starts_at = datetime.combine(event_day, start_time)
+    ends_at = datetime.combine(event_day, end_time)
     payload = {
-        "title": data.get("title", ""),
+        "title": title,
         "starts_at": starts_at.isoformat(),
         "ends_at": ends_at.isoformat(),
         "location": data.get("location", ""),
@@ -390,7 +494,9 @@ async def cb_creation_submit(callback: CallbackQuery, state: FSMContext) -> None
     page = int(data.get("origin_page", 0))
     show = bool(int(data.get("origin_show_past", 0)))
 
+    _cancel_pending_form_edit(callback.message.chat.id, callback.message.message_id)
     await state.clear()
     await edit_events_message(callback, page, show)
     await callback.answer("Отправлено на модерацию")
-    await notify_admins(event)
+    # Admin fan-out is not part of the user's ack; let it run in background.
+    spawn_notification(notify_admins(event))
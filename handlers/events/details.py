@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import asyncio
+import re
 from datetime import datetime
+from functools import lru_cache
 from html import escape
-from typing import Optional
+from io import StringIO
+from typing import Optional, Sequence
 
 from aiogram import F, Router
 from aiogram.exceptions import TelegramBadRequest
@@ -19,16 +23,57 @@ from .common import (
     can_manage_event,
     events_repo,
     format_tags,
+    get_event_cached,
+    remember_event,
     format_time_range,
+    forget_render,
     is_user_registered,
     load_event_attendees,
     number_to_emoji,
+    remember_render,
+    render_digest,
+    render_is_duplicate,
 )
 
 router = Router()
 
+# Compiled once; re.Pattern.match parses and validates the callback data in C
+# without the list allocation of str.split plus per-field try/except.
+_DETAILS_RE = re.compile(r"^events:details:(\d+):(\d+):(\d+)$")
+_SIGNUP_RE = re.compile(r"^events:signup:(\d+):(\d+):(\d+)$")
+_SIGNOFF_RE = re.compile(r"^events:signoff:(\d+):(\d+):(\d+)$")
+_PARTICIPANTS_RE = re.compile(r"^events:participants:(\d+):(\d+):(\d+):(\d+)$")
+_APPROVE_RE = re.compile(r"^events:approve:(\d+)$")
+_REJECT_RE = re.compile(r"^events:reject:(\d+)$")
+
+
+# Rendered details keyed by (id, updated_at, attendee count, extras). The
+# repository stamps updated_at on every write, so a stored event's HTML is
+# stable until the next update — admin fan-outs and repeat viewers reuse one
+# escape/format pass instead of rebuilding per recipient.
+_details_cache: dict[tuple, str] = {}
+_DETAILS_CACHE_MAX = 256
+
+
+def format_event_details(event: EventRecord, extra_lines: Optional[Sequence[str]] = None) -> str:
+    if event.id is None:
+        return _render_event_details(event, extra_lines)
+    key = (
+        event.id,
+        event.updated_at,
+        len(event.attendees),
+        tuple(extra_lines) if extra_lines else None,
+    )
+    cached = _details_cache.get(key)
+    if cached is None:
+        cached = _render_event_details(event, extra_lines)
+        if len(_details_cache) >= _DETAILS_CACHE_MAX:
+            _details_cache.clear()
+        _details_cache[key] = cached
+    return cached
+
 
-def format_event_details(event: EventRecord, extra_lines: Optional[list[str]] = None) -> str:
+def _render_event_details(event: EventRecord, extra_lines: Optional[Sequence[str]] = None) -> str:
     lines = [f"📌 <b>{escape(event.title)}</b>"]
     start_dt = event.scheduled_datetime()
     end_dt = event.end_datetime()
@@ -62,61 +107,90 @@ def format_event_details(event: EventRecord, extra_lines: Optional[list[str]] =
     return "\n".join(lines)
 
 
-def build_event_keyboard(
-    event: EventRecord,
-    viewer_id: int,
+# Bound str.format templates: one C-level call per callback string instead of
+# f-string assembly scattered through the builder.
+_CB_SIGNUP = "events:signup:{0}:{1}:{2}".format
+_CB_SIGNOFF = "events:signoff:{0}:{1}:{2}".format
+_CB_EDIT = "events:edit:{0}:{1}:{2}".format
+_CB_PARTICIPANTS = "events:participants:{0}:{1}:{2}:0".format
+_CB_LIST = "events:list:{0}:{1}".format
+
+
+@lru_cache(maxsize=1024)
+def _event_keyboard_cached(
+    event_id: Optional[int],
+    status: str,
+    is_registered: bool,
+    can_manage: bool,
+    registration_link: str,
     page: int,
     show_past: int,
 ) -> InlineKeyboardMarkup:
-    builder = InlineKeyboardBuilder()
-    is_registered = is_user_registered(event, viewer_id)
+    rows: list[list[InlineKeyboardButton]] = []
 
-    if event.status == STATUS_APPROVED:
-        if is_registered:
-            builder.row(
-                InlineKeyboardButton(
-                    text="❌ Отменить запись",
-                    callback_data=f"events:signoff:{event.id}:{page}:{show_past}",
-                )
-            )
-        else:
-            builder.row(
+    if status == STATUS_APPROVED and not is_registered:
+        rows.append(
+            [
                 InlineKeyboardButton(
                     text="✅ Зарегистрироваться",
-                    callback_data=f"events:signup:{event.id}:{page}:{show_past}",
+                    callback_data=_CB_SIGNUP(event_id, page, show_past),
                 )
-            )
+            ]
+        )
     elif is_registered:
-        builder.row(
-            InlineKeyboardButton(
-                text="❌ Отменить запись",
-                callback_data=f"events:signoff:{event.id}:{page}:{show_past}",
-            )
+        rows.append(
+            [
+                InlineKeyboardButton(
+                    text="❌ Отменить запись",
+                    callback_data=_CB_SIGNOFF(event_id, page, show_past),
+                )
+            ]
         )
 
-    if event.registration_link:
-        builder.row(InlineKeyboardButton(text="Запись", url=event.registration_link))
+    if registration_link:
+        rows.append([InlineKeyboardButton(text="Запись", url=registration_link)])
 
-    if can_manage_event(viewer_id, event):
-        builder.row(
-            InlineKeyboardButton(
-                text="✏️ Изменить",
-                callback_data=f"events:edit:{event.id}:{page}:{show_past}",
-            )
+    if can_manage:
+        rows.append(
+            [
+                InlineKeyboardButton(
+                    text="✏️ Изменить",
+                    callback_data=_CB_EDIT(event_id, page, show_past),
+                )
+            ]
         )
-        builder.row(
-            InlineKeyboardButton(
-                text="👥 Участники",
-                callback_data=f"events:participants:{event.id}:{page}:{show_past}:0",
-            )
+        rows.append(
+            [
+                InlineKeyboardButton(
+                    text="👥 Участники",
+                    callback_data=_CB_PARTICIPANTS(event_id, page, show_past),
+                )
+            ]
         )
 
-    builder.row(
-        InlineKeyboardButton(
-            text=BACK, callback_data=f"events:list:{page}:{show_past}"
-        )
+    rows.append(
+        [InlineKeyboardButton(text=BACK, callback_data=_CB_LIST(page, show_past))]
+    )
+    return InlineKeyboardMarkup(inline_keyboard=rows)
+
+
+def build_event_keyboard(
+    event: EventRecord,
+    viewer_id: int,
+    page: int,
+    show_past: int,
+) -> InlineKeyboardMarkup:
+    # Everything that shapes the markup is in the cache key, so entries can
+    # never go stale; repeat renders of the same view reuse one markup.
+    return _event_keyboard_cached(
+        event.id,
+        event.status,
+        is_user_registered(event, viewer_id),
+        can_manage_event(viewer_id, event),
+        event.registration_link,
+        page,
+        show_past,
     )
-    return builder.as_markup()
 
 
 async def update_event_message(
@@ -127,11 +201,15 @@ async def update_event_message(
     event: EventRecord,
     page: int,
     show_past: int,
-    extra_lines: Optional[list[str]] = None,
+    extra_lines: Optional[Sequence[str]] = None,
     keyboard_override: Optional[InlineKeyboardMarkup] = None,
 ) -> None:
     keyboard = keyboard_override or build_event_keyboard(event, user_id, page, show_past)
     text = format_event_details(event, extra_lines)
+    key = (chat_id, message_id)
+    digest = render_digest(text, keyboard)
+    if render_is_duplicate(key, digest):
+        return
     try:
         await bot.edit_message_text(
             text,
@@ -141,7 +219,14 @@ async def update_event_message(
             disable_web_page_preview=True,
         )
     except TelegramBadRequest as exc:
-        logger.warning(f"Failed to render event details: {exc}")
+        if "message is not modified" in str(exc):
+            # The displayed payload already matches; record it and move on.
+            remember_render(key, digest)
+        else:
+            forget_render(key)
+            logger.warning(f"Failed to render event details: {exc}")
+    else:
+        remember_render(key, digest)
 
 
 async def render_event_details_message(
@@ -157,35 +242,73 @@ async def render_event_details_message(
     )
 
 
-async def notify_admins(event: EventRecord) -> None:
-    if not ADMIN_IDS:
-        return
-    keyboard = InlineKeyboardMarkup(
+# Strong refs keep fire-and-forget tasks alive until done (asyncio only
+# holds weak references to running tasks).
+_background_tasks: set[asyncio.Task] = set()
+
+
+async def _logged(coro) -> None:
+    try:
+        await coro
+    except Exception:  # noqa: BLE001
+        logger.exception("Background notification failed")
+
+
+def spawn_notification(coro) -> asyncio.Task:
+    """Run a notification coroutine in the background, logging failures."""
+    task = asyncio.create_task(_logged(coro))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+# Bound-method templates: formatting the callback data is all that differs
+# between moderation keyboards, and the one markup is shared by every admin.
+_CB_APPROVE = "events:approve:{0}".format
+_CB_REJECT = "events:reject:{0}".format
+
+
+def _moderation_keyboard(event_id: Optional[int]) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(
         inline_keyboard=[
             [
                 InlineKeyboardButton(
-                    text="✅ Одобрить", callback_data=f"events:approve:{event.id}"
+                    text="✅ Одобрить", callback_data=_CB_APPROVE(event_id)
                 )
             ],
             [
                 InlineKeyboardButton(
-                    text="🚫 Отклонить", callback_data=f"events:reject:{event.id}"
+                    text="🚫 Отклонить", callback_data=_CB_REJECT(event_id)
                 )
             ],
         ]
     )
-    messages = []
-    for admin_id in ADMIN_IDS:
-        try:
-            msg = await bot.send_message(
+
+
+async def notify_admins(event: EventRecord) -> None:
+    if not ADMIN_IDS:
+        return
+    keyboard = _moderation_keyboard(event.id)
+    text = format_event_details(event)
+    # Concurrent sends: total latency is one round-trip instead of one per admin.
+    results = await asyncio.gather(
+        *(
+            bot.send_message(
                 admin_id,
-                format_event_details(event),
+                text,
                 reply_markup=keyboard,
                 disable_web_page_preview=True,
             )
-            messages.append({"chat_id": admin_id, "message_id": msg.message_id})
-        except Exception as exc:  # noqa: BLE001
-            logger.error(f"Failed to notify admin {admin_id}: {exc}")
+            for admin_id in ADMIN_IDS
+        ),
+        return_exceptions=True,
+    )
+    messages = []
+    for admin_id, result in zip(ADMIN_IDS, results):
+        if isinstance(result, BaseException):
+            logger.error(f"Failed to notify admin {admin_id}: {result}")
+        else:
+            messages.append({"chat_id": admin_id, "message_id": result.message_id})
     if messages:
         events_repo().update(event.id or 0, {"moderation_messages": messages})
 
@@ -193,21 +316,31 @@ async def notify_admins(event: EventRecord) -> None:
 async def update_moderation_messages(event: EventRecord) -> None:
     if not event.moderation_messages:
         return
-    for entry in event.moderation_messages:
-        chat_id = entry.get("chat_id")
-        message_id = entry.get("message_id")
-        if not (chat_id and message_id):
-            continue
-        try:
-            await bot.edit_message_text(
-                format_event_details(event),
-                chat_id=chat_id,
-                message_id=message_id,
+    text = format_event_details(event)
+    entries = [
+        entry
+        for entry in event.moderation_messages
+        if entry.get("chat_id") and entry.get("message_id")
+    ]
+    results = await asyncio.gather(
+        *(
+            bot.edit_message_text(
+                text,
+                chat_id=entry["chat_id"],
+                message_id=entry["message_id"],
                 reply_markup=None,
                 disable_web_page_preview=True,
             )
-        except TelegramBadRequest as exc:
-            logger.warning(f"Failed to update moderation message: {exc}")
+            for entry in entries
+        ),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, TelegramBadRequest):
+            if "message is not modified" not in str(result):
+                logger.warning(f"Failed to update moderation message: {result}")
+        elif isinstance(result, BaseException):
+            raise result
 
 
 async def notify_creator(event: EventRecord, text: str) -> None:
@@ -221,19 +354,13 @@ async def notify_creator(event: EventRecord, text: str) -> None:
 
 @router.callback_query(F.data.startswith("events:details:"))
 async def cb_event_details(callback: CallbackQuery) -> None:
-    parts = callback.data.split(":")
-    if len(parts) != 5:
-        await callback.answer()
-        return
-    try:
-        event_id = int(parts[2])
-        page = int(parts[3])
-        show_past = int(parts[4])
-    except ValueError:
-        await callback.answer()
+    match = _DETAILS_RE.match(callback.data or "")
+    if not match:
+        await callback.answer(cache_time=1)
         return
+    event_id, page, show_past = map(int, match.groups())
 
-    event = events_repo().get(event_id)
+    event = get_event_cached(event_id)
     if not event:
         await callback.answer("Событие не найдено или ещё не опубликовано.", show_alert=True)
         return
@@ -242,24 +369,18 @@ async def cb_event_details(callback: CallbackQuery) -> None:
         return
 
     await render_event_details_message(callback, event, page, show_past)
-    await callback.answer()
+    await callback.answer(cache_time=1)
 
 
 @router.callback_query(F.data.startswith("events:signup:"))
 async def cb_events_signup(callback: CallbackQuery) -> None:
-    parts = callback.data.split(":")
-    if len(parts) != 5:
-        await callback.answer()
-        return
-    try:
-        event_id = int(parts[2])
-        page = int(parts[3])
-        show_past = int(parts[4])
-    except ValueError:
+    match = _SIGNUP_RE.match(callback.data or "")
+    if not match:
         await callback.answer()
         return
+    event_id, page, show_past = map(int, match.groups())
 
-    event = events_repo().get(event_id)
+    event = get_event_cached(event_id)
     if not event:
         await callback.answer("Событие не найдено.", show_alert=True)
         return
@@ -276,6 +397,7 @@ async def cb_events_signup(callback: CallbackQuery) -> None:
     if not updated:
         await callback.answer("Не удалось обновить событие.", show_alert=True)
         return
+    remember_event(updated)
 
     await render_event_details_message(callback, updated, page, show_past)
     await callback.answer("Вы записались на событие.")
@@ -283,23 +405,17 @@ async def cb_events_signup(callback: CallbackQuery) -> None:
 
 @router.callback_query(F.data.startswith("events:signoff:"))
 async def cb_events_signoff(callback: CallbackQuery) -> None:
-    parts = callback.data.split(":")
-    if len(parts) != 5:
-        await callback.answer()
-        return
-    try:
-        event_id = int(parts[2])
-        page = int(parts[3])
-        show_past = int(parts[4])
-    except ValueError:
+    match = _SIGNOFF_RE.match(callback.data or "")
+    if not match:
         await callback.answer()
         return
+    event_id, page, show_past = map(int, match.groups())
 
-    event = events_repo().get(event_id)
+    event = get_event_cached(event_id)
     if not event:
         await callback.answer("Событие не найдено.", show_alert=True)
         return
-    if callback.from_user.id not in event.attendees:
+    if callback.from_user.id not in event.attendee_set():
         await callback.answer("Вы не записаны на это событие.")
         return
 
@@ -308,6 +424,7 @@ async def cb_events_signoff(callback: CallbackQuery) -> None:
     if not updated:
         await callback.answer("Не удалось обновить событие.", show_alert=True)
         return
+    remember_event(updated)
 
     await render_event_details_message(callback, updated, page, show_past)
     await callback.answer("Запись отменена.")
@@ -315,20 +432,13 @@ async def cb_events_signoff(callback: CallbackQuery) -> None:
 
 @router.callback_query(F.data.startswith("events:participants:"))
 async def cb_events_participants(callback: CallbackQuery) -> None:
-    parts = callback.data.split(":")
-    if len(parts) != 6:
-        await callback.answer()
-        return
-    try:
-        event_id = int(parts[2])
-        event_page = int(parts[3])
-        show_past = int(parts[4])
-        users_page = int(parts[5])
-    except ValueError:
-        await callback.answer()
+    match = _PARTICIPANTS_RE.match(callback.data or "")
+    if not match:
+        await callback.answer(cache_time=1)
         return
+    event_id, event_page, show_past, users_page = map(int, match.groups())
 
-    event = events_repo().get(event_id)
+    event = get_event_cached(event_id)
     if not event:
         await callback.answer("Событие не найдено.", show_alert=True)
         return
@@ -336,27 +446,32 @@ async def cb_events_participants(callback: CallbackQuery) -> None:
         await callback.answer("Недостаточно прав.", show_alert=True)
         return
 
-    attendees = load_event_attendees(event)
-    total = len(attendees)
+    # Pagination is pushed into the users query: only this page's documents
+    # are loaded instead of every attendee followed by a slice.
+    total = len(event.attendee_set())
     total_pages = max(1, (total + PARTICIPANTS_PER_PAGE - 1) // PARTICIPANTS_PER_PAGE)
     users_page = max(0, min(users_page, total_pages - 1))
     start = users_page * PARTICIPANTS_PER_PAGE
-    subset = attendees[start : start + PARTICIPANTS_PER_PAGE]
+    subset = load_event_attendees(event, offset=start, limit=PARTICIPANTS_PER_PAGE)
 
-    lines = [f"👥 <b>Участники события:</b>", f"<i>{escape(event.title)}</i>", ""]
+    # One growing buffer instead of a list of interim strings plus a join;
+    # quote=False keeps escape() on its cheaper path (quotes are fine in
+    # HTML text content).
+    buf = StringIO()
+    buf.write(f"👥 <b>Участники события:</b>\n<i>{escape(event.title, quote=False)}</i>\n")
     if not subset:
-        lines.append("Пока никто не зарегистрировался.")
+        buf.write("\nПока никто не зарегистрировался.")
     else:
         for offset, user in enumerate(subset):
             idx = start + offset + 1
             emoji_idx = number_to_emoji(idx)
-            name = escape(user.get_name() or "Без имени")
+            name = escape(user.get_name() or "Без имени", quote=False)
             username = user.get_username()
             if username:
                 contact = f"@{username}"
             else:
                 contact = f"<code>{user.tg_id}</code>"
-            lines.append(f"{emoji_idx} {name} — {contact}")
+            buf.write(f"\n{emoji_idx} {name} — {contact}")
 
     builder = InlineKeyboardBuilder()
     nav_buttons: list[InlineKeyboardButton] = []
@@ -382,15 +497,28 @@ async def cb_events_participants(callback: CallbackQuery) -> None:
     )
     builder.row(*nav_buttons)
 
+    text = buf.getvalue()
+    markup = builder.as_markup()
+    key = (callback.message.chat.id, callback.message.message_id)
+    digest = render_digest(text, markup)
+    if render_is_duplicate(key, digest):
+        await callback.answer(cache_time=1)
+        return
     try:
         await callback.message.edit_text(
-            "\n".join(lines),
-            reply_markup=builder.as_markup(),
+            text,
+            reply_markup=markup,
             disable_web_page_preview=True,
         )
     except TelegramBadRequest as exc:
-        logger.warning(f"Failed to show participants: {exc}")
-    await callback.answer()
+        if "message is not modified" in str(exc):
+            remember_render(key, digest)
+        else:
+            forget_render(key)
+            logger.warning(f"Failed to show participants: {exc}")
+    else:
+        remember_render(key, digest)
+    await callback.answer(cache_time=1)
 
 
 @router.callback_query(F.data.startswith("events:approve:"))
@@ -398,13 +526,13 @@ async def cb_events_approve(callback: CallbackQuery) -> None:
     if callback.from_user.id not in ADMIN_IDS:
         await callback.answer("Недостаточно прав.", show_alert=True)
         return
-    try:
-        event_id = int(callback.data.split(":")[2])
-    except (IndexError, ValueError):
+    match = _APPROVE_RE.match(callback.data or "")
+    if not match:
         await callback.answer()
         return
+    event_id = int(match.group(1))
 
-    event = events_repo().get(event_id)
+    event = get_event_cached(event_id)
     if not event:
         await callback.answer("Событие не найдено.", show_alert=True)
         return
@@ -424,11 +552,14 @@ async def cb_events_approve(callback: CallbackQuery) -> None:
     if not updated:
         await callback.answer("Не удалось обновить событие.", show_alert=True)
         return
+    remember_event(updated)
 
-    await update_moderation_messages(updated)
-    await notify_creator(
-        updated,
-        f"Ваше мероприятие «{updated.title}» одобрено и доступно в /events.",
+    spawn_notification(update_moderation_messages(updated))
+    spawn_notification(
+        notify_creator(
+            updated,
+            f"Ваше мероприятие «{updated.title}» одобрено и доступно в /events.",
+        )
     )
     await callback.answer("Событие одобрено.")
 
@@ -438,13 +569,13 @@ async def cb_events_reject(callback: CallbackQuery) -> None:
     if callback.from_user.id not in ADMIN_IDS:
         await callback.answer("Недостаточно прав.", show_alert=True)
         return
-    try:
-        event_id = int(callback.data.split(":")[2])
-    except (IndexError, ValueError):
+    match = _REJECT_RE.match(callback.data or "")
+    if not match:
         await callback.answer()
         return
+    event_id = int(match.group(1))
 
-    event = events_repo().get(event_id)
+    event = get_event_cached(event_id)
     if not event:
         await callback.answer("Событие не найдено.", show_alert=True)
         return
@@ -464,10 +595,13 @@ async def cb_events_reject(callback: CallbackQuery) -> None:
     if not updated:
         await callback.answer("Не удалось обновить событие.", show_alert=True)
         return
+    remember_event(updated)
 
-    await update_moderation_messages(updated)
-    await notify_creator(
-        updated,
-        f"Ваше мероприятие «{updated.title}» отклонено. Вы можете обновить данные и отправить на модерацию повторно.",
+    spawn_notification(update_moderation_messages(updated))
+    spawn_notification(
+        notify_creator(
+            updated,
+            f"Ваше мероприятие «{updated.title}» отклонено. Вы можете обновить данные и отправить на модерацию повторно.",
+        )
     )
     await callback.answer("Событие отклонено.")
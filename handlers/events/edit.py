@@ -1,14 +1,18 @@
 from __future__ import annotations
 
-from datetime import datetime
+import asyncio
+import re
+from dataclasses import replace
+from datetime import date as dt_date, datetime, time as dt_time
+from functools import lru_cache
 from html import escape
-from typing import Optional
+from typing import Any, Iterable, NamedTuple, Optional, Sequence
 
 from aiogram import F, Router
 from aiogram.exceptions import TelegramBadRequest
+from aiogram.filters import StateFilter
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, Message
-from aiogram.utils.keyboard import InlineKeyboardBuilder
 from loguru import logger
 
 from bot_instance import bot
@@ -19,13 +23,22 @@ from states.events import EventEdit
 from .common import (
     TAG_ORDER,
     TAG_TITLE_BY_SLUG,
+    aget_event_cached,
     can_manage_event,
     events_repo,
+    forget_render,
+    get_event_cached,
+    invalidate_event_cache,
     normalize_tags,
+    remember_render,
+    render_digest,
+    render_is_duplicate,
+    update_event_record,
 )
 from .details import (
     notify_admins,
     render_event_details_message,
+    spawn_notification,
     update_event_message,
     update_moderation_messages,
 )
@@ -33,6 +46,34 @@ from .listing import edit_events_message
 
 router = Router()
 
+# One compiled pattern covers every callback in this module: the optional
+# slug segment carries the field key (edit_field) or tag slug (edit_tags_toggle),
+# the numeric tail is always event_id:page:show_past. Matching once in C
+# replaces the split/len/int-triad boilerplate each handler used to repeat.
+_CB_RE = re.compile(
+    r"^events:"
+    r"(?:edit_tags_toggle|edit_tags_done|edit_tags|edit_field|edit_menu|edit_close"
+    r"|edit|setlink|delete_confirm|delete|send_back_confirm|send_back):"
+    r"(?:(?P<slug>[a-z_]+):)?(?P<event_id>\d+):(?P<page>\d+):(?P<show_past>\d+)$"
+)
+
+
+class _CbParts(NamedTuple):
+    slug: Optional[str]
+    event_id: int
+    page: int
+    show_past: int
+
+
+def _parse_cb(data: Optional[str]) -> Optional[_CbParts]:
+    match = _CB_RE.match(data or "")
+    if not match:
+        return None
+    return _CbParts(
+        match["slug"], int(match["event_id"]), int(match["page"]), int(match["show_past"])
+    )
+
+
 FIELD_PROMPTS = {
     "title": "Введите новое название события.",
     "date": "Введите новую дату в формате ДД.ММ.ГГГГ.",
@@ -42,6 +83,35 @@ FIELD_PROMPTS = {
     "description": "Введите новое описание.",
 }
 
+# Подсказки статичны — экранируем и оборачиваем их один раз при импорте,
+# чтобы не гонять html.escape на каждом показе формы.
+_FIELD_EXTRA = {key: (f"✏️ {escape(value)}",) for key, value in FIELD_PROMPTS.items()}
+
+
+# Раскладка меню редактирования постоянна — меняются только числа в
+# callback_data, поэтому держим шаблоны (текст, callback-шаблон) на уровне
+# модуля и при рендере лишь подставляем event_id/page/show_past.
+_EDIT_MENU_ROWS: tuple[tuple[tuple[str, str], ...], ...] = (
+    (
+        ("🏷 Название", "events:edit_field:title:{eid}:{p}:{sp}"),
+        ("📅 Дата", "events:edit_field:date:{eid}:{p}:{sp}"),
+    ),
+    (
+        ("🕒 Начало", "events:edit_field:start_time:{eid}:{p}:{sp}"),
+        ("🕒 Конец", "events:edit_field:end_time:{eid}:{p}:{sp}"),
+    ),
+    (
+        ("📍 Аудитория", "events:edit_field:location:{eid}:{p}:{sp}"),
+        ("📝 Описание", "events:edit_field:description:{eid}:{p}:{sp}"),
+    ),
+    (("🎯 Теги", "events:edit_tags:{eid}:{p}:{sp}"),),
+    (("🔗 Ссылка", "events:setlink:{eid}:{p}:{sp}"),),
+)
+_DELETE_BUTTON = ("🗑 Удалить", "events:delete:{eid}:{p}:{sp}")
+_SEND_BACK_BUTTON = ("✳️ На доработку", "events:send_back:{eid}:{p}:{sp}")
+_PARTICIPANTS_BUTTON = ("👥 Участники", "events:participants:{eid}:{p}:{sp}:0")
+_CLOSE_BUTTON = ("⬅️ Назад", "events:edit_close:{eid}:{p}:{sp}")
+
 
 def _build_event_edit_keyboard(
     event: EventRecord,
@@ -49,65 +119,41 @@ def _build_event_edit_keyboard(
     show_past: int,
     user_id: int,
 ) -> InlineKeyboardMarkup:
-    builder = InlineKeyboardBuilder()
-    builder.row(
-        InlineKeyboardButton(
-            text="🏷 Название", callback_data=f"events:edit_field:title:{event.id}:{page}:{show_past}"
-        ),
-        InlineKeyboardButton(
-            text="📅 Дата", callback_data=f"events:edit_field:date:{event.id}:{page}:{show_past}"
-        ),
-    )
-    builder.row(
-        InlineKeyboardButton(
-            text="🕒 Начало", callback_data=f"events:edit_field:start_time:{event.id}:{page}:{show_past}"
-        ),
-        InlineKeyboardButton(
-            text="🕒 Конец", callback_data=f"events:edit_field:end_time:{event.id}:{page}:{show_past}"
-        ),
-    )
-    builder.row(
-        InlineKeyboardButton(
-            text="📍 Аудитория", callback_data=f"events:edit_field:location:{event.id}:{page}:{show_past}"
-        ),
-        InlineKeyboardButton(
-            text="📝 Описание", callback_data=f"events:edit_field:description:{event.id}:{page}:{show_past}"
-        ),
-    )
-    builder.row(
-        InlineKeyboardButton(
-            text="🎯 Теги", callback_data=f"events:edit_tags:{event.id}:{page}:{show_past}"
-        )
-    )
-    builder.row(
-        InlineKeyboardButton(
-            text="🔗 Ссылка", callback_data=f"events:setlink:{event.id}:{page}:{show_past}"
-        )
-    )
-    action_buttons = [
-        InlineKeyboardButton(
-            text="🗑 Удалить", callback_data=f"events:delete:{event.id}:{page}:{show_past}"
+    eid, p, sp = event.id, page, show_past
+
+    def _button(template: tuple[str, str]) -> InlineKeyboardButton:
+        text, callback_template = template
+        return InlineKeyboardButton(
+            text=text, callback_data=callback_template.format(eid=eid, p=p, sp=sp)
         )
-    ]
+
+    rows = [[_button(template) for template in row] for row in _EDIT_MENU_ROWS]
+    action_buttons = [_button(_DELETE_BUTTON)]
     if user_id in ADMIN_IDS:
-        action_buttons.append(
-            InlineKeyboardButton(
-                text="✳️ На доработку",
-                callback_data=f"events:send_back:{event.id}:{page}:{show_past}",
-            )
-        )
-    builder.row(*action_buttons)
-    builder.row(
-        InlineKeyboardButton(
-            text="👥 Участники", callback_data=f"events:participants:{event.id}:{page}:{show_past}:0"
-        )
-    )
-    builder.row(
-        InlineKeyboardButton(
-            text="⬅️ Назад", callback_data=f"events:edit_close:{event.id}:{page}:{show_past}"
-        )
+        action_buttons.append(_button(_SEND_BACK_BUTTON))
+    rows.append(action_buttons)
+    rows.append([_button(_PARTICIPANTS_BUTTON)])
+    rows.append([_button(_CLOSE_BUTTON)])
+    return InlineKeyboardMarkup(inline_keyboard=rows)
+
+
+def _confirm_keyboard(action: str, event_id: int, page: int, show_past: int) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(
+        inline_keyboard=[
+            [
+                InlineKeyboardButton(
+                    text="✅ Подтвердить",
+                    callback_data=f"events:{action}:{event_id}:{page}:{show_past}",
+                )
+            ],
+            [
+                InlineKeyboardButton(
+                    text="❌ Отменить",
+                    callback_data=f"events:edit_menu:{event_id}:{page}:{show_past}",
+                )
+            ],
+        ]
     )
-    return builder.as_markup()
 
 
 def _field_keyboard(event_id: int, page: int, show_past: int) -> InlineKeyboardMarkup:
@@ -123,56 +169,133 @@ def _field_keyboard(event_id: int, page: int, show_past: int) -> InlineKeyboardM
     )
 
 
-def _tags_keyboard(tags: list[str], event_id: int, page: int, show_past: int) -> InlineKeyboardMarkup:
-    builder = InlineKeyboardBuilder()
-    selected = set(tags)
-    for slug in TAG_ORDER:
-        title = TAG_TITLE_BY_SLUG.get(slug, slug)
-        prefix = "✅" if slug in selected else "⬜️"
-        builder.row(
+# Черновик выбора тегов храним в FSM одним целым: бит i соответствует
+# TAG_ORDER[i]. Тап по тегу — это XOR бита вместо пересборки списка,
+# а в хранилище уезжает одно число вместо JSON-списка.
+_TAG_INDEX = {slug: index for index, slug in enumerate(TAG_ORDER)}
+
+
+def _mask_from_tags(tags: Iterable[str]) -> int:
+    mask = 0
+    for slug in tags:
+        index = _TAG_INDEX.get(slug)
+        if index is not None:
+            mask |= 1 << index
+    return mask
+
+
+def _tags_from_mask(mask: int) -> list[str]:
+    return [slug for index, slug in enumerate(TAG_ORDER) if mask >> index & 1]
+
+
+def _tags_keyboard(mask: int, event_id: int, page: int, show_past: int) -> InlineKeyboardMarkup:
+    rows = [
+        [
             InlineKeyboardButton(
-                text=f"{prefix} {title}",
+                text=f"{'✅' if mask >> index & 1 else '⬜️'} {TAG_TITLE_BY_SLUG.get(slug, slug)}",
                 callback_data=f"events:edit_tags_toggle:{slug}:{event_id}:{page}:{show_past}",
             )
-        )
-    builder.row(
-        InlineKeyboardButton(
-            text="Готово",
-            callback_data=f"events:edit_tags_done:{event_id}:{page}:{show_past}",
-        ),
-        InlineKeyboardButton(
-            text=BACK,
-            callback_data=f"events:edit_menu:{event_id}:{page}:{show_past}",
-        ),
+        ]
+        for index, slug in enumerate(TAG_ORDER)
+    ]
+    rows.append(
+        [
+            InlineKeyboardButton(
+                text="Готово",
+                callback_data=f"events:edit_tags_done:{event_id}:{page}:{show_past}",
+            ),
+            InlineKeyboardButton(
+                text=BACK,
+                callback_data=f"events:edit_menu:{event_id}:{page}:{show_past}",
+            ),
+        ]
     )
-    return builder.as_markup()
+    return InlineKeyboardMarkup(inline_keyboard=rows)
 
 
-def _tags_extra_lines(tags: list[str]) -> list[str]:
-    titles = [TAG_TITLE_BY_SLUG.get(tag, tag) for tag in tags]
-    pretty = ", ".join(titles) if titles else "–"
-    return [
+# Быстрые клики по тегам шлют editMessageText чаще лимита «1 сообщение в
+# секунду на чат». Каждый тап лишь обновляет отложенный payload; реальный
+# edit уходит один раз после короткой паузы.
+_EDIT_DEBOUNCE = 0.25
+_pending_tag_edits: dict[tuple[int, int], dict[str, Any]] = {}
+_tag_edit_flushers: dict[tuple[int, int], asyncio.Task] = {}
+
+
+async def _flush_tag_edit(key: tuple[int, int]) -> None:
+    await asyncio.sleep(_EDIT_DEBOUNCE)
+    payload = _pending_tag_edits.pop(key, None)
+    _tag_edit_flushers.pop(key, None)
+    if payload is None:
+        return
+    await update_event_message(**payload)
+
+
+def _schedule_tag_edit(key: tuple[int, int], payload: dict[str, Any]) -> None:
+    _pending_tag_edits[key] = payload
+    if key not in _tag_edit_flushers:
+        _tag_edit_flushers[key] = asyncio.create_task(_flush_tag_edit(key))
+
+
+def _cancel_pending_tag_edit(chat_id: int, message_id: int) -> None:
+    # Дальше сообщение перерисует другой обработчик — отложенный edit с
+    # клавиатурой тегов не должен перетереть его результат.
+    _pending_tag_edits.pop((chat_id, message_id), None)
+
+
+# Подсказки отдаём кортежами: дальше они только итерируются при сборке
+# текста, а кортеж не требует копий и годится в ключ кэша деталей как есть.
+# Реальных комбинаций масок мало, так что lru_cache быстро превращает сборку
+# строки на каждый тап в чтение словаря.
+@lru_cache(maxsize=256)
+def _tags_extra_lines(mask: int) -> tuple[str, ...]:
+    pretty = ", ".join(
+        TAG_TITLE_BY_SLUG.get(slug, slug) for slug in _tags_from_mask(mask)
+    ) or "–"
+    return (
         "🎯 Используйте кнопки, чтобы отметить подходящие группы.",
         f"🔽 Текущий выбор: {pretty}",
-    ]
+    )
 
 
-def _link_extra_lines(event: EventRecord, error: Optional[str] = None) -> list[str]:
+def _link_extra_lines(event: EventRecord, error: Optional[str] = None) -> tuple[str, ...]:
     current = event.registration_link.strip() if event.registration_link else ""
-    lines = [
+    lines = (
         "🔗 Отправьте ссылку сообщением в этот чат.",
         "➖ Отправьте '-' чтобы убрать ссылку.",
-    ]
-    if current:
-        lines.append(f"📎 Текущая ссылка: {escape(current)}")
-    else:
-        lines.append("📎 Текущая ссылка: не указана.")
-    if error:
-        lines.append(f"⚠️ {escape(error)}")
-    return lines
+        f"📎 Текущая ссылка: {escape(current)}" if current else "📎 Текущая ссылка: не указана.",
+    )
+    return (*lines, f"⚠️ {escape(error)}") if error else lines
+
+
+async def _enter_state(state: FSMContext, new_state: Any, data: dict[str, Any]) -> None:
+    # Точки входа в режимы редактирования каждый раз записывают контекст
+    # целиком, поэтому вместо clear/set_state/update_data (с лишним чтением
+    # текущих данных) делаем две записи: состояние и полный словарь.
+    await state.set_state(new_state)
+    await state.set_data(data)
+
+
+class _RenderCtx(NamedTuple):
+    chat_id: int
+    message_id: int
+    user_id: int
+    page: int
+    show_past: int
+
+
+def _ctx_from_callback(callback: CallbackQuery, cb: _CbParts) -> _RenderCtx:
+    # В callback-обработчиках весь контекст уже в руках — собирать его из
+    # FSM-хранилища заново незачем.
+    return _RenderCtx(
+        callback.message.chat.id,
+        callback.message.message_id,
+        callback.from_user.id,
+        cb.page,
+        cb.show_past,
+    )
 
 
-async def _get_context(state: FSMContext) -> Optional[tuple[EventRecord, int, int, int, int, int]]:
+async def _get_context(state: FSMContext) -> Optional[tuple[EventRecord, _RenderCtx]]:
     data = await state.get_data()
     event_id = data.get("edit_event_id")
     chat_id = data.get("edit_chat_id")
@@ -182,103 +305,144 @@ async def _get_context(state: FSMContext) -> Optional[tuple[EventRecord, int, in
     show_past = int(data.get("edit_show_past", 0) or 0)
     if event_id is None or chat_id is None or message_id is None or user_id is None:
         return None
-    event = events_repo().get(int(event_id))
+    event = get_event_cached(int(event_id))
     if not event:
         return None
-    return event, chat_id, message_id, user_id, page, show_past
+    return event, _RenderCtx(chat_id, message_id, user_id, page, show_past)
 
 
 async def _render_menu(
-    state: FSMContext,
+    ctx: _RenderCtx,
     event: EventRecord,
     *,
-    extra_lines: Optional[list[str]] = None,
+    extra_lines: Optional[Sequence[str]] = None,
 ) -> None:
-    context = await _get_context(state)
-    if not context:
-        return
-    _, chat_id, message_id, user_id, page, show_past = context
     await update_event_message(
-        chat_id=chat_id,
-        message_id=message_id,
-        user_id=user_id,
+        chat_id=ctx.chat_id,
+        message_id=ctx.message_id,
+        user_id=ctx.user_id,
         event=event,
-        page=page,
-        show_past=show_past,
-        keyboard_override=_build_event_edit_keyboard(event, page, show_past, user_id),
+        page=ctx.page,
+        show_past=ctx.show_past,
+        keyboard_override=_build_event_edit_keyboard(event, ctx.page, ctx.show_past, ctx.user_id),
         extra_lines=extra_lines,
     )
 
 
 async def _show_field_prompt(
-    state: FSMContext,
+    ctx: _RenderCtx,
     event: EventRecord,
     field_key: str,
     error: Optional[str] = None,
 ) -> None:
-    context = await _get_context(state)
-    if not context:
-        return
-    _, chat_id, message_id, user_id, page, show_past = context
-    prompt = FIELD_PROMPTS.get(field_key, "")
-    extra = [f"✏️ {escape(prompt)}"] if prompt else []
+    extra = _FIELD_EXTRA.get(field_key, ())
     if error:
-        extra.append(f"⚠️ {escape(error)}")
+        extra = (*extra, f"⚠️ {escape(error)}")
     await update_event_message(
-        chat_id=chat_id,
-        message_id=message_id,
-        user_id=user_id,
+        chat_id=ctx.chat_id,
+        message_id=ctx.message_id,
+        user_id=ctx.user_id,
         event=event,
-        page=page,
-        show_past=show_past,
+        page=ctx.page,
+        show_past=ctx.show_past,
         extra_lines=extra or None,
-        keyboard_override=_field_keyboard(event.id, page, show_past),
+        keyboard_override=_field_keyboard(event.id, ctx.page, ctx.show_past),
     )
 
 
 async def _show_link_prompt(
-    state: FSMContext,
+    ctx: _RenderCtx,
     event: EventRecord,
     *,
     error: Optional[str] = None,
 ) -> None:
-    context = await _get_context(state)
-    if not context:
-        return
-    _, chat_id, message_id, user_id, page, show_past = context
     await update_event_message(
-        chat_id=chat_id,
-        message_id=message_id,
-        user_id=user_id,
+        chat_id=ctx.chat_id,
+        message_id=ctx.message_id,
+        user_id=ctx.user_id,
         event=event,
-        page=page,
-        show_past=show_past,
+        page=ctx.page,
+        show_past=ctx.show_past,
         extra_lines=_link_extra_lines(event, error),
-        keyboard_override=_field_keyboard(event.id, page, show_past),
+        keyboard_override=_field_keyboard(event.id, ctx.page, ctx.show_past),
     )
 
 
-async def _process_field_input(message: Message, state: FSMContext, field_key: str) -> None:
-    context = await _get_context(state)
-    if not context:
-        try:
-            await message.delete()
-        except TelegramBadRequest:
-            pass
+async def _edit_prompt(callback: CallbackQuery, text: str, keyboard: InlineKeyboardMarkup) -> None:
+    # Подтверждающие экраны редактируются в обход update_event_message,
+    # поэтому сверяемся с общим кэшем отпечатков сами: повторный тап по той
+    # же кнопке не должен уходить в Telegram ради «message is not modified».
+    key = (callback.message.chat.id, callback.message.message_id)
+    digest = render_digest(text, keyboard)
+    if render_is_duplicate(key, digest):
         return
-    event, _, _, _, page, show_past = context
+    try:
+        await callback.message.edit_text(text, reply_markup=keyboard)
+    except TelegramBadRequest as exc:
+        if "message is not modified" in str(exc):
+            remember_render(key, digest)
+        else:
+            forget_render(key)
+    else:
+        remember_render(key, digest)
 
-    value = (message.text or "").strip()
+
+async def _safe_delete(message: Message) -> None:
     try:
         await message.delete()
     except TelegramBadRequest:
         pass
 
+
+# Форматы фиксированные и крошечные, а опечатки — частый случай: разбираем
+# вручную, не поднимая strptime с его regex-машинерией на каждую ошибку.
+def _parse_ddmmyyyy(value: str) -> Optional[dt_date]:
+    parts = value.split(".")
+    if len(parts) != 3:
+        return None
+    day_str, month_str, year_str = parts
+    if not (0 < len(day_str) <= 2 and 0 < len(month_str) <= 2 and len(year_str) == 4):
+        return None
+    if not (day_str.isdecimal() and month_str.isdecimal() and year_str.isdecimal()):
+        return None
+    try:
+        return dt_date(int(year_str), int(month_str), int(day_str))
+    except ValueError:
+        return None
+
+
+def _parse_hhmm(value: str) -> Optional[dt_time]:
+    parts = value.split(":")
+    if len(parts) != 2:
+        return None
+    hours_str, minutes_str = parts
+    if not (0 < len(hours_str) <= 2 and 0 < len(minutes_str) <= 2):
+        return None
+    # isdecimal, не isdigit: надстрочные и обведённые цифры проходят
+    # isdigit, но роняют int() с ValueError.
+    if not (hours_str.isdecimal() and minutes_str.isdecimal()):
+        return None
+    hours = int(hours_str)
+    minutes = int(minutes_str)
+    if hours > 23 or minutes > 59:
+        return None
+    return dt_time(hours, minutes)
+
+
+async def _process_field_input(message: Message, state: FSMContext, field_key: str) -> None:
+    # Пользователь не ждёт удаления своего сообщения — пусть оно идёт
+    # параллельно с разбором и перерисовкой меню.
+    spawn_notification(_safe_delete(message))
+    context = await _get_context(state)
+    if not context:
+        return
+    event, ctx = context
+
+    value = (message.text or "").strip()
     if not value:
-        await _show_field_prompt(state, event, field_key, error="Сообщение пустое.")
+        await _show_field_prompt(ctx, event, field_key, error="Сообщение пустое.")
         return
 
-    repo = events_repo()
     updates: dict[str, str] = {}
     prompt = FIELD_PROMPTS.get(field_key, "")
 
@@ -289,10 +453,9 @@ async def _process_field_input(message: Message, state: FSMContext, field_key: s
     elif field_key == "description":
         updates["short_description"] = value
     elif field_key == "date":
-        try:
-            parsed_date = datetime.strptime(value, "%d.%m.%Y").date()
-        except ValueError:
-            await _show_field_prompt(state, event, field_key, error="Используйте формат ДД.ММ.ГГГГ.")
+        parsed_date = _parse_ddmmyyyy(value)
+        if parsed_date is None:
+            await _show_field_prompt(ctx, event, field_key, error="Используйте формат ДД.ММ.ГГГГ.")
             return
         start_dt = event.scheduled_datetime()
         end_dt = event.end_datetime()
@@ -303,250 +466,159 @@ async def _process_field_input(message: Message, state: FSMContext, field_key: s
         if end_dt:
             new_end = end_dt.replace(year=parsed_date.year, month=parsed_date.month, day=parsed_date.day)
             if new_end <= new_start:
-                await _show_field_prompt(state, event, field_key, error="Дата делает время окончания раньше начала.")
+                await _show_field_prompt(ctx, event, field_key, error="Дата делает время окончания раньше начала.")
                 return
             updates["ends_at"] = new_end.isoformat()
         updates["starts_at"] = new_start.isoformat()
     elif field_key in {"start_time", "end_time"}:
-        try:
-            parsed_time = datetime.strptime(value, "%H:%M").time()
-        except ValueError:
-            await _show_field_prompt(state, event, field_key, error="Используйте формат ЧЧ:ММ.")
+        parsed_time = _parse_hhmm(value)
+        if parsed_time is None:
+            await _show_field_prompt(ctx, event, field_key, error="Используйте формат ЧЧ:ММ.")
             return
         base_date = (event.scheduled_datetime() or datetime.now()).date()
         if field_key == "start_time":
             new_start = datetime.combine(base_date, parsed_time)
             end_dt = event.end_datetime()
             if end_dt and new_start >= end_dt:
-                await _show_field_prompt(state, event, field_key, error="Время начала не может быть позже окончания.")
+                await _show_field_prompt(ctx, event, field_key, error="Время начала не может быть позже окончания.")
                 return
             updates["starts_at"] = new_start.isoformat()
         else:
             new_end = datetime.combine(base_date, parsed_time)
             start_dt = event.scheduled_datetime()
             if start_dt and new_end <= start_dt:
-                await _show_field_prompt(state, event, field_key, error="Время окончания должно быть позже начала.")
+                await _show_field_prompt(ctx, event, field_key, error="Время окончания должно быть позже начала.")
                 return
             updates["ends_at"] = new_end.isoformat()
     else:
         return
 
-    updated = repo.update(event.id, updates)
+    updated = update_event_record(event.id, updates)
     if not updated:
-        await _show_field_prompt(state, event, field_key, error="Не удалось обновить событие.")
+        await _show_field_prompt(ctx, event, field_key, error="Не удалось обновить событие.")
         return
 
-    await state.set_state(EventEdit.menu)
-    await state.update_data(edit_field=None)
-    await _render_menu(state, updated)
+    await _enter_state(state, EventEdit.menu, {})
+    await _render_menu(ctx, updated)
 
 
-@router.callback_query(F.data.startswith("events:edit:"))
-async def cb_events_edit(callback: CallbackQuery, state: FSMContext) -> None:
-    parts = callback.data.split(":")
-    if len(parts) != 5:
-        await callback.answer()
-        return
-    try:
-        event_id = int(parts[2])
-        page = int(parts[3])
-        show_past = int(parts[4])
-    except ValueError:
-        await callback.answer()
-        return
+def _with_event(*, admin_only: bool = False):
+    """Общий пролог callback-обработчиков раздела редактирования.
 
-    event = events_repo().get(event_id)
-    if not event:
-        await callback.answer("Событие не найдено.", show_alert=True)
-        return
-    if not can_manage_event(callback.from_user.id, event):
-        await callback.answer("Недостаточно прав.", show_alert=True)
-        return
+    Разбирает callback_data, достаёт событие через кэш и проверяет права,
+    после чего передаёт управление обработчику с уже готовыми
+    ``(event, cb)`` — вместо дюжины одинаковых строк в каждом хендлере.
+    """
 
-    await state.clear()
-    await state.set_state(EventEdit.menu)
-    await state.update_data(
-        edit_event_id=event_id,
-        edit_page=page,
-        edit_show_past=show_past,
-        edit_chat_id=callback.message.chat.id,
-        edit_message_id=callback.message.message_id,
-        edit_user_id=callback.from_user.id,
-        edit_field=None,
-        edit_tags=None,
-    )
-    await _render_menu(state, event)
-    await callback.answer("Режим редактирования")
+    def decorator(handler):
+        async def wrapper(callback: CallbackQuery, state: FSMContext) -> None:
+            cb = _parse_cb(callback.data)
+            if cb is None:
+                await callback.answer()
+                return
+            event = await aget_event_cached(cb.event_id)
+            if not event:
+                await callback.answer("Событие не найдено.", show_alert=True)
+                return
+            if admin_only:
+                allowed = callback.from_user.id in ADMIN_IDS
+            else:
+                allowed = can_manage_event(callback.from_user.id, event)
+            if not allowed:
+                await callback.answer("Недостаточно прав.", show_alert=True)
+                return
+            await handler(callback, state, event, cb)
 
+        wrapper.__name__ = handler.__name__
+        return wrapper
 
-@router.callback_query(F.data.startswith("events:edit_close:"))
-async def cb_events_edit_close(callback: CallbackQuery, state: FSMContext) -> None:
-    parts = callback.data.split(":")
-    if len(parts) != 5:
-        await callback.answer()
-        return
-    try:
-        event_id = int(parts[2])
-        page = int(parts[3])
-        show_past = int(parts[4])
-    except ValueError:
-        await callback.answer()
-        return
+    return decorator
 
-    event = events_repo().get(event_id)
-    if not event:
-        await callback.answer("Событие не найдено.", show_alert=True)
-        return
-    if not can_manage_event(callback.from_user.id, event):
-        await callback.answer("Недостаточно прав.", show_alert=True)
-        return
 
-    await state.clear()
-    await render_event_details_message(callback, event, page, show_past)
-    await callback.answer("Просмотр события")
+@router.callback_query(F.data.startswith("events:edit:"))
+@_with_event()
+async def cb_events_edit(
+    callback: CallbackQuery, state: FSMContext, event: EventRecord, cb: _CbParts
+) -> None:
+    # Меню живёт только на колбэках: весь контекст приходит в callback_data,
+    # так что в FSM достаточно зафиксировать само состояние.
+    await _enter_state(state, EventEdit.menu, {})
+    await _render_menu(_ctx_from_callback(callback, cb), event)
+    await callback.answer("Режим редактирования")
 
 
-@router.callback_query(F.data.startswith("events:edit_menu:"))
-async def cb_events_edit_menu(callback: CallbackQuery, state: FSMContext) -> None:
-    parts = callback.data.split(":")
-    if len(parts) != 5:
-        await callback.answer()
-        return
-    try:
-        event_id = int(parts[2])
-        page = int(parts[3])
-        show_past = int(parts[4])
-    except ValueError:
-        await callback.answer()
-        return
+@router.callback_query(F.data.startswith("events:edit_close:"))
+@_with_event()
+async def cb_events_edit_close(
+    callback: CallbackQuery, state: FSMContext, event: EventRecord, cb: _CbParts
+) -> None:
+    _cancel_pending_tag_edit(callback.message.chat.id, callback.message.message_id)
+    await state.clear()
+    await render_event_details_message(callback, event, cb.page, cb.show_past)
+    await callback.answer("Просмотр события", cache_time=2)
 
-    event = events_repo().get(event_id)
-    if not event:
-        await callback.answer("Событие не найдено.", show_alert=True)
-        return
-    if not can_manage_event(callback.from_user.id, event):
-        await callback.answer("Недостаточно прав.", show_alert=True)
-        return
 
-    await state.set_state(EventEdit.menu)
-    await state.update_data(
-        edit_event_id=event_id,
-        edit_page=page,
-        edit_show_past=show_past,
-        edit_chat_id=callback.message.chat.id,
-        edit_message_id=callback.message.message_id,
-        edit_user_id=callback.from_user.id,
-        edit_field=None,
-        edit_tags=None,
-    )
-    await _render_menu(state, event)
-    await callback.answer("Редактирование")
+@router.callback_query(F.data.startswith("events:edit_menu:"))
+@_with_event()
+async def cb_events_edit_menu(
+    callback: CallbackQuery, state: FSMContext, event: EventRecord, cb: _CbParts
+) -> None:
+    _cancel_pending_tag_edit(callback.message.chat.id, callback.message.message_id)
+    await _enter_state(state, EventEdit.menu, {})
+    await _render_menu(_ctx_from_callback(callback, cb), event)
+    await callback.answer("Редактирование", cache_time=2)
 
 
 @router.callback_query(F.data.startswith("events:edit_field:"))
-async def cb_events_edit_field(callback: CallbackQuery, state: FSMContext) -> None:
-    parts = callback.data.split(":")
-    if len(parts) != 6:
-        await callback.answer()
-        return
-    field_key = parts[2]
-    try:
-        event_id = int(parts[3])
-        page = int(parts[4])
-        show_past = int(parts[5])
-    except ValueError:
-        await callback.answer()
-        return
-
+@_with_event()
+async def cb_events_edit_field(
+    callback: CallbackQuery, state: FSMContext, event: EventRecord, cb: _CbParts
+) -> None:
+    field_key, event_id, page, show_past = cb
     if field_key not in FIELD_PROMPTS:
         await callback.answer()
         return
 
-    event = events_repo().get(event_id)
-    if not event:
-        await callback.answer("Событие не найдено.", show_alert=True)
-        return
-    if not can_manage_event(callback.from_user.id, event):
-        await callback.answer("Недостаточно прав.", show_alert=True)
-        return
-
-    await state.set_state(getattr(EventEdit, field_key))
-    await state.update_data(
-        edit_event_id=event_id,
-        edit_page=page,
-        edit_show_past=show_past,
-        edit_chat_id=callback.message.chat.id,
-        edit_message_id=callback.message.message_id,
-        edit_user_id=callback.from_user.id,
-        edit_field=field_key,
+    await _enter_state(
+        state,
+        getattr(EventEdit, field_key),
+        dict(
+            edit_event_id=event_id,
+            edit_page=page,
+            edit_show_past=show_past,
+            edit_chat_id=callback.message.chat.id,
+            edit_message_id=callback.message.message_id,
+            edit_user_id=callback.from_user.id,
+            edit_field=field_key,
+        ),
     )
-    await _show_field_prompt(state, event, field_key)
+    await _show_field_prompt(_ctx_from_callback(callback, cb), event, field_key)
     await callback.answer()
 
 
-@router.message(EventEdit.title)
-async def edit_title(message: Message, state: FSMContext) -> None:
-    await _process_field_input(message, state, "title")
-
-
-@router.message(EventEdit.date)
-async def edit_date(message: Message, state: FSMContext) -> None:
-    await _process_field_input(message, state, "date")
-
-
-@router.message(EventEdit.start_time)
-async def edit_start_time(message: Message, state: FSMContext) -> None:
-    await _process_field_input(message, state, "start_time")
-
+# Имя состояния однозначно задаёт редактируемое поле, поэтому вместо шести
+# одинаковых обработчиков (и шести проверок состояния на каждое сообщение)
+# регистрируем один с общим StateFilter.
+_STATE_TO_FIELD = {getattr(EventEdit, field).state: field for field in FIELD_PROMPTS}
 
-@router.message(EventEdit.end_time)
-async def edit_end_time(message: Message, state: FSMContext) -> None:
-    await _process_field_input(message, state, "end_time")
 
-
-@router.message(EventEdit.location)
-async def edit_location(message: Message, state: FSMContext) -> None:
-    await _process_field_input(message, state, "location")
-
-
-@router.message(EventEdit.description)
-async def edit_description(message: Message, state: FSMContext) -> None:
-    await _process_field_input(message, state, "description")
-
-
-@router.callback_query(F.data.startswith("events:edit_tags:"))
-async def cb_edit_tags(callback: CallbackQuery, state: FSMContext) -> None:
-    parts = callback.data.split(":")
-    if len(parts) != 5:
-        await callback.answer()
-        return
-    try:
-        event_id = int(parts[2])
-        page = int(parts[3])
-        show_past = int(parts[4])
-    except ValueError:
-        await callback.answer()
+@router.message(StateFilter(*_STATE_TO_FIELD))
+async def edit_field_input(message: Message, state: FSMContext) -> None:
+    field_key = _STATE_TO_FIELD.get(await state.get_state())
+    if field_key is None:
         return
+    await _process_field_input(message, state, field_key)
 
-    event = events_repo().get(event_id)
-    if not event:
-        await callback.answer("Событие не найдено.", show_alert=True)
-        return
-    if not can_manage_event(callback.from_user.id, event):
-        await callback.answer("Недостаточно прав.", show_alert=True)
-        return
 
+@router.callback_query(F.data.startswith("events:edit_tags:"))
+@_with_event()
+async def cb_edit_tags(
+    callback: CallbackQuery, state: FSMContext, event: EventRecord, cb: _CbParts
+) -> None:
+    event_id, page, show_past = cb.event_id, cb.page, cb.show_past
     tags = normalize_tags(event.tags or TAG_ORDER)
-    await state.set_state(EventEdit.tags)
-    await state.update_data(
-        edit_event_id=event_id,
-        edit_page=page,
-        edit_show_past=show_past,
-        edit_chat_id=callback.message.chat.id,
-        edit_message_id=callback.message.message_id,
-        edit_user_id=callback.from_user.id,
-        edit_tags=tags,
-    )
+    mask = _mask_from_tags(tags)
+    await _enter_state(state, EventEdit.tags, {"edit_tags_mask": mask})
     await update_event_message(
         chat_id=callback.message.chat.id,
         message_id=callback.message.message_id,
@@ -554,232 +626,146 @@ async def cb_edit_tags(callback: CallbackQuery, state: FSMContext) -> None:
         event=event,
         page=page,
         show_past=show_past,
-        extra_lines=_tags_extra_lines(tags),
-        keyboard_override=_tags_keyboard(tags, event_id, page, show_past),
+        extra_lines=_tags_extra_lines(mask),
+        keyboard_override=_tags_keyboard(mask, event_id, page, show_past),
     )
     await callback.answer()
 
 
 @router.callback_query(EventEdit.tags, F.data.startswith("events:edit_tags_toggle:"))
-async def cb_edit_tags_toggle(callback: CallbackQuery, state: FSMContext) -> None:
-    parts = callback.data.split(":")
-    if len(parts) != 6:
-        await callback.answer()
-        return
-    slug = parts[2]
-    try:
-        event_id = int(parts[3])
-        page = int(parts[4])
-        show_past = int(parts[5])
-    except ValueError:
-        await callback.answer()
-        return
-
+@_with_event()
+async def cb_edit_tags_toggle(
+    callback: CallbackQuery, state: FSMContext, event: EventRecord, cb: _CbParts
+) -> None:
+    slug, event_id, page, show_past = cb
     if slug not in TAG_TITLE_BY_SLUG:
         await callback.answer()
         return
 
     data = await state.get_data()
-    selected = set(data.get("edit_tags") or [])
-    if slug in selected:
-        if len(selected) == 1:
-            await callback.answer("Нужно оставить хотя бы одну группу.", show_alert=True)
-            return
-        selected.remove(slug)
-    else:
-        selected.add(slug)
-    tags = normalize_tags(selected)
-    await state.update_data(edit_tags=tags)
-
-    event = events_repo().get(event_id)
-    if not event:
-        await callback.answer("Событие не найдено.", show_alert=True)
-        return
-
-    event.tags = tags
-    await update_event_message(
-        chat_id=callback.message.chat.id,
-        message_id=callback.message.message_id,
-        user_id=callback.from_user.id,
-        event=event,
-        page=page,
-        show_past=show_past,
-        extra_lines=_tags_extra_lines(tags),
-        keyboard_override=_tags_keyboard(tags, event_id, page, show_past),
+    mask = int(data.get("edit_tags_mask") or 0)
+    mask ^= 1 << _TAG_INDEX[slug]
+    if not mask:
+        await callback.answer("Нужно оставить хотя бы одну группу.", show_alert=True)
+        return
+    await state.update_data(edit_tags_mask=mask)
+    tags = _tags_from_mask(mask)
+
+    # The cached record may be shared with other handlers within the TTL
+    # window, so render the draft tag selection on a copy.
+    event = replace(event, tags=tags)
+    chat_id = callback.message.chat.id
+    message_id = callback.message.message_id
+    _schedule_tag_edit(
+        (chat_id, message_id),
+        dict(
+            chat_id=chat_id,
+            message_id=message_id,
+            user_id=callback.from_user.id,
+            event=event,
+            page=page,
+            show_past=show_past,
+            extra_lines=_tags_extra_lines(mask),
+            keyboard_override=_tags_keyboard(mask, event_id, page, show_past),
+        ),
     )
     await callback.answer()
 
 
 @router.callback_query(EventEdit.tags, F.data.startswith("events:edit_tags_done:"))
 async def cb_edit_tags_done(callback: CallbackQuery, state: FSMContext) -> None:
-    parts = callback.data.split(":")
-    if len(parts) != 5:
-        await callback.answer()
-        return
-    try:
-        event_id = int(parts[2])
-        page = int(parts[3])
-        show_past = int(parts[4])
-    except ValueError:
+    cb = _parse_cb(callback.data)
+    if cb is None:
         await callback.answer()
         return
+    event_id, page, show_past = cb.event_id, cb.page, cb.show_past
 
-    tags = normalize_tags((await state.get_data()).get("edit_tags") or [])
+    tags = _tags_from_mask(int((await state.get_data()).get("edit_tags_mask") or 0))
     if not tags:
         await callback.answer("Нужно выбрать хотя бы одну группу.", show_alert=True)
         return
 
-    updated = events_repo().update(event_id, {"tags": tags})
+    updated = update_event_record(event_id, {"tags": tags})
     if not updated:
         await callback.answer("Не удалось обновить событие.", show_alert=True)
         return
 
-    await state.set_state(EventEdit.menu)
-    await state.update_data(edit_tags=None)
-    await _render_menu(state, updated)
-    await callback.answer("Теги обновлены")
+    _cancel_pending_tag_edit(callback.message.chat.id, callback.message.message_id)
+    await _enter_state(state, EventEdit.menu, {})
+    await _render_menu(_ctx_from_callback(callback, cb), updated)
+    await callback.answer("Теги обновлены", cache_time=2)
 
 
 @router.callback_query(F.data.startswith("events:setlink:"))
-async def cb_set_link(callback: CallbackQuery, state: FSMContext) -> None:
-    parts = callback.data.split(":")
-    if len(parts) != 5:
-        await callback.answer()
-        return
-    try:
-        field_event_id = int(parts[2])
-        page = int(parts[3])
-        show_past = int(parts[4])
-    except ValueError:
-        await callback.answer()
-        return
-
-    event = events_repo().get(field_event_id)
-    if not event:
-        await callback.answer("Событие не найдено.", show_alert=True)
-        return
-    if not can_manage_event(callback.from_user.id, event):
-        await callback.answer("Недостаточно прав.", show_alert=True)
-        return
-
-    await state.set_state(EventEdit.link)
-    await state.update_data(
-        edit_event_id=field_event_id,
-        edit_page=page,
-        edit_show_past=show_past,
-        edit_chat_id=callback.message.chat.id,
-        edit_message_id=callback.message.message_id,
-        edit_user_id=callback.from_user.id,
-        edit_field="link",
+@_with_event()
+async def cb_set_link(
+    callback: CallbackQuery, state: FSMContext, event: EventRecord, cb: _CbParts
+) -> None:
+    await _enter_state(
+        state,
+        EventEdit.link,
+        dict(
+            edit_event_id=cb.event_id,
+            edit_page=cb.page,
+            edit_show_past=cb.show_past,
+            edit_chat_id=callback.message.chat.id,
+            edit_message_id=callback.message.message_id,
+            edit_user_id=callback.from_user.id,
+            edit_field="link",
+        ),
     )
-    await _show_link_prompt(state, event)
+    await _show_link_prompt(_ctx_from_callback(callback, cb), event)
     await callback.answer("Отправьте ссылку сообщением")
 
 
 @router.message(EventEdit.link)
 async def edit_link(message: Message, state: FSMContext) -> None:
+    spawn_notification(_safe_delete(message))
     context = await _get_context(state)
-    try:
-        await message.delete()
-    except TelegramBadRequest:
-        pass
-
     if not context:
         await state.clear()
         return
 
-    event, _, _, _, _, _ = context
+    event, ctx = context
     text = (message.text or "").strip()
 
     if not text:
-        await _show_link_prompt(state, event, error="Сообщение пустое. Попробуйте ещё раз.")
+        await _show_link_prompt(ctx, event, error="Сообщение пустое. Попробуйте ещё раз.")
         return
 
     updates = {"registration_link": "" if text == "-" else text}
     feedback = "Ссылка удалена." if text == "-" else "Ссылка обновлена."
 
-    updated = events_repo().update(event.id, updates)
+    updated = update_event_record(event.id, updates)
     if not updated:
-        await _show_link_prompt(state, event, error="Не удалось обновить событие.")
+        await _show_link_prompt(ctx, event, error="Не удалось обновить событие.")
         return
 
-    await state.set_state(EventEdit.menu)
-    await state.update_data(edit_field=None)
-    await _render_menu(state, updated, extra_lines=[feedback])
+    await _enter_state(state, EventEdit.menu, {})
+    await _render_menu(ctx, updated, extra_lines=(feedback,))
 
 
 @router.callback_query(F.data.startswith("events:delete:"))
-async def cb_events_delete(callback: CallbackQuery, state: FSMContext) -> None:
-    parts = callback.data.split(":")
-    if len(parts) != 5:
-        await callback.answer()
-        return
-    try:
-        event_id = int(parts[2])
-        page = int(parts[3])
-        show_past = int(parts[4])
-    except ValueError:
-        await callback.answer()
-        return
-
-    event = events_repo().get(event_id)
-    if not event:
-        await callback.answer("Событие не найдено.", show_alert=True)
-        return
-    if not can_manage_event(callback.from_user.id, event):
-        await callback.answer("Недостаточно прав.", show_alert=True)
-        return
-
-    keyboard = InlineKeyboardMarkup(
-        inline_keyboard=[
-            [
-                InlineKeyboardButton(
-                    text="✅ Подтвердить",
-                    callback_data=f"events:delete_confirm:{event_id}:{page}:{show_past}",
-                )
-            ],
-            [
-                InlineKeyboardButton(
-                    text="❌ Отменить",
-                    callback_data=f"events:edit_menu:{event_id}:{page}:{show_past}",
-                )
-            ],
-        ]
+@_with_event()
+async def cb_events_delete(
+    callback: CallbackQuery, state: FSMContext, event: EventRecord, cb: _CbParts
+) -> None:
+    await _edit_prompt(
+        callback,
+        "Удалить событие? Это действие нельзя отменить.",
+        _confirm_keyboard("delete_confirm", cb.event_id, cb.page, cb.show_past),
     )
-    try:
-        await callback.message.edit_text(
-            "Удалить событие? Это действие нельзя отменить.",
-            reply_markup=keyboard,
-        )
-    except TelegramBadRequest:
-        pass
     await callback.answer()
 
 
 @router.callback_query(F.data.startswith("events:delete_confirm:"))
-async def cb_events_delete_confirm(callback: CallbackQuery, state: FSMContext) -> None:
-    parts = callback.data.split(":")
-    if len(parts) != 5:
-        await callback.answer()
-        return
-    try:
-        event_id = int(parts[2])
-        page = int(parts[3])
-        show_past = int(parts[4])
-    except ValueError:
-        await callback.answer()
-        return
-
-    repo = events_repo()
-    event = repo.get(event_id)
-    if not event:
-        await callback.answer("Событие не найдено.", show_alert=True)
-        return
-    if not can_manage_event(callback.from_user.id, event):
-        await callback.answer("Недостаточно прав.", show_alert=True)
-        return
-
-    deleted = repo.delete(event_id)
+@_with_event()
+async def cb_events_delete_confirm(
+    callback: CallbackQuery, state: FSMContext, event: EventRecord, cb: _CbParts
+) -> None:
+    event_id, page, show_past = cb.event_id, cb.page, cb.show_past
+    deleted = events_repo().delete(event_id)
+    invalidate_event_cache(event_id)
     if not deleted:
         await callback.answer("Не удалось удалить событие.", show_alert=True)
         return
@@ -790,78 +776,25 @@ async def cb_events_delete_confirm(callback: CallbackQuery, state: FSMContext) -
 
 
 @router.callback_query(F.data.startswith("events:send_back:"))
-async def cb_events_send_back(callback: CallbackQuery, state: FSMContext) -> None:
-    parts = callback.data.split(":")
-    if len(parts) != 5:
-        await callback.answer()
-        return
-    try:
-        event_id = int(parts[2])
-        page = int(parts[3])
-        show_past = int(parts[4])
-    except ValueError:
-        await callback.answer()
-        return
-
-    event = events_repo().get(event_id)
-    if not event:
-        await callback.answer("Событие не найдено.", show_alert=True)
-        return
-    if callback.from_user.id not in ADMIN_IDS:
-        await callback.answer("Недостаточно прав.", show_alert=True)
-        return
-
-    keyboard = InlineKeyboardMarkup(
-        inline_keyboard=[
-            [
-                InlineKeyboardButton(
-                    text="✅ Подтвердить",
-                    callback_data=f"events:send_back_confirm:{event_id}:{page}:{show_past}",
-                )
-            ],
-            [
-                InlineKeyboardButton(
-                    text="❌ Отменить",
-                    callback_data=f"events:edit_menu:{event_id}:{page}:{show_past}",
-                )
-            ],
-        ]
+@_with_event(admin_only=True)
+async def cb_events_send_back(
+    callback: CallbackQuery, state: FSMContext, event: EventRecord, cb: _CbParts
+) -> None:
+    await _edit_prompt(
+        callback,
+        "Отправить событие обратно на модерацию?",
+        _confirm_keyboard("send_back_confirm", cb.event_id, cb.page, cb.show_past),
     )
-    try:
-        await callback.message.edit_text(
-            "Отправить событие обратно на модерацию?",
-            reply_markup=keyboard,
-        )
-    except TelegramBadRequest:
-        pass
     await callback.answer()
 
 
 @router.callback_query(F.data.startswith("events:send_back_confirm:"))
-async def cb_events_send_back_confirm(callback: CallbackQuery, state: FSMContext) -> None:
-    parts = callback.data.split(":")
-    if len(parts) != 5:
-        await callback.answer()
-        return
-    try:
-        event_id = int(parts[2])
-        page = int(parts[3])
-        show_past = int(parts[4])
-    except ValueError:
-        await callback.answer()
-        return
-
-    if callback.from_user.id not in ADMIN_IDS:
-        await callback.answer("Недостаточно прав.", show_alert=True)
-        return
-
-    repo = events_repo()
-    event = repo.get(event_id)
-    if not event:
-        await callback.answer("Событие не найдено.", show_alert=True)
-        return
-
-    updated = repo.update(
+@_with_event(admin_only=True)
+async def cb_events_send_back_confirm(
+    callback: CallbackQuery, state: FSMContext, event: EventRecord, cb: _CbParts
+) -> None:
+    event_id, page, show_past = cb.event_id, cb.page, cb.show_past
+    updated = update_event_record(
         event_id,
         {
             "status": STATUS_PENDING,
@@ -876,7 +809,11 @@ async def cb_events_send_back_confirm(callback: CallbackQuery, state: FSMContext
         await callback.answer("Не удалось обновить событие.", show_alert=True)
         return
 
-    await notify_admins(updated)
     await state.clear()
-    await edit_events_message(callback, page, bool(show_past))
+    # Уведомления админам и перерисовка списка идут в разные чаты и не
+    # зависят друг от друга — выполняем их одновременно.
+    await asyncio.gather(
+        notify_admins(updated),
+        edit_events_message(callback, page, bool(show_past)),
+    )
     await callback.answer("Событие отправлено на модерацию")
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import re
 from datetime import datetime
-from html import escape
+from functools import lru_cache
+from operator import itemgetter
+from time import monotonic
 from typing import Optional, Sequence
 
 from aiogram import F, Router
@@ -11,19 +14,33 @@ from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMar
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from loguru import logger
 
-from constants import EVENTS_PAGE_SIZE, NEXT, PREVIOUS, RELOAD
+from constants import ADMIN_IDS, EVENTS_PAGE_SIZE, NEXT, PREVIOUS, RELOAD
+from utils.telegram_text import escape_html
 
 from .common import (
     events_repo,
-    event_visible_for_user,
+    forget_render,
     format_time_range,
     load_user,
     number_to_emoji,
-    sort_events,
+    remember_render,
+    render_digest,
+    render_is_duplicate,
+    user_track,
 )
 
 router = Router()
 
+# One pattern serves list/refresh/toggle; compiled matching avoids the
+# split-allocate-validate dance on every button press, and the same regex
+# works as the router filter — malformed data never reaches the handler.
+_PAGE_RE = re.compile(r"^events:(list|refresh|toggle):(\d+):([01])$")
+
+
+# Событие без даты сортируется в хвост актуальных; одна заранее созданная
+# константа вместо datetime.max в ключе на каждый элемент.
+_DT_MAX = datetime.max
+
 
 def _split_events_by_time(events: Sequence) -> tuple[list, list]:
     today = datetime.now().date()
@@ -32,23 +49,29 @@ def _split_events_by_time(events: Sequence) -> tuple[list, list]:
     for event in events:
         start = event.scheduled_datetime()
         if not start or start.date() >= today:
-            upcoming.append(event)
+            # Carry the start computed for the split into the sort key, so
+            # the sort reads a ready tuple slot instead of re-dispatching
+            # through scheduled_datetime() per comparison element.
+            upcoming.append((start or _DT_MAX, event))
         else:
-            past.append(event)
-    return sort_events(upcoming), sorted(
-        past,
-        key=lambda item: item.scheduled_datetime() or datetime.min,
-        reverse=True,
-    )
+            past.append((start, event))
+    upcoming.sort(key=itemgetter(0))
+    past.sort(key=itemgetter(0), reverse=True)
+    return [event for _, event in upcoming], [event for _, event in past]
+
 
+# Готовый шаблон записи списка: одна подстановка вместо наращивания
+# промежуточного списка строк, необязательная локация несёт свой "\n".
+_ENTRY_TMPL = "{index} <b>{title}</b>\n🕒 {time}{location}"
 
-def _format_event_list_entry(index: int, event) -> list[str]:
-    emoji_index = number_to_emoji(index)
-    lines = [f"{emoji_index} <b>{escape(event.title)}</b>"]
-    lines.append(f"🕒 {format_time_range(event)}")
-    if event.location:
-        lines.append(f"📍 {escape(event.location)}")
-    return lines
+
+def _format_event_list_entry(index: int, event) -> str:
+    return _ENTRY_TMPL.format(
+        index=number_to_emoji(index),
+        title=escape_html(event.title),
+        time=format_time_range(event),
+        location=f"\n📍 {escape_html(event.location)}" if event.location else "",
+    )
 
 
 def _build_events_message(
@@ -82,7 +105,7 @@ def _build_events_message(
             lines.append("")
         current_section = section_key
 
-        lines.extend(_format_event_list_entry(global_index + 1, event))
+        lines.append(_format_event_list_entry(global_index + 1, event))
         lines.append("")
 
     if lines and lines[-1] == "":
@@ -90,8 +113,13 @@ def _build_events_message(
     return "\n".join(lines)
 
 
+# Клавиатура зависит только от id событий на странице и координат
+# пагинации — на повторных кликах по тем же страницам готовая разметка
+# берётся из LRU вместо пересборки кнопок; markup после as_markup() никто
+# не мутирует, поэтому отдавать один объект повторно безопасно.
+@lru_cache(maxsize=512)
 def _build_events_keyboard(
-    events_page: list,
+    event_ids: tuple[int, ...],
     page: int,
     show_past: bool,
     total_pages: int,
@@ -126,12 +154,12 @@ def _build_events_keyboard(
         builder.row(*nav_buttons)
 
     event_buttons: list[InlineKeyboardButton] = []
-    for offset, event in enumerate(events_page):
+    for offset, event_id in enumerate(event_ids):
         index = start_index + offset + 1
         event_buttons.append(
             InlineKeyboardButton(
                 text=number_to_emoji(index),
-                callback_data=f"events:details:{event.id}:{page}:{int(show_past)}",
+                callback_data=f"events:details:{event_id}:{page}:{int(show_past)}",
             )
         )
     for idx in range(0, len(event_buttons), 2):
@@ -146,15 +174,44 @@ def _build_events_keyboard(
     return builder.as_markup()
 
 
+# Готовые upcoming/past-списки по пользователю. Клик по пагинации попадает
+# сюда вместо SELECT + split + sort; ключом служит счётчик версий
+# репозитория, так что любая мутация события сразу обесценивает записи,
+# а короткий TTL страхует смену «сегодня» на границе суток. show_past в
+# ключ не входит: кэш хранит оба списка, переключатель лишь меняет срез.
+_VIEW_CACHE: dict[int, tuple[int, float, list, list]] = {}
+_VIEW_CACHE_TTL = 30.0
+_VIEW_CACHE_MAX = 512
+
+
+def _visible_events_split(user_id: int) -> tuple[list, list]:
+    repo = events_repo()
+    version = repo.version
+    now = monotonic()
+    entry = _VIEW_CACHE.get(user_id)
+    if entry and entry[0] == version and now < entry[1]:
+        return entry[2], entry[3]
+    user = load_user(user_id)
+    events = repo.list_visible(
+        user_id if user else None,
+        user_track(user),
+        is_admin=bool(user and user.tg_id in ADMIN_IDS),
+    )
+    upcoming, past = _split_events_by_time(events)
+    if len(_VIEW_CACHE) >= _VIEW_CACHE_MAX:
+        for key in [k for k, (_, expiry, _u, _p) in _VIEW_CACHE.items() if expiry <= now]:
+            del _VIEW_CACHE[key]
+    _VIEW_CACHE[user_id] = (version, now + _VIEW_CACHE_TTL, upcoming, past)
+    return upcoming, past
+
+
 def render_events_view(
     user_id: int, page: int, show_past: bool
 ) -> tuple[str, InlineKeyboardMarkup, int, int]:
-    user = load_user(user_id)
-    events = [event for event in events_repo().list_all() if event_visible_for_user(event, user)]
-    upcoming, past = _split_events_by_time(events)
+    upcoming, past = _visible_events_split(user_id)
 
-    combined = upcoming + (past if show_past else [])
-    total_count = len(combined)
+    upcoming_len = len(upcoming)
+    total_count = upcoming_len + (len(past) if show_past else 0)
 
     if total_count == 0:
         text = (
@@ -162,23 +219,39 @@ def render_events_view(
             if show_past
             else "🔜 Сейчас нет актуальных событий. Предложите своё мероприятие через кнопку ниже."
         )
-        keyboard = _build_events_keyboard([], 0, show_past, 1, 0)
+        keyboard = _build_events_keyboard((), 0, show_past, 1, 0)
         return text, keyboard, 1, 0
 
     total_pages = max(1, (total_count + EVENTS_PAGE_SIZE - 1) // EVENTS_PAGE_SIZE)
     page = max(0, min(page, total_pages - 1))
     start_index = page * EVENTS_PAGE_SIZE
-    events_page = combined[start_index : start_index + EVENTS_PAGE_SIZE]
-
-    text = _build_events_message(events_page, start_index, len(upcoming), show_past)
+    end_index = start_index + EVENTS_PAGE_SIZE
+    # Страница режется прямо из кэшированных списков — без склейки
+    # upcoming + past целиком ради десяти элементов.
+    if not show_past or end_index <= upcoming_len:
+        events_page = upcoming[start_index:end_index]
+    elif start_index >= upcoming_len:
+        events_page = past[start_index - upcoming_len : end_index - upcoming_len]
+    else:
+        events_page = upcoming[start_index:] + past[: end_index - upcoming_len]
+
+    text = _build_events_message(events_page, start_index, upcoming_len, show_past)
     keyboard = _build_events_keyboard(
-        events_page, page, show_past, total_pages, start_index
+        tuple(event.id for event in events_page),
+        page,
+        show_past,
+        total_pages,
+        start_index,
     )
     return text, keyboard, total_pages, page
 
 
 async def edit_events_message(callback: CallbackQuery, page: int, show_past: bool) -> None:
     text, keyboard, _, _ = render_events_view(callback.from_user.id, page, show_past)
+    key = (callback.message.chat.id, callback.message.message_id)
+    digest = render_digest(text, keyboard)
+    if render_is_duplicate(key, digest):
+        return
     try:
         await callback.message.edit_text(
             text,
@@ -186,7 +259,13 @@ async def edit_events_message(callback: CallbackQuery, page: int, show_past: boo
             disable_web_page_preview=True,
         )
     except Exception as exc:  # noqa: BLE001
-        logger.warning(f"Failed to edit events list message: {exc}")
+        if "message is not modified" in str(exc):
+            remember_render(key, digest)
+        else:
+            forget_render(key)
+            logger.warning(f"Failed to edit events list message: {exc}")
+    else:
+        remember_render(key, digest)
 
 
 @router.message(Command("events"))
@@ -196,49 +275,31 @@ async def cmd_events(message: Message, state: FSMContext) -> None:
     await message.answer(text, reply_markup=keyboard, disable_web_page_preview=True)
 
 
-@router.callback_query(F.data.startswith("events:list:"))
-async def cb_events_list(callback: CallbackQuery) -> None:
-    parts = callback.data.split(":")
-    if len(parts) != 4:
-        await callback.answer()
-        return
-    try:
-        page = int(parts[2])
-        show_past = bool(int(parts[3]))
-    except ValueError:
-        await callback.answer()
-        return
+async def _page_show(callback: CallbackQuery, page: int, show_past: bool) -> None:
     await edit_events_message(callback, page, show_past)
-    await callback.answer()
+    await callback.answer(cache_time=1)
 
 
-@router.callback_query(F.data.startswith("events:refresh:"))
-async def cb_events_refresh(callback: CallbackQuery) -> None:
-    parts = callback.data.split(":")
-    if len(parts) != 4:
-        await callback.answer()
-        return
-    try:
-        page = int(parts[2])
-        show_past = bool(int(parts[3]))
-    except ValueError:
-        await callback.answer()
-        return
-    await edit_events_message(callback, page, show_past)
+async def _page_toggle(callback: CallbackQuery, page: int, show_past: bool) -> None:
+    await edit_events_message(callback, 0, not show_past)
     await callback.answer()
 
 
-@router.callback_query(F.data.startswith("events:toggle:"))
-async def cb_events_toggle(callback: CallbackQuery) -> None:
-    parts = callback.data.split(":")
-    if len(parts) != 4:
-        await callback.answer()
-        return
-    try:
-        page = int(parts[2])
-        show_past = bool(int(parts[3]))
-    except ValueError:
-        await callback.answer()
-        return
-    await edit_events_message(callback, 0, not show_past)
-    await callback.answer()
+# Таблица действий вместо цепочки сравнений: следующее events:*-действие
+# пагинации — это строка в словаре плюс альтернатива в _PAGE_RE, а не ещё
+# один elif и ещё один зарегистрированный фильтр.
+_PAGE_ACTIONS = {
+    "list": _page_show,
+    "refresh": _page_show,
+    "toggle": _page_toggle,
+}
+
+
+@router.callback_query(F.data.regexp(_PAGE_RE))
+async def cb_events_page(callback: CallbackQuery) -> None:
+    # Фильтр уже проверил формат — здесь остаётся достать группы из того же
+    # скомпилированного паттерна и свериться с таблицей действий.
+    match = _PAGE_RE.match(callback.data)
+    await _PAGE_ACTIONS[match.group(1)](
+        callback, int(match.group(2)), bool(int(match.group(3)))
+    )
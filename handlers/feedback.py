@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from html import escape
+import asyncio
 
 from aiogram import F, Router
 from aiogram.enums import ParseMode
@@ -22,6 +22,7 @@ from constants import ADMIN_IDS
 from states.feedback import Feedback
 from utils.telegram_text import (
     TELEGRAM_TEXT_LIMIT,
+    escape_html,
     fits_telegram_text,
     shorten_text_for_html_preview,
     split_text_for_html,
@@ -30,6 +31,10 @@ from utils.telegram_text import (
 router = Router()
 PREVIEW_SUFFIX = "\n\n[Показан фрагмент. Полный текст будет отправлен администраторам целиком.]"
 
+# Состав администраторов фиксируется на старте процесса — проверку «кому
+# вообще доставлять» достаточно вычислить один раз, а не на каждый отзыв.
+_NO_ADMINS = not ADMIN_IDS
+
 
 def _append_text(existing_text: str | None, new_text: str) -> str:
     if not existing_text:
@@ -66,30 +71,29 @@ def _feedback_mode_label(mode: str | None) -> str | None:
     return None
 
 
+# Один шаблон вместо пошагового списка строк: обе «секции» всегда
+# присутствуют (в виде текста или подсказки), статус добавляется хвостом.
+_DISPLAY_TMPL = "📝 <b>Отзыв</b>\n\n{body}\n\n{mode}{status}"
+
+
 def _feedback_display_text(data: dict, status: str | None = None) -> str:
-    lines: list[str] = ["📝 <b>Отзыв</b>"]
     text = data.get("feedback_text")
     if text:
-        text = shorten_text_for_html_preview(text, 2500, PREVIEW_SUFFIX)
-        lines.append("")
-        lines.append(escape(text))
+        body = escape_html(shorten_text_for_html_preview(text, 2500, PREVIEW_SUFFIX))
     else:
-        lines.append("")
-        lines.append("Текст ещё не введён. Отправьте отзыв отдельным сообщением ниже.")
+        body = "Текст ещё не введён. Отправьте отзыв отдельным сообщением ниже."
 
     mode_label = _feedback_mode_label(data.get("feedback_mode"))
-    if mode_label:
-        lines.append("")
-        lines.append(f"📨 Способ отправки: <b>{mode_label}</b>")
-    else:
-        lines.append("")
-        lines.append("После ввода текста выберите способ отправки кнопками ниже.")
-
-    if status:
-        lines.append("")
-        lines.append(status)
-
-    return "\n".join(lines)
+    mode = (
+        f"📨 Способ отправки: <b>{mode_label}</b>"
+        if mode_label
+        else "После ввода текста выберите способ отправки кнопками ниже."
+    )
+    return _DISPLAY_TMPL.format(
+        body=body,
+        mode=mode,
+        status=f"\n\n{status}" if status else "",
+    )
 
 
 def _format_feedback_message(
@@ -98,17 +102,17 @@ def _format_feedback_message(
     is_anonymous: bool,
     author: AiogramUser | None,
 ) -> str:
-    escaped_text = escape(feedback_text)
+    escaped_text = escape_html(feedback_text)
     if is_anonymous:
         header = "📣 <b>Получен анонимный отзыв</b>"
         author_line = ""
     else:
-        display_name = escape(author.full_name or "") if author else "Неизвестный пользователь"
+        display_name = escape_html(author.full_name or "") if author else "Неизвестный пользователь"
         username = author.username if author else ""
         tg_id = author.id if author else 0
         mention = f'<a href="tg://user?id={tg_id}">{display_name}</a>' if tg_id else display_name
         if username:
-            author_line = f"{mention} (@{escape(username)})"
+            author_line = f"{mention} (@{escape_html(username)})"
         else:
             author_line = mention
         header = "📣 <b>Получен отзыв</b>"
@@ -125,38 +129,46 @@ async def _deliver_feedback(
     is_anonymous: bool,
     author: AiogramUser | None,
 ) -> bool:
-    if not ADMIN_IDS:
+    if _NO_ADMINS:
         logger.warning("No admin IDs configured; feedback message dropped.")
         return False
 
-    delivered_any = False
     if is_anonymous:
         header = "📣 <b>Получен анонимный отзыв</b>\n\n📝 "
         continuation_template = "📣 <b>Получен анонимный отзыв</b> (часть {index})\n\n📝 "
     else:
-        display_name = escape(author.full_name or "") if author else "Неизвестный пользователь"
+        display_name = escape_html(author.full_name or "") if author else "Неизвестный пользователь"
         username = author.username if author else ""
         tg_id = author.id if author else 0
         mention = f'<a href="tg://user?id={tg_id}">{display_name}</a>' if tg_id else display_name
-        author_line = f"{mention} (@{escape(username)})" if username else mention
+        author_line = f"{mention} (@{escape_html(username)})" if username else mention
         header = f"📣 <b>Получен отзыв</b>\n👤 {author_line}\n\n📝 "
         continuation_template = f"📣 <b>Получен отзыв</b> (часть {{index}})\n👤 {author_line}\n\n📝 "
 
-    for admin_id in ADMIN_IDS:
-        try:
-            max_header_len = max(len(header), len(continuation_template.format(index=999)))
-            chunks = split_text_for_html(feedback_text, TELEGRAM_TEXT_LIMIT - max_header_len)
-            for index, chunk in enumerate(chunks, start=1):
-                chunk_header = header if index == 1 else continuation_template.format(index=index)
-                await bot.send_message(
-                    admin_id,
-                    f"{chunk_header}{escape(chunk)}",
-                    parse_mode=ParseMode.HTML,
-                )
-            delivered_any = True
-        except Exception as exc:
-            logger.error(f"Failed to deliver feedback to admin {admin_id}: {exc}")
-    return delivered_any
+    # Нарезка и экранирование не зависят от получателя — делаем один раз.
+    max_header_len = max(len(header), len(continuation_template.format(index=999)))
+    chunks = split_text_for_html(feedback_text, TELEGRAM_TEXT_LIMIT - max_header_len)
+    escaped_chunks = [escape_html(chunk) for chunk in chunks]
+
+    async def _send_to_admin(admin_id: int) -> None:
+        # Части одного отзыва уходят по порядку внутри чата администратора;
+        # сами администраторы обслуживаются параллельно.
+        for index, chunk in enumerate(escaped_chunks, start=1):
+            chunk_header = header if index == 1 else continuation_template.format(index=index)
+            await bot.send_message(
+                admin_id,
+                f"{chunk_header}{chunk}",
+                parse_mode=ParseMode.HTML,
+            )
+
+    results = await asyncio.gather(
+        *(_send_to_admin(admin_id) for admin_id in ADMIN_IDS),
+        return_exceptions=True,
+    )
+    for admin_id, result in zip(ADMIN_IDS, results):
+        if isinstance(result, Exception):
+            logger.error(f"Failed to deliver feedback to admin {admin_id}: {result}")
+    return any(not isinstance(result, Exception) for result in results)
 
 
 @router.message(Command("feedback"))
@@ -185,8 +197,9 @@ async def feedback_collect_text(message: Message, state: FSMContext):
     data = await state.get_data()
     main_message_id = data.get("main_message_id")
     combined_text = _append_text(data.get("feedback_text"), text)
-    await state.update_data(feedback_text=combined_text, feedback_mode=None)
-    updated = await state.get_data()
+    # update_data возвращает объединённый словарь — второй поход в
+    # хранилище состояния за тем же самым не нужен.
+    updated = await state.update_data(feedback_text=combined_text, feedback_mode=None)
 
     display_text = _feedback_display_text(updated)
     if not fits_telegram_text(display_text):
@@ -243,7 +256,7 @@ async def _finalize_feedback(
         return
 
     mode_key = "anonymous" if is_anonymous else "named"
-    await state.update_data(feedback_mode=mode_key)
+    updated = await state.update_data(feedback_mode=mode_key)
 
     delivered = await _deliver_feedback(
         feedback_text,
@@ -257,7 +270,6 @@ async def _finalize_feedback(
         else "⚠️ Отзыв сохранён, но не удалось уведомить администраторов."
     )
 
-    updated = await state.get_data()
     try:
         if main_message_id:
             await bot.edit_message_text(
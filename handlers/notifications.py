@@ -3,17 +3,19 @@ from __future__ import annotations
 import asyncio
 from collections import defaultdict
 from datetime import datetime, timedelta, timezone, tzinfo
-from html import escape
-from typing import Iterable
+from operator import itemgetter
+from typing import Optional
 from zoneinfo import ZoneInfo
 
 from loguru import logger
 
 from bot_instance import bot
 from constants import EMOJI_REMINDER
-from db.base_event import EventRecord, STATUS_APPROVED
+from db.base_event import EventRecord
 from db.database import Database
 from utils.misc import format_datetime
+from utils.rate_limit import TokenBucket
+from utils.telegram_text import escape_html
 
 
 def _safe_zone() -> tzinfo:
@@ -29,35 +31,39 @@ def _ensure_local(dt: datetime, tzinfo: tzinfo) -> datetime:
     return dt.astimezone(tzinfo)
 
 
-def _format_event_block(event: EventRecord, tzinfo: tzinfo) -> str:
-    lines: list[str] = []
-    title = escape(event.title or "Событие")
-    lines.append(f"🔔 <b>{title}</b>")
+# Один шаблон вместо списка строк с финальным join: необязательные секции
+# подставляются пустой строкой и сами несут свой перевод строки.
+_BLOCK_TMPL = "🔔 <b>{title}</b>\n🕒 {time}{location}{description}{link}"
+
 
+def _format_event_block(event: EventRecord, tzinfo: tzinfo) -> str:
     starts_at = event.scheduled_datetime()
-    ends_at = event.end_datetime()
     if starts_at:
         start_local = _ensure_local(starts_at, tzinfo)
-        date_part = start_local.strftime("%d.%m.%Y")
-        time_part = start_local.strftime("%H:%M")
+        time_part = start_local.strftime("%d.%m.%Y · %H:%M")
+        ends_at = event.end_datetime()
         if ends_at:
             end_local = _ensure_local(ends_at, tzinfo)
             time_part = f"{time_part} – {end_local.strftime('%H:%M')}"
-        lines.append(f"🕒 {date_part} · {time_part}")
     else:
-        lines.append("🕒 Дата уточняется")
-
-    if event.location:
-        lines.append(f"📍 {escape(event.location)}")
+        time_part = "Дата уточняется"
 
     description = (event.short_description or "").strip()
-    if description:
-        lines.append(f"📝 {escape(description)}")
+    return _BLOCK_TMPL.format(
+        title=escape_html(event.title or "Событие"),
+        time=time_part,
+        location=f"\n📍 {escape_html(event.location)}" if event.location else "",
+        description=f"\n📝 {escape_html(description)}" if description else "",
+        link=f"\n🔗 {event.registration_link}" if event.registration_link else "",
+    )
 
-    if event.registration_link:
-        lines.append(f"🔗 {event.registration_link}")
 
-    return "\n".join(lines)
+# Рассылка идёт параллельно, но в пределах глобального лимита Telegram
+# (~30 сообщений в секунду на бота). Семафор ограничивает число запросов
+# в полёте, токен-бакет — их темп; 429 с retry_after добирает
+# session-middleware повторов.
+_SEND_CONCURRENCY = 25
+_SEND_RATE_PER_SEC = 30.0
 
 
 class NotificationService:
@@ -69,12 +75,15 @@ class NotificationService:
     async def run_daily_notifications(self) -> None:
         logger.info("Notification service: scheduler started.")
         while True:
+            # Спим до абсолютного дедлайна 20:00: реальная дельта до цели,
+            # без минутного пола — он лишь маскировал бы ситуацию, когда
+            # часы только что перешагнули целевое время.
             now = datetime.now(self.timezone)
             target_time = now.replace(hour=20, minute=0, second=0, microsecond=0)
             if now >= target_time:
                 target_time += timedelta(days=1)
 
-            wait_seconds = max(60.0, (target_time - now).total_seconds())
+            wait_seconds = (target_time - now).total_seconds()
             logger.info(
                 "Notification service: sleeping for {:.0f} seconds until {}",
                 wait_seconds,
@@ -87,7 +96,7 @@ class NotificationService:
                 raise
 
             try:
-                await self.send_tomorrows_reminders()
+                await self.send_tomorrows_reminders(datetime.now(self.timezone))
             except asyncio.CancelledError:
                 raise
             except Exception as exc:  # noqa: BLE001
@@ -96,35 +105,44 @@ class NotificationService:
                 )
                 await asyncio.sleep(300)
 
-    def _events_for_tomorrow(self, tomorrow: datetime) -> Iterable[EventRecord]:
+    def _events_for_tomorrow(
+        self, tomorrow: datetime
+    ) -> list[tuple[datetime, EventRecord]]:
+        # Возвращает пары (локальное начало, событие): start_local уже
+        # вычислен для фильтра по дате, и дальше он же служит ключом
+        # сортировки — не пересчитываем его на каждое сравнение. Отбор по
+        # статусу и дате делает SQL по индексу starts_at, а не скан всей
+        # таблицы; проверка даты здесь остаётся только на случай записей
+        # со смещением таймзоны в строке.
         tomorrow_date = tomorrow.date()
-        all_events = self.events_repo.list_all()
-        for event in all_events:
-            if event.status != STATUS_APPROVED:
-                continue
+        pairs: list[tuple[datetime, EventRecord]] = []
+        for event in self.events_repo.list_approved_on(tomorrow_date):
             start = event.scheduled_datetime()
             if not start:
                 continue
             start_local = _ensure_local(start, self.timezone)
             if start_local.date() == tomorrow_date:
-                yield event
+                pairs.append((start_local, event))
+        return pairs
 
-    async def send_tomorrows_reminders(self) -> None:
-        now = datetime.now(self.timezone)
+    async def send_tomorrows_reminders(self, now: Optional[datetime] = None) -> None:
+        # Планировщик передаёт единый момент «сейчас» — не строим по новой
+        # tz-aware datetime на каждый шаг одного и того же пробуждения.
+        if now is None:
+            now = datetime.now(self.timezone)
         tomorrow = now + timedelta(days=1)
-        events = list(self._events_for_tomorrow(tomorrow))
+        events = self._events_for_tomorrow(tomorrow)
 
         if not events:
             logger.info("Notification service: no events for {}.", tomorrow.date())
             return
 
-        users_events: dict[int, list[EventRecord]] = defaultdict(list)
-        for event in events:
-            unique_attendees = {int(user_id) for user_id in event.attendees}
-            if not unique_attendees:
-                continue
-            for user_id in unique_attendees:
-                users_events[user_id].append(event)
+        # attendee_set() — кэшированный frozenset готовых int'ов: без
+        # set-компрехеншена и int()-приведений на каждое событие.
+        users_events: dict[int, list[tuple[datetime, EventRecord]]] = defaultdict(list)
+        for pair in events:
+            for user_id in pair[1].attendee_set():
+                users_events[user_id].append(pair)
 
         if not users_events:
             logger.info("Notification service: no attendees registered for tomorrow.")
@@ -137,35 +155,52 @@ class NotificationService:
             len(events),
         )
 
-        sent_count = 0
+        # Блок зависит только от события и таймзоны: форматируем каждое один
+        # раз, а не по разу на каждого из его участников. Заголовок общий.
+        formatted_blocks = {
+            event.id: _format_event_block(event, self.timezone) for _, event in events
+        }
+        header = f"{EMOJI_REMINDER} <b>Напоминание: завтра у вас мероприятия — {date_display}</b>"
+
+        # Сборка текстов — чистый CPU, делаем её до отправки целиком.
+        payloads: list[tuple[int, str]] = []
         for user_id, user_events in users_events.items():
-            sorted_events = sorted(
-                user_events,
-                key=lambda item: _ensure_local(
-                    item.scheduled_datetime() or now, self.timezone
-                ),
+            user_events.sort(key=itemgetter(0))
+            payloads.append(
+                (
+                    user_id,
+                    "\n\n".join(
+                        [header, *(formatted_blocks[event.id] for _, event in user_events)]
+                    ),
+                )
             )
-            event_blocks = [
-                _format_event_block(event, self.timezone) for event in sorted_events
-            ]
-            if not event_blocks:
-                continue
-            header = f"{EMOJI_REMINDER} <b>Напоминание: завтра у вас мероприятия — {date_display}</b>"
-            payload = "\n\n".join([header, *event_blocks])
 
-            try:
+        semaphore = asyncio.Semaphore(_SEND_CONCURRENCY)
+        bucket = TokenBucket(_SEND_RATE_PER_SEC)
+
+        async def _send(user_id: int, payload: str) -> None:
+            async with semaphore:
+                await bucket.acquire()
                 await bot.send_message(
                     user_id,
                     payload,
                     disable_web_page_preview=True,
                 )
-                sent_count += 1
-            except Exception as exc:  # noqa: BLE001
+
+        results = await asyncio.gather(
+            *(_send(user_id, payload) for user_id, payload in payloads),
+            return_exceptions=True,
+        )
+        sent_count = 0
+        for (user_id, _), result in zip(payloads, results):
+            if isinstance(result, Exception):
                 logger.error(
                     "Notification service: failed to deliver reminder to {}: {}",
                     user_id,
-                    exc,
+                    result,
                 )
+            else:
+                sent_count += 1
 
         logger.info(
             "Notification service: reminders delivered to {} users for {}.",
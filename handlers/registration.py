@@ -1,14 +1,18 @@
 from __future__ import annotations
 
+import asyncio
 import re
 from datetime import datetime, timezone
-from typing import Iterable
+from functools import lru_cache
+from time import monotonic
+from typing import Any, Iterable
 
 from aiogram import F, Router
 from aiogram.enums import ParseMode
 from aiogram.exceptions import TelegramBadRequest
 from aiogram.filters import Command, CommandObject
 from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State
 from aiogram.types import (
     CallbackQuery,
     InlineKeyboardButton,
@@ -36,6 +40,12 @@ from constants import (
 )
 from db.database import Database
 from db.user import User
+from handlers.events.common import (
+    forget_render,
+    remember_render,
+    render_digest,
+    render_is_duplicate,
+)
 from states.registration import Registration
 from utils.misc import update_commands_for_user
 from utils.users import get_direction_track
@@ -43,18 +53,23 @@ from utils.users import get_direction_track
 router = Router()
 
 
-def get_display_profile_text(data: dict, current_step_prompt: str = "") -> str:
+# Текст профиля зависит от пяти скаляров; соседние шаги и повторные
+# рендеры того же состояния (например, отклонение slash-команды) получают
+# готовую строку из кэша вместо повторной интерполяции. Все ключи —
+# неизменяемые строки, инвалидация не нужна.
+@lru_cache(maxsize=4096)
+def _render_profile(
+    name: str | None,
+    direction: str | None,
+    track: str | None,
+    graduation_value: str | None,
+    current_step_prompt: str,
+) -> str:
     parts: list[str] = []
-    name = data.get("name")
     if name:
         parts.append(f"👤 <b>ФИО:</b> {name}")
-
-    direction = data.get("direction")
     if direction:
         parts.append(f"🎯 <b>Направление:</b> {direction}")
-
-    track = data.get("direction_track") or get_direction_track(direction or "")
-    graduation_value = data.get("magistracy_graduation_year")
     if graduation_value:
         if track == "postgraduate":
             parts.append(
@@ -71,6 +86,17 @@ def get_display_profile_text(data: dict, current_step_prompt: str = "") -> str:
     return profile_str
 
 
+def get_display_profile_text(data: dict, current_step_prompt: str = "") -> str:
+    direction = data.get("direction")
+    return _render_profile(
+        data.get("name"),
+        direction,
+        data.get("direction_track") or get_direction_track(direction or ""),
+        data.get("magistracy_graduation_year"),
+        current_step_prompt,
+    )
+
+
 def create_registration_keyboard(
     current_state_name: str | None,
     extra_rows: list[list[InlineKeyboardButton]] | None = None,
@@ -84,23 +110,101 @@ def create_registration_keyboard(
 
 
 def build_option_rows(options: Iterable[str], prefix: str, per_row: int = 2) -> list[list[InlineKeyboardButton]]:
-    rows: list[list[InlineKeyboardButton]] = []
-    current_row: list[InlineKeyboardButton] = []
-    for index, option in enumerate(options):
-        current_row.append(
-            InlineKeyboardButton(text=option, callback_data=f"{prefix}:{index}")
-        )
-        if len(current_row) >= per_row:
-            rows.append(current_row)
-            current_row = []
-    if current_row:
-        rows.append(current_row)
-    return rows
+    # Срезы по per_row вместо пошагового наращивания текущего ряда: нет
+    # ручной бухгалтерии с flush'ем неполного хвоста.
+    opts = options if isinstance(options, (list, tuple)) else list(options)
+    return [
+        [
+            InlineKeyboardButton(text=option, callback_data=f"{prefix}:{start + offset}")
+            for offset, option in enumerate(opts[start : start + per_row])
+        ]
+        for start in range(0, len(opts), per_row)
+    ]
 
 
 def build_direction_keyboard() -> InlineKeyboardMarkup:
-    rows = build_option_rows(DIRECTION_OPTIONS, "direction_select")
-    return create_registration_keyboard(Registration.direction.state, extra_rows=rows)
+    return _DIRECTION_KB
+
+
+# Быстрые переходы между шагами (и серии отклонённых slash-команд) правят
+# одно и то же сообщение профиля чаще лимита «1 сообщение в секунду на
+# чат». Каждый рендер лишь заменяет отложенный payload; реальный edit
+# уходит один раз после короткой паузы, flood-wait добирает
+# session-middleware повторов.
+_EDIT_DEBOUNCE = 0.25
+_pending_profile_edits: dict[tuple[int, int], dict[str, Any]] = {}
+_profile_edit_flushers: dict[tuple[int, int], asyncio.Task] = {}
+
+
+async def _flush_profile_edit(key: tuple[int, int]) -> None:
+    await asyncio.sleep(_EDIT_DEBOUNCE)
+    payload = _pending_profile_edits.pop(key, None)
+    _profile_edit_flushers.pop(key, None)
+    if payload is None:
+        return
+    try:
+        await bot.edit_message_text(**payload)
+    except TelegramBadRequest as exc:
+        if "message is not modified" in str(exc):
+            # Содержимое уже на месте — дайджест верен, шуметь не о чем.
+            return
+        # Сообщение не обновилось — дайджест последнего рендера больше не
+        # отражает его содержимое, следующий рендер не должен скипаться.
+        forget_render(key)
+        logger.warning(f"Failed to edit registration message {key}: {exc}")
+
+
+def _schedule_profile_edit(
+    chat_id: int,
+    message_id: int,
+    text: str,
+    keyboard: InlineKeyboardMarkup | None,
+) -> None:
+    key = (chat_id, message_id)
+    _pending_profile_edits[key] = dict(
+        text=text,
+        chat_id=chat_id,
+        message_id=message_id,
+        reply_markup=keyboard,
+        parse_mode=ParseMode.HTML,
+    )
+    if key not in _profile_edit_flushers:
+        _profile_edit_flushers[key] = asyncio.create_task(_flush_profile_edit(key))
+
+
+async def _render_step(
+    chat_id: int,
+    message_id: int,
+    text: str,
+    keyboard: InlineKeyboardMarkup | None,
+    state: FSMContext | None = None,
+    new_state: State | None = None,
+) -> None:
+    # Единая точка перерисовки шага: повтор того же текста и клавиатуры
+    # (например, та же slash-команда дважды подряд) не уходит в Telegram —
+    # он всё равно ответил бы "message is not modified". Реестр дайджестов
+    # общий с событиями, ключ (chat_id, message_id) не пересекается.
+    key = (chat_id, message_id)
+    digest = render_digest(text, keyboard)
+    if not render_is_duplicate(key, digest):
+        remember_render(key, digest)
+        _schedule_profile_edit(chat_id, message_id, text, keyboard)
+    if state is not None and new_state is not None:
+        await state.set_state(new_state)
+
+
+async def _get_data_and_delete(message: Message, state: FSMContext) -> dict:
+    # Удаление сообщения пользователя и чтение FSM-состояния независимы:
+    # два round-trip'а (Telegram и хранилище) идут параллельно, а не друг
+    # за другом. Неудавшееся удаление не роняет обработку шага.
+    user_data, deleted = await asyncio.gather(
+        state.get_data(), message.delete(), return_exceptions=True
+    )
+    if isinstance(user_data, BaseException):
+        raise user_data
+    if isinstance(deleted, BaseException):
+        logger.warning(f"Failed to delete user message: {deleted}")
+    return user_data
 
 
 async def show_direction_step(
@@ -110,31 +214,139 @@ async def show_direction_step(
     data: dict,
     prompt_text: str,
 ) -> None:
-    keyboard = build_direction_keyboard()
-    await bot.edit_message_text(
+    await _render_step(
+        chat_id,
+        message_id,
         get_display_profile_text(data, prompt_text),
-        chat_id=chat_id,
-        message_id=message_id,
-        reply_markup=keyboard,
-        parse_mode=ParseMode.HTML,
+        build_direction_keyboard(),
+        state,
+        Registration.direction,
     )
-    await state.set_state(Registration.direction)
+
+
+# Подсказки и варианты по треку — константы: словарь вместо цепочки
+# сравнений, незнакомый трек получает вариант аспирантуры.
+_PROMPT_BY_TRACK = {
+    "bachelor": REG_MESSAGES_NEW["graduation_bachelor"],
+    "master": REG_MESSAGES_NEW["graduation_master"],
+    "postgraduate": REG_MESSAGES_NEW["graduation_postgraduate"],
+}
+_NO_OPTIONS: list[str] = []
+_OPTIONS_BY_TRACK: dict[str, list[str]] = {
+    "bachelor": GRADUATION_BACHELOR_OPTIONS,
+    "master": GRADUATION_MASTER_OPTIONS,
+    "postgraduate": _NO_OPTIONS,
+}
 
 
 def course_prompt_for_track(track: str) -> str:
-    if track == "bachelor":
-        return REG_MESSAGES_NEW["graduation_bachelor"]
-    if track == "master":
-        return REG_MESSAGES_NEW["graduation_master"]
-    return REG_MESSAGES_NEW["graduation_postgraduate"]
+    return _PROMPT_BY_TRACK.get(track, _PROMPT_BY_TRACK["postgraduate"])
 
 
 def course_options_for_track(track: str) -> list[str]:
-    if track == "bachelor":
-        return GRADUATION_BACHELOR_OPTIONS
-    if track == "master":
-        return GRADUATION_MASTER_OPTIONS
-    return []
+    return _OPTIONS_BY_TRACK.get(track, _NO_OPTIONS)
+
+
+def _build_graduation_keyboard(track: str) -> InlineKeyboardMarkup | None:
+    options = course_options_for_track(track)
+    extra_rows = build_option_rows(options, "graduation_select") if options else None
+    return create_registration_keyboard(Registration.graduation.state, extra_rows=extra_rows)
+
+
+# Списки опций — константы, поэтому клавиатуры шагов собираются один раз
+# при импорте; обработчики раздают готовые разметки вместо пересоздания
+# кнопок (и их pydantic-валидации) на каждый переход.
+_NAME_KB = create_registration_keyboard(Registration.name.state)
+_DIRECTION_KB = create_registration_keyboard(
+    Registration.direction.state,
+    extra_rows=build_option_rows(DIRECTION_OPTIONS, "direction_select"),
+)
+_GRAD_KB_BY_TRACK = {
+    track: _build_graduation_keyboard(track)
+    for track in ("bachelor", "master", "postgraduate")
+}
+_CONFIRM_KB = InlineKeyboardMarkup(
+    inline_keyboard=[
+        [
+            InlineKeyboardButton(
+                text=CONFIRM_FINAL_BUTTON_TEXT,
+                callback_data="confirm_registration_final",
+            )
+        ],
+        [
+            InlineKeyboardButton(
+                text=EDIT_FROM_CONFIRM_BUTTON_TEXT,
+                callback_data="edit_from_confirm",
+            )
+        ],
+    ]
+)
+_PROFILE_KB = InlineKeyboardMarkup(
+    inline_keyboard=[
+        [
+            InlineKeyboardButton(
+                text=REREGISTER_BUTTON_TEXT_PROFILE,
+                callback_data="initiate_reregistration_flow",
+            )
+        ],
+        [
+            InlineKeyboardButton(
+                text="👍 Все хорошо, ничего не менять",
+                callback_data="profile_confirmed_show_help",
+            )
+        ],
+    ]
+)
+
+
+def _grad_keyboard(track: str) -> InlineKeyboardMarkup | None:
+    # Неизвестный трек получает ту же клавиатуру, что и аспирантура:
+    # только кнопка «назад», без вариантов курса.
+    return _GRAD_KB_BY_TRACK.get(track, _GRAD_KB_BY_TRACK["postgraduate"])
+
+
+# Короткоживущий кэш документов пользователей: повторные /start и /profile
+# в пределах TTL не ходят в базу, а холодный промах читает её в
+# worker-потоке, не блокируя event loop для остальных чатов. Запись
+# профиля инвалидирует свою запись.
+_USER_CACHE: dict[int, tuple[float, dict | None]] = {}
+_USER_CACHE_TTL = 30.0
+_USER_CACHE_MAX = 1024
+
+
+async def _find_user_doc_cached(tg_id: int) -> dict | None:
+    now = monotonic()
+    entry = _USER_CACHE.get(tg_id)
+    if entry and now - entry[0] < _USER_CACHE_TTL:
+        return entry[1]
+    doc = await asyncio.to_thread(Database.get().users.find_one, {"tg_id": tg_id})
+    if len(_USER_CACHE) >= _USER_CACHE_MAX:
+        cutoff = monotonic() - _USER_CACHE_TTL
+        for key in [k for k, (ts, _) in _USER_CACHE.items() if ts < cutoff]:
+            del _USER_CACHE[key]
+    _USER_CACHE[tg_id] = (monotonic(), doc)
+    return doc
+
+
+def _invalidate_user_cache(tg_id: int) -> None:
+    _USER_CACHE.pop(tg_id, None)
+
+
+# Метка времени регистрации с точностью до ~100 мс: при всплеске
+# подтверждений конструирование datetime + ISO-форматирование выполняется
+# раз на окно, а не на каждый хендлер.
+_NOW_ISO_TTL = 0.1
+_now_iso_at = 0.0
+_now_iso_value = ""
+
+
+def _now_iso() -> str:
+    global _now_iso_at, _now_iso_value
+    now = monotonic()
+    if now - _now_iso_at > _NOW_ISO_TTL:
+        _now_iso_value = datetime.now(timezone.utc).isoformat()
+        _now_iso_at = now
+    return _now_iso_value
 
 
 async def proceed_to_graduation_step(
@@ -148,53 +360,30 @@ async def proceed_to_graduation_step(
     if not track:
         return
 
-    await state.update_data(direction=direction, direction_track=track)
-    updated_data = await state.get_data()
+    # update_data возвращает объединённый словарь — повторный поход в
+    # хранилище состояния не нужен.
+    updated_data = await state.update_data(direction=direction, direction_track=track)
     prompt_text = course_prompt_for_track(track)
-    options = course_options_for_track(track)
-    extra_rows = build_option_rows(options, "graduation_select") if options else None
-    keyboard = create_registration_keyboard(Registration.graduation.state, extra_rows=extra_rows)
-    await bot.edit_message_text(
+    await _render_step(
+        chat_id,
+        message_id,
         get_display_profile_text(updated_data, prompt_text),
-        chat_id=chat_id,
-        message_id=message_id,
-        reply_markup=keyboard,
-        parse_mode=ParseMode.HTML,
+        _grad_keyboard(track),
+        state,
+        Registration.graduation,
     )
-    await state.set_state(Registration.graduation)
 
 
 async def show_confirmation(
     chat_id: int,
     message_id: int,
     state: FSMContext,
+    updated_data: dict,
 ) -> None:
-    updated_data = await state.get_data()
     confirm_text = get_display_profile_text(updated_data, REG_MESSAGES_NEW["confirm"])
-    confirm_keyboard = InlineKeyboardMarkup(
-        inline_keyboard=[
-            [
-                InlineKeyboardButton(
-                    text=CONFIRM_FINAL_BUTTON_TEXT,
-                    callback_data="confirm_registration_final",
-                )
-            ],
-            [
-                InlineKeyboardButton(
-                    text=EDIT_FROM_CONFIRM_BUTTON_TEXT,
-                    callback_data="edit_from_confirm",
-                )
-            ],
-        ]
-    )
-    await bot.edit_message_text(
-        confirm_text,
-        chat_id=chat_id,
-        message_id=message_id,
-        reply_markup=confirm_keyboard,
-        parse_mode=ParseMode.HTML,
+    await _render_step(
+        chat_id, message_id, confirm_text, _CONFIRM_KB, state, Registration.confirm
     )
-    await state.set_state(Registration.confirm)
 
 
 @router.message(Command("help"))
@@ -210,13 +399,13 @@ async def start_new_registration_flow(
     existing_data: dict | None = None,
 ) -> None:
     await state.clear()
-    if existing_data:
-        await state.update_data(**existing_data)
+    current_data = dict(existing_data) if existing_data else {}
+    if current_data:
+        await state.set_data(current_data)
 
     await state.set_state(Registration.name)
-    current_data = await state.get_data()
     text = get_display_profile_text(current_data, REG_MESSAGES_NEW["name"])
-    keyboard = create_registration_keyboard(Registration.name.state)
+    keyboard = _NAME_KB
 
     if isinstance(message_or_callback, Message):
         main_msg = await message_or_callback.answer(text, reply_markup=keyboard, parse_mode=ParseMode.HTML)
@@ -243,8 +432,7 @@ async def send_welcome(message: Message, command: CommandObject, state: FSMConte
     )
 
     command_args: str = command.args or ""
-    users_db = Database.get().users
-    user_data_db = users_db.find_one({"tg_id": tg_id})
+    user_data_db = await _find_user_doc_cached(tg_id)
     user = User(user_data_db) if user_data_db else None
     if user and not user.is_registration_complete():
         user = None
@@ -262,23 +450,7 @@ async def send_welcome(message: Message, command: CommandObject, state: FSMConte
 
     if user:
         profile_text = get_display_profile_text(user.raw)
-        profile_keyboard = InlineKeyboardMarkup(
-            inline_keyboard=[
-                [
-                    InlineKeyboardButton(
-                        text=REREGISTER_BUTTON_TEXT_PROFILE,
-                        callback_data="initiate_reregistration_flow",
-                    )
-                ],
-                [
-                    InlineKeyboardButton(
-                        text="👍 Все хорошо, ничего не менять",
-                        callback_data="profile_confirmed_show_help",
-                    )
-                ],
-            ]
-        )
-        await message.reply(profile_text, reply_markup=profile_keyboard, parse_mode=ParseMode.HTML)
+        await message.reply(profile_text, reply_markup=_PROFILE_KB, parse_mode=ParseMode.HTML)
         logger.info(f"User {tg_id} viewed existing profile.")
     else:
         logger.info(f"User {tg_id} is not registered. Starting registration flow.")
@@ -294,54 +466,40 @@ async def cb_initiate_reregistration_flow(callback: CallbackQuery, state: FSMCon
 @router.message(Registration.name)
 async def process_name(message: Message, state: FSMContext):
     if message.text and message.text.startswith("/"):
-        await message.delete()
-        user_data = await state.get_data()
+        user_data = await _get_data_and_delete(message, state)
         main_message_id = user_data.get("main_message_id")
         if main_message_id:
             error_text = (
                 "⚠️ Сначала завершите регистрацию, затем используйте команды.\n\n"
                 + REG_MESSAGES_NEW["name"]
             )
-            keyboard = create_registration_keyboard(Registration.name.state)
-            try:
-                await bot.edit_message_text(
-                    error_text,
-                    chat_id=message.chat.id,
-                    message_id=main_message_id,
-                    reply_markup=keyboard,
-                    parse_mode=ParseMode.HTML,
-                )
-            except TelegramBadRequest:
-                logger.warning("Failed to edit message in process_name.")
+            keyboard = _NAME_KB
+            await _render_step(message.chat.id, main_message_id, error_text, keyboard)
         return
 
-    await message.delete()
-    user_data = await state.get_data()
+    user_data = await _get_data_and_delete(message, state)
     main_message_id = user_data.get("main_message_id")
     if not main_message_id:
         logger.error("main_message_id missing during name processing.")
         await start_new_registration_flow(message, state, existing_data=user_data)
         return
 
-    await state.update_data(name=message.text.strip())
-    updated_data = await state.get_data()
+    updated_data = await state.update_data(name=message.text.strip())
     prompt_text = REG_MESSAGES_NEW["direction"]
-    keyboard = build_direction_keyboard()
-    await bot.edit_message_text(
+    await _render_step(
+        message.chat.id,
+        main_message_id,
         get_display_profile_text(updated_data, prompt_text),
-        chat_id=message.chat.id,
-        message_id=main_message_id,
-        reply_markup=keyboard,
-        parse_mode=ParseMode.HTML,
+        build_direction_keyboard(),
+        state,
+        Registration.direction,
     )
-    await state.set_state(Registration.direction)
 
 
 @router.message(Registration.direction)
 async def process_direction(message: Message, state: FSMContext):
     if message.text and message.text.startswith("/"):
-        await message.delete()
-        user_data = await state.get_data()
+        user_data = await _get_data_and_delete(message, state)
         main_message_id = user_data.get("main_message_id")
         if main_message_id:
             error_text = (
@@ -349,20 +507,10 @@ async def process_direction(message: Message, state: FSMContext):
                 + REG_MESSAGES_NEW["direction"]
             )
             keyboard = build_direction_keyboard()
-            try:
-                await bot.edit_message_text(
-                    error_text,
-                    chat_id=message.chat.id,
-                    message_id=main_message_id,
-                    reply_markup=keyboard,
-                    parse_mode=ParseMode.HTML,
-                )
-            except TelegramBadRequest:
-                logger.warning("Failed to edit message in process_direction for slash command.")
+            await _render_step(message.chat.id, main_message_id, error_text, keyboard)
         return
 
-    await message.delete()
-    user_data = await state.get_data()
+    user_data = await _get_data_and_delete(message, state)
     main_message_id = user_data.get("main_message_id")
     if not main_message_id:
         return
@@ -387,7 +535,18 @@ async def process_direction(message: Message, state: FSMContext):
     )
 
 
-@router.callback_query(F.data.startswith("direction_select"), Registration.direction)
+# Кнопки направлений фиксированы: готовое соответствие callback_data →
+# направление вместо split + int + индексации списка на каждый тап.
+_DIRECTION_BY_CB = {
+    f"direction_select:{index}": option
+    for index, option in enumerate(DIRECTION_OPTIONS)
+}
+# Точные значения callback_data известны заранее: фильтр по frozenset —
+# одна проверка хеша вместо startswith на каждом входящем колбэке.
+_ALL_DIRECTION_CBS = frozenset(_DIRECTION_BY_CB)
+
+
+@router.callback_query(F.data.in_(_ALL_DIRECTION_CBS), Registration.direction)
 async def cb_direction_select(callback: CallbackQuery, state: FSMContext):
     user_data = await state.get_data()
     main_message_id = user_data.get("main_message_id")
@@ -395,11 +554,8 @@ async def cb_direction_select(callback: CallbackQuery, state: FSMContext):
         await callback.answer("Сообщение не найдено, начните регистрацию заново.", show_alert=True)
         return
 
-    try:
-        _, index_str = callback.data.split(":", 1)
-        index = int(index_str)
-        direction = DIRECTION_OPTIONS[index]
-    except (ValueError, IndexError):
+    direction = _DIRECTION_BY_CB.get(callback.data)
+    if direction is None:
         await callback.answer("Не удалось определить направление.", show_alert=True)
         return
 
@@ -412,8 +568,19 @@ async def cb_direction_select(callback: CallbackQuery, state: FSMContext):
     await callback.answer(f"Выбрано направление: {direction}")
 
 
-def extract_course_number(text: str, valid_options: Iterable[int]) -> str | None:
-    match = re.search(r"\d{1,2}", text)
+# Паттерны и наборы допустимых курсов фиксированы — компилируем и
+# замораживаем один раз, а не на каждое сообщение шага.
+_COURSE_RE = re.compile(r"\d{1,2}")
+_YEAR_RE = re.compile(r"20\d{2}")
+_BACHELOR_COURSES = frozenset((1, 2, 3, 4))
+_MASTER_COURSES = frozenset((1, 2))
+
+
+def extract_course_number(text: str, valid_options: frozenset[int]) -> str | None:
+    # Типичный ввод — просто цифра; ей регулярное выражение не нужно.
+    if text.isdecimal():
+        return text if len(text) <= 2 and int(text) in valid_options else None
+    match = _COURSE_RE.search(text)
     if not match:
         return None
     value = match.group()
@@ -423,7 +590,10 @@ def extract_course_number(text: str, valid_options: Iterable[int]) -> str | None
 
 
 def extract_graduation_year(text: str) -> str | None:
-    match = re.search(r"(20\d{2})", text)
+    # Типичный ввод — сам год четырьмя цифрами.
+    if len(text) == 4 and text.isdecimal():
+        return text if text.startswith("20") else None
+    match = _YEAR_RE.search(text)
     if not match:
         return None
     year = int(match.group())
@@ -446,17 +616,14 @@ async def cb_edit_from_confirm(callback: CallbackQuery, state: FSMContext):
         return
 
     prompt_text = course_prompt_for_track(track)
-    options = course_options_for_track(track)
-    extra_rows = build_option_rows(options, "graduation_select") if options else None
-    keyboard = create_registration_keyboard(Registration.graduation.state, extra_rows=extra_rows)
-    await bot.edit_message_text(
+    await _render_step(
+        callback.message.chat.id,
+        main_message_id,
         get_display_profile_text(user_data, prompt_text),
-        chat_id=callback.message.chat.id,
-        message_id=main_message_id,
-        reply_markup=keyboard,
-        parse_mode=ParseMode.HTML,
+        _grad_keyboard(track),
+        state,
+        Registration.graduation,
     )
-    await state.set_state(Registration.graduation)
     await callback.answer("Измените информацию о курсе или годе окончания.")
 
 
@@ -475,27 +642,29 @@ async def cb_confirm_registration_final(callback: CallbackQuery, state: FSMConte
     user.tg_id = callback.from_user.id
     user.raw["username"] = callback.from_user.username or ""
 
-    existing_doc = Database.get().users.find_one({"tg_id": user.tg_id}) or {}
-    merged_payload = dict(existing_doc)
-    merged_payload.update(user.raw)
+    existing_doc = await _find_user_doc_cached(user.tg_id) or {}
+    # Одно слияние вместо пары copy+update; настройки термометра копируем,
+    # только если их действительно нужно дополнить — документ может быть
+    # разделён с записью в _USER_CACHE, мутировать его нельзя.
+    merged_payload = {**existing_doc, **user.raw}
 
-    timestamp = datetime.now(timezone.utc).isoformat()
+    timestamp = _now_iso()
     if not merged_payload.get("registration_completed_at"):
         merged_payload["registration_completed_at"] = timestamp
 
     thermometer_settings = merged_payload.get("thermometer")
-    if isinstance(thermometer_settings, dict):
-        thermometer_settings = dict(thermometer_settings)
-    else:
-        thermometer_settings = {}
-    if not thermometer_settings.get("last_sent_at"):
-        thermometer_settings["last_sent_at"] = timestamp
-    merged_payload["thermometer"] = thermometer_settings
+    if not isinstance(thermometer_settings, dict):
+        merged_payload["thermometer"] = {"last_sent_at": timestamp}
+    elif not thermometer_settings.get("last_sent_at"):
+        merged_payload["thermometer"] = {**thermometer_settings, "last_sent_at": timestamp}
 
     user.raw = merged_payload
 
     logger.info(f"User {user.tg_id} confirmed registration. Data: {user.raw}")
-    user.save_to_db()
+    # Блокирующая запись уходит в worker-поток: event loop не стоит на
+    # время round-trip до базы, как и чтения через _find_user_doc_cached.
+    await asyncio.to_thread(user.save_to_db)
+    _invalidate_user_cache(user.tg_id)
 
     await callback.answer("Ваши данные сохранены!", show_alert=True)
 
@@ -556,8 +725,7 @@ async def cb_profile_confirmed_show_help(callback: CallbackQuery, state: FSMCont
 @router.message(Registration.graduation)
 async def process_graduation(message: Message, state: FSMContext):
     if message.text and message.text.startswith("/"):
-        await message.delete()
-        user_data = await state.get_data()
+        user_data = await _get_data_and_delete(message, state)
         main_message_id = user_data.get("main_message_id")
         track = user_data.get("direction_track", "")
         if main_message_id:
@@ -565,23 +733,15 @@ async def process_graduation(message: Message, state: FSMContext):
                 "⚠️ Сначала завершите регистрацию, затем используйте команды.\n\n"
                 + course_prompt_for_track(track or "bachelor")
             )
-            options = course_options_for_track(track or "")
-            extra_rows = build_option_rows(options, "graduation_select") if options else None
-            keyboard = create_registration_keyboard(Registration.graduation.state, extra_rows=extra_rows)
-            try:
-                await bot.edit_message_text(
-                    get_display_profile_text(user_data, prompt_text),
-                    chat_id=message.chat.id,
-                    message_id=main_message_id,
-                    reply_markup=keyboard,
-                    parse_mode=ParseMode.HTML,
-                )
-            except TelegramBadRequest:
-                logger.warning("Failed to edit message in process_graduation for slash command.")
+            await _render_step(
+                message.chat.id,
+                main_message_id,
+                get_display_profile_text(user_data, prompt_text),
+                _grad_keyboard(track or ""),
+            )
         return
 
-    await message.delete()
-    user_data = await state.get_data()
+    user_data = await _get_data_and_delete(message, state)
     main_message_id = user_data.get("main_message_id")
     if main_message_id is None:
         return
@@ -597,32 +757,49 @@ async def process_graduation(message: Message, state: FSMContext):
     if track == "postgraduate":
         stored_value = extract_graduation_year(raw_value)
     elif track == "bachelor":
-        stored_value = extract_course_number(raw_value, range(1, 5))
+        stored_value = extract_course_number(raw_value, _BACHELOR_COURSES)
     elif track == "master":
-        stored_value = extract_course_number(raw_value, range(1, 3))
+        stored_value = extract_course_number(raw_value, _MASTER_COURSES)
 
     if not stored_value:
         prompt_text = (
             "⚠️ Не удалось распознать значение. Попробуйте снова.\n\n"
             + course_prompt_for_track(track)
         )
-        options = course_options_for_track(track)
-        extra_rows = build_option_rows(options, "graduation_select") if options else None
-        keyboard = create_registration_keyboard(Registration.graduation.state, extra_rows=extra_rows)
-        await bot.edit_message_text(
+        await _render_step(
+            message.chat.id,
+            main_message_id,
             get_display_profile_text(user_data, prompt_text),
-            chat_id=message.chat.id,
-            message_id=main_message_id,
-            reply_markup=keyboard,
-            parse_mode=ParseMode.HTML,
+            _grad_keyboard(track),
         )
         return
 
-    await state.update_data(magistracy_graduation_year=stored_value)
-    await show_confirmation(message.chat.id, main_message_id, state)
+    updated_data = await state.update_data(magistracy_graduation_year=stored_value)
+    await show_confirmation(message.chat.id, main_message_id, state, updated_data)
+
+
+# Аналогично для курсов: по треку и callback_data сразу достаются выбранная
+# опция и её каноническое значение — extract_course_number по константным
+# опциям вычислен один раз при импорте, а не заново в каждом колбэке.
+_GRAD_COURSES_BY_TRACK = {"bachelor": _BACHELOR_COURSES, "master": _MASTER_COURSES}
+_GRAD_OPTION_BY_CB = {
+    track: {
+        f"graduation_select:{index}": (
+            option,
+            extract_course_number(
+                option, _GRAD_COURSES_BY_TRACK.get(track, frozenset())
+            ),
+        )
+        for index, option in enumerate(options)
+    }
+    for track, options in _OPTIONS_BY_TRACK.items()
+}
+_ALL_GRAD_CBS = frozenset(
+    cb for table in _GRAD_OPTION_BY_CB.values() for cb in table
+)
 
 
-@router.callback_query(F.data.startswith("graduation_select"), Registration.graduation)
+@router.callback_query(F.data.in_(_ALL_GRAD_CBS), Registration.graduation)
 async def cb_graduation_select(callback: CallbackQuery, state: FSMContext):
     user_data = await state.get_data()
     main_message_id = user_data.get("main_message_id")
@@ -635,27 +812,18 @@ async def cb_graduation_select(callback: CallbackQuery, state: FSMContext):
         await callback.answer("Направление не найдено, начните заново.", show_alert=True)
         return
 
-    options = course_options_for_track(track)
-    try:
-        _, index_str = callback.data.split(":", 1)
-        index = int(index_str)
-        selected = options[index]
-    except (ValueError, IndexError):
+    entry = _GRAD_OPTION_BY_CB.get(track, {}).get(callback.data)
+    if entry is None:
         await callback.answer("Не удалось распознать выбор.", show_alert=True)
         return
 
-    if track == "bachelor":
-        stored_value = extract_course_number(selected, range(1, 5))
-    elif track == "master":
-        stored_value = extract_course_number(selected, range(1, 3))
-    else:
-        stored_value = None
+    selected, stored_value = entry
     if stored_value is None:
         await callback.answer("Неверный выбор, попробуйте снова.", show_alert=True)
         return
 
-    await state.update_data(magistracy_graduation_year=stored_value)
-    await show_confirmation(callback.message.chat.id, main_message_id, state)
+    updated_data = await state.update_data(magistracy_graduation_year=stored_value)
+    await show_confirmation(callback.message.chat.id, main_message_id, state, updated_data)
     await callback.answer(f"Выбран {selected}")
 
 
@@ -680,7 +848,7 @@ async def cb_previous_step(callback: CallbackQuery, state: FSMContext):
         user_data.pop("direction_track", None)
         prompt_text = REG_MESSAGES_NEW["name"]
         new_state = Registration.name
-        keyboard = create_registration_keyboard(Registration.name.state)
+        keyboard = _NAME_KB
     elif current_state == Registration.graduation.state:
         user_data.pop("direction", None)
         user_data.pop("direction_track", None)
@@ -695,22 +863,19 @@ async def cb_previous_step(callback: CallbackQuery, state: FSMContext):
             await callback.answer("Не удалось определить предыдущий шаг.", show_alert=True)
             return
         prompt_text = course_prompt_for_track(track)
-        options = course_options_for_track(track)
-        extra_rows = build_option_rows(options, "graduation_select") if options else None
-        keyboard = create_registration_keyboard(Registration.graduation.state, extra_rows=extra_rows)
+        keyboard = _grad_keyboard(track)
         new_state = Registration.graduation
     else:
         await callback.answer("Невозможно вернуться назад с этого шага.", show_alert=True)
         return
 
     await state.set_data(user_data)
-    await bot.edit_message_text(
+    await _render_step(
+        chat_id,
+        main_message_id,
         get_display_profile_text(user_data, prompt_text),
-        chat_id=chat_id,
-        message_id=main_message_id,
-        reply_markup=keyboard,
-        parse_mode=ParseMode.HTML,
+        keyboard,
+        state,
+        new_state,
     )
-    if new_state:
-        await state.set_state(new_state)
     await callback.answer()
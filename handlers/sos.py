@@ -1,7 +1,5 @@
 from __future__ import annotations
 
-from html import escape
-
 from aiogram import F, Router
 from aiogram.enums import ParseMode
 from aiogram.exceptions import TelegramBadRequest
@@ -20,16 +18,31 @@ from loguru import logger
 from bot_instance import bot
 from config import POMAGATOR_CHAT_ID, POMAGATOR_THREAD_ID
 from states.sos import Sos
+from utils.dedup import RecentActions
 from utils.telegram_text import (
     TELEGRAM_TEXT_LIMIT,
+    escape_html,
     fits_telegram_text,
     shorten_text_for_html_preview,
     split_text_for_html,
 )
 
 router = Router()
+
+# Повторный клик «Отправить помогаторам» после окна троттлинга продублировал
+# бы доставку; недавние отправки помечаем по (пользователь, сообщение).
+_send_requests = RecentActions()
 PREVIEW_SUFFIX = "\n\n[Показан фрагмент. Полный текст будет отправлен помогаторам целиком.]"
 
+# Адресат задаётся конфигом и не меняется в рантайме — признак и общие
+# параметры отправки вычисляем один раз на импорте.
+_POMAGATOR_ENABLED = bool(POMAGATOR_CHAT_ID)
+_POMAGATOR_SEND_KWARGS = {
+    "chat_id": POMAGATOR_CHAT_ID,
+    "message_thread_id": POMAGATOR_THREAD_ID,
+    "parse_mode": ParseMode.HTML,
+}
+
 
 def _append_text(existing_text: str | None, new_text: str) -> str:
     if not existing_text:
@@ -54,35 +67,42 @@ def _sos_keyboard(text_ready: bool) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
 
+# Обрамление вокруг текста пользователя статично — собираем оба варианта
+# один раз на импорте, в рантайме остаётся подставить сам текст и статус.
+_SOS_EMPTY_TEXT = "\n".join(
+    [
+        "🆘 <b>Напишите помогаторам</b>",
+        "",
+        "Опишите, что случилось, отдельным сообщением ниже.",
+    ]
+)
+_SOS_FILLED_TEMPLATE = "\n".join(
+    [
+        "🆘 <b>Напишите помогаторам</b>",
+        "",
+        "{text}",
+        "",
+        "Нажмите кнопку ниже, чтобы передать сообщение помогаторам.",
+    ]
+)
+
+
 def _sos_display_text(data: dict, status: str | None = None) -> str:
-    lines: list[str] = ["🆘 <b>Напишите помогаторам</b>"]
     text = data.get("sos_text")
     if text:
         text = shorten_text_for_html_preview(text, 2500, PREVIEW_SUFFIX)
-        lines.extend(
-            [
-                "",
-                escape(text),
-                "",
-                "Нажмите кнопку ниже, чтобы передать сообщение помогаторам.",
-            ]
-        )
+        rendered = _SOS_FILLED_TEMPLATE.format(text=escape_html(text))
     else:
-        lines.extend(
-            [
-                "",
-                "Опишите, что случилось, отдельным сообщением ниже.",
-            ]
-        )
+        rendered = _SOS_EMPTY_TEXT
     if status:
-        lines.extend(["", status])
-    return "\n".join(lines)
+        return f"{rendered}\n\n{status}"
+    return rendered
 
 
 def _format_sos_message(sos_text: str, author: AiogramUser | None) -> str:
-    escaped_text = escape(sos_text)
+    escaped_text = escape_html(sos_text)
     if author:
-        display_name = escape(author.full_name or "")
+        display_name = escape_html(author.full_name or "")
         tg_id = author.id
         username = author.username or ""
         mention = f'<a href="tg://user?id={tg_id}">{display_name}</a>' if display_name else ""
@@ -90,7 +110,7 @@ def _format_sos_message(sos_text: str, author: AiogramUser | None) -> str:
             mention = f'<a href="tg://user?id={tg_id}">Пользователь</a>'
         author_line = mention
         if username:
-            author_line += f" (@{escape(username)})"
+            author_line += f" (@{escape_html(username)})"
         header = f"🆘 <b>Запрос помощи</b>\n👤 {author_line}"
     else:
         header = "🆘 <b>Запрос помощи</b>\n👤 Неизвестный пользователь"
@@ -99,11 +119,11 @@ def _format_sos_message(sos_text: str, author: AiogramUser | None) -> str:
 
 
 async def _deliver_sos(sos_text: str, author: AiogramUser | None) -> bool:
-    if not POMAGATOR_CHAT_ID:
+    if not _POMAGATOR_ENABLED:
         logger.warning("POMAGATOR_CHAT_ID is not configured; SOS message was not delivered.")
         return False
     if author:
-        display_name = escape(author.full_name or "")
+        display_name = escape_html(author.full_name or "")
         tg_id = author.id
         username = author.username or ""
         mention = f'<a href="tg://user?id={tg_id}">{display_name}</a>' if display_name else ""
@@ -111,7 +131,7 @@ async def _deliver_sos(sos_text: str, author: AiogramUser | None) -> bool:
             mention = f'<a href="tg://user?id={tg_id}">Пользователь</a>'
         author_line = mention
         if username:
-            author_line += f" (@{escape(username)})"
+            author_line += f" (@{escape_html(username)})"
         header = f"🆘 <b>Запрос помощи</b>\n👤 {author_line}\n\n📝 "
         continuation_template = f"🆘 <b>Запрос помощи</b> (часть {{index}})\n👤 {author_line}\n\n📝 "
     else:
@@ -124,10 +144,8 @@ async def _deliver_sos(sos_text: str, author: AiogramUser | None) -> bool:
         for index, chunk in enumerate(chunks, start=1):
             chunk_header = header if index == 1 else continuation_template.format(index=index)
             await bot.send_message(
-                chat_id=POMAGATOR_CHAT_ID,
-                text=f"{chunk_header}{escape(chunk)}",
-                message_thread_id=POMAGATOR_THREAD_ID,
-                parse_mode=ParseMode.HTML,
+                text=f"{chunk_header}{escape_html(chunk)}",
+                **_POMAGATOR_SEND_KWARGS,
             )
         return True
     except Exception as exc:
@@ -157,13 +175,14 @@ async def sos_collect_text(message: Message, state: FSMContext):
         await message.answer("Сообщение пустое. Пожалуйста, опишите ситуацию.")
         return
 
+    # Один get_data на обработку: снимок меняем локально и пишем обратно
+    # целиком — вдвое меньше обращений к FSM-хранилищу на каждое сообщение.
     data = await state.get_data()
     main_message_id = data.get("main_message_id")
-    combined_text = _append_text(data.get("sos_text"), text)
-    await state.update_data(sos_text=combined_text)
-    updated = await state.get_data()
+    data["sos_text"] = _append_text(data.get("sos_text"), text)
+    await state.set_data(data)
 
-    display_text = _sos_display_text(updated)
+    display_text = _sos_display_text(data)
     if not fits_telegram_text(display_text):
         await message.answer(
             "Текст слишком длинный даже для предпросмотра в боте. Сократите его или разбейте на несколько сообщений."
@@ -214,7 +233,15 @@ async def cb_sos_send(callback: CallbackQuery, state: FSMContext):
         await state.clear()
         return
 
+    dedup_key = (callback.from_user.id, callback.message.message_id)
+    if not _send_requests.start(dedup_key):
+        await callback.answer("Сообщение уже отправлено.")
+        return
+
     delivered = await _deliver_sos(sos_text, callback.from_user)
+    if not delivered:
+        # Неудачную доставку забываем, чтобы повторный клик стал ретраем.
+        _send_requests.forget(dedup_key)
     status = (
         "✅ Сообщение отправлено помогаторам."
         if delivered
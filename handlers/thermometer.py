@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import asyncio
+from functools import lru_cache
+
 from aiogram import F, Router
 from aiogram.exceptions import TelegramBadRequest
 from aiogram.filters import Command
@@ -7,6 +10,12 @@ from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMar
 from loguru import logger
 
 from db.database import Database
+from handlers.events.common import (
+    forget_render,
+    remember_render,
+    render_digest,
+    render_is_duplicate,
+)
 from services.thermometer import (
     DEFAULT_THERMOMETER_SETTINGS,
     THERMOMETER_HELP_CALLBACK,
@@ -16,22 +25,38 @@ from services.thermometer import (
     TIME_CHOICES,
     WEEKDAY_CHOICES,
     build_pomagator_payload,
+    compute_next_send_at,
     forward_to_pomagators,
     merge_thermometer_settings,
+    notify_schedule_changed,
 )
+from utils.dedup import RecentActions
 
 router = Router()
 
+# Повторный клик «Хочу поговорить» после окна троттлинга снова дёргал бы
+# пересылку помогаторам; недавние доставки помечаем по (пользователь,
+# сообщение) и дубликатам отвечаем только toast'ом.
+_help_requests = RecentActions()
+
 CB_PREFIX_TOGGLE = "thermo:toggle"
 CB_PREFIX_DAY = "thermo:day:"
 CB_PREFIX_TIME = "thermo:time:"
 
 
+# Справочник названий дней — словарь вместо линейного прохода по
+# WEEKDAY_CHOICES на каждый рендер.
+_WEEKDAY_TITLE = {weekday: title for weekday, title, _ in WEEKDAY_CHOICES}
+
+# Обратные таблицы callback-данных: значения в кнопках генерируются из тех
+# же наборов, поэтому разбор клика — один поиск в словаре вместо int() с
+# try/except и склейки строки времени.
+_DAY_BY_CB = {str(weekday): weekday for weekday, _, _ in WEEKDAY_CHOICES}
+_TIME_BY_CB = {time_option.replace(":", ""): time_option for time_option in TIME_CHOICES}
+
+
 def _weekday_title(value: int) -> str:
-    for weekday, title, _ in WEEKDAY_CHOICES:
-        if weekday == value:
-            return title
-    return "Не задано"
+    return _WEEKDAY_TITLE.get(value, "Не задано")
 
 
 def _load_settings(user_id: int) -> dict:
@@ -40,24 +65,58 @@ def _load_settings(user_id: int) -> dict:
     raw_settings = doc.get("thermometer")
     settings = merge_thermometer_settings(raw_settings)
     if raw_settings is None:
-        users.update_one(
-            {"tg_id": user_id},
-            {"$set": {"tg_id": user_id, "thermometer": settings}},
-            upsert=True,
-        )
+        _store_settings(user_id, settings)
     return settings
 
 
 def _store_settings(user_id: int, settings: dict) -> None:
+    # Любая правка расписания пересчитывает денормализованную метку
+    # следующей отправки — по ней планировщик выбирает должников в SQL.
+    settings["next_send_at"] = compute_next_send_at(settings)
     Database.get().users.update_one(
         {"tg_id": user_id},
         {"$set": {"tg_id": user_id, "thermometer": settings}},
         upsert=True,
     )
+    # Планировщик может спать до чужой метки — будим его пересчитать срок.
+    notify_schedule_changed()
 
 
-def _build_settings_keyboard(settings: dict) -> InlineKeyboardMarkup:
-    enabled = bool(settings.get("enabled", DEFAULT_THERMOMETER_SETTINGS["enabled"]))
+def _patch_settings_sync(user_id: int, patch: dict, toggle_enabled: bool) -> dict:
+    users = Database.get().users
+    raw = users.patch_thermometer(user_id, patch, toggle_enabled=toggle_enabled)
+    settings = merge_thermometer_settings(raw)
+    settings["next_send_at"] = compute_next_send_at(settings)
+    # Метку дописываем таким же точечным патчем: перезапись всего объекта
+    # затёрла бы параллельную запись планировщика (last_sent_at).
+    users.patch_thermometer(user_id, {"next_send_at": settings["next_send_at"]})
+    return settings
+
+
+async def _apply_settings_patch(
+    user_id: int, patch: dict, *, toggle_enabled: bool = False
+) -> dict:
+    """Атомарно применяет правку настроек и возвращает итоговый вид.
+
+    Один патч с RETURNING вместо пары find_one + update_one: нет гонки
+    потерянного обновления, а блокирующая работа с базой уходит в
+    worker-поток вместо event loop'а.
+    """
+    settings = await asyncio.to_thread(
+        _patch_settings_sync, user_id, patch, toggle_enabled
+    )
+    notify_schedule_changed()
+    return settings
+
+
+# Различных клавиатур всего 7 дней × 4 времени × 2 статуса — готовые
+# разметки живут в кэше, повторный клик по настройкам их не пересобирает.
+# Markup после создания не мутируется, отдавать один объект повторно
+# безопасно.
+@lru_cache(maxsize=64)
+def _build_settings_keyboard_cached(
+    enabled: bool, selected_weekday: int, selected_time: str
+) -> InlineKeyboardMarkup:
     toggle_prefix = "🔔" if enabled else "🔕"
     toggle_text = "Отключить термометр" if enabled else "Включить термометр"
     rows: list[list[InlineKeyboardButton]] = [
@@ -66,8 +125,7 @@ def _build_settings_keyboard(settings: dict) -> InlineKeyboardMarkup:
 
     day_row: list[InlineKeyboardButton] = []
     for weekday, _, short in WEEKDAY_CHOICES:
-        is_selected = weekday == settings.get("weekday", DEFAULT_THERMOMETER_SETTINGS["weekday"])
-        prefix = "✅" if is_selected else "⬜️"
+        prefix = "✅" if weekday == selected_weekday else "⬜️"
         day_row.append(
             InlineKeyboardButton(
                 text=f"{prefix} {short}",
@@ -82,8 +140,7 @@ def _build_settings_keyboard(settings: dict) -> InlineKeyboardMarkup:
 
     time_row: list[InlineKeyboardButton] = []
     for time_option in TIME_CHOICES:
-        is_selected = time_option == settings.get("time", DEFAULT_THERMOMETER_SETTINGS["time"])
-        prefix = "✅" if is_selected else "⬜️"
+        prefix = "✅" if time_option == selected_time else "⬜️"
         time_row.append(
             InlineKeyboardButton(
                 text=f"{prefix} {time_option}",
@@ -99,11 +156,20 @@ def _build_settings_keyboard(settings: dict) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=rows)
 
 
-def _render_settings_text(settings: dict) -> str:
-    enabled = bool(settings.get("enabled", DEFAULT_THERMOMETER_SETTINGS["enabled"]))
+def _build_settings_keyboard(settings: dict) -> InlineKeyboardMarkup:
+    return _build_settings_keyboard_cached(
+        bool(settings.get("enabled", DEFAULT_THERMOMETER_SETTINGS["enabled"])),
+        settings.get("weekday", DEFAULT_THERMOMETER_SETTINGS["weekday"]),
+        settings.get("time", DEFAULT_THERMOMETER_SETTINGS["time"]),
+    )
+
+
+# Текст настроек — чистая функция тех же трёх скаляров, что и клавиатура;
+# кэш того же размера избавляет от пересборки строк на каждый клик.
+@lru_cache(maxsize=64)
+def _render_settings_text_cached(enabled: bool, weekday: int, time_display: str) -> str:
     status_text = "включен" if enabled else "выключен"
-    weekday_title = _weekday_title(settings.get("weekday", DEFAULT_THERMOMETER_SETTINGS["weekday"]))
-    time_display = settings.get("time", DEFAULT_THERMOMETER_SETTINGS["time"])
+    weekday_title = _weekday_title(weekday)
 
     lines = [
         "🌡 <b>Термометр</b>",
@@ -123,6 +189,14 @@ def _render_settings_text(settings: dict) -> str:
     return "\n".join(lines)
 
 
+def _render_settings_text(settings: dict) -> str:
+    return _render_settings_text_cached(
+        bool(settings.get("enabled", DEFAULT_THERMOMETER_SETTINGS["enabled"])),
+        settings.get("weekday", DEFAULT_THERMOMETER_SETTINGS["weekday"]),
+        settings.get("time", DEFAULT_THERMOMETER_SETTINGS["time"]),
+    )
+
+
 async def _append_result_note(message: Message, suffix: str) -> None:
     base_text = message.html_text or message.text or ""
     if not base_text:
@@ -132,6 +206,12 @@ async def _append_result_note(message: Message, suffix: str) -> None:
         new_text = base_text
     else:
         new_text = f"{base_text}{suffix}"
+    # Повторный клик по той же кнопке дал бы edit с тем же текстом и
+    # ответ "message is not modified" — такой вызов не отправляем вовсе.
+    key = (message.chat.id, message.message_id)
+    digest = render_digest(new_text, None)
+    if render_is_duplicate(key, digest):
+        return
     try:
         await message.edit_text(new_text, reply_markup=None)
     except TelegramBadRequest as exc:
@@ -140,21 +220,33 @@ async def _append_result_note(message: Message, suffix: str) -> None:
             await message.edit_reply_markup(reply_markup=None)
         except TelegramBadRequest:
             pass
+    else:
+        remember_render(key, digest)
 
 
 async def _refresh_settings_message(message: Message, settings: dict) -> None:
     keyboard = _build_settings_keyboard(settings)
     text = _render_settings_text(settings)
+    key = (message.chat.id, message.message_id)
+    digest = render_digest(text, keyboard)
+    if render_is_duplicate(key, digest):
+        return
     try:
         await message.edit_text(text, reply_markup=keyboard)
     except TelegramBadRequest as exc:
+        if "message is not modified" in str(exc):
+            remember_render(key, digest)
+            return
         logger.warning("Thermometer: failed to edit settings message: {}", exc)
+        forget_render(key)
         await message.answer(text, reply_markup=keyboard)
+    else:
+        remember_render(key, digest)
 
 
 @router.message(Command("thermometer"))
 async def cmd_thermometer(message: Message) -> None:
-    settings = _load_settings(message.from_user.id)
+    settings = await asyncio.to_thread(_load_settings, message.from_user.id)
     keyboard = _build_settings_keyboard(settings)
     await message.answer(
         _render_settings_text(settings),
@@ -164,50 +256,29 @@ async def cmd_thermometer(message: Message) -> None:
 
 @router.callback_query(F.data == CB_PREFIX_TOGGLE)
 async def cb_toggle(callback: CallbackQuery) -> None:
-    settings = _load_settings(callback.from_user.id)
-    settings["enabled"] = not settings.get("enabled", DEFAULT_THERMOMETER_SETTINGS["enabled"])
-    _store_settings(callback.from_user.id, settings)
+    settings = await _apply_settings_patch(callback.from_user.id, {}, toggle_enabled=True)
     await _refresh_settings_message(callback.message, settings)
     await callback.answer("Настройки обновлены.")
 
 
 @router.callback_query(F.data.startswith(CB_PREFIX_DAY))
 async def cb_select_day(callback: CallbackQuery) -> None:
-    try:
-        weekday = int(callback.data.replace(CB_PREFIX_DAY, "", 1))
-    except ValueError:
-        await callback.answer("Не удалось обновить день.", show_alert=True)
-        return
-    if weekday < 0 or weekday > 6:
+    weekday = _DAY_BY_CB.get(callback.data.replace(CB_PREFIX_DAY, "", 1))
+    if weekday is None:
         await callback.answer("Неизвестный день недели.", show_alert=True)
         return
-    settings = _load_settings(callback.from_user.id)
-    if settings.get("weekday") == weekday:
-        await callback.answer(f"{_weekday_title(weekday)} уже выбран.")
-        return
-    settings["weekday"] = weekday
-    _store_settings(callback.from_user.id, settings)
+    settings = await _apply_settings_patch(callback.from_user.id, {"weekday": weekday})
     await _refresh_settings_message(callback.message, settings)
     await callback.answer(f"Термометр перенесён на {_weekday_title(weekday)}.")
 
 
 @router.callback_query(F.data.startswith(CB_PREFIX_TIME))
 async def cb_select_time(callback: CallbackQuery) -> None:
-    raw_value = callback.data.replace(CB_PREFIX_TIME, "", 1)
-    if len(raw_value) not in (3, 4):
-        await callback.answer("Не удалось обновить время.", show_alert=True)
-        return
-    padded = raw_value.zfill(4)
-    value = f"{padded[:2]}:{padded[2:]}"
-    if value not in TIME_CHOICES:
+    value = _TIME_BY_CB.get(callback.data.replace(CB_PREFIX_TIME, "", 1))
+    if value is None:
         await callback.answer("Это время недоступно.", show_alert=True)
         return
-    settings = _load_settings(callback.from_user.id)
-    if settings.get("time") == value:
-        await callback.answer("Это время уже выбрано.")
-        return
-    settings["time"] = value
-    _store_settings(callback.from_user.id, settings)
+    settings = await _apply_settings_patch(callback.from_user.id, {"time": value})
     await _refresh_settings_message(callback.message, settings)
     await callback.answer(f"Время напоминания: {value}.")
 
@@ -220,6 +291,10 @@ async def cb_thermo_ok(callback: CallbackQuery) -> None:
 
 @router.callback_query(F.data == THERMOMETER_HELP_CALLBACK)
 async def cb_thermo_help(callback: CallbackQuery) -> None:
+    key = (callback.from_user.id, callback.message.message_id)
+    if not _help_requests.start(key):
+        await callback.answer("Запрос уже отправлен.")
+        return
     payload = build_pomagator_payload(
         callback.from_user.id,
         callback.from_user.full_name,
@@ -233,6 +308,8 @@ async def cb_thermo_help(callback: CallbackQuery) -> None:
         )
         await callback.answer("Запрос отправлен.")
     else:
+        # Неудачную доставку забываем, чтобы повторный клик стал ретраем.
+        _help_requests.forget(key)
         await callback.message.answer(
             "Не удалось передать запрос помогаторам. Попробуйте ещё раз позже."
         )
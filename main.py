@@ -7,6 +7,8 @@ from loguru import logger
 from bot_instance import bot, dp
 from handlers import get_routers
 from handlers.notifications import start_notification_service
+from middleware.chat_queue import ChatQueueMiddleware
+from middleware.throttle import ThrottleMiddleware
 from middleware.user_meta import UserMetaMiddleware
 from services.thermometer import start_thermometer_service
 
@@ -21,18 +23,26 @@ async def main():
     logger.info("Бот запускается...")
     # Подключаем middleware для обновления username и команд
     dp.message.middleware(UserMetaMiddleware(bot))
+    # Повторные одинаковые колбэки гасим до очереди и обработчиков
+    dp.callback_query.middleware(ThrottleMiddleware())
+    # Колбэки одного чата обрабатываем по порядку, разные чаты — параллельно
+    dp.callback_query.middleware(ChatQueueMiddleware())
     for router in get_routers():
         dp.include_router(router)
-    background_tasks = [
-        asyncio.create_task(start_notification_service()),
-        asyncio.create_task(start_thermometer_service()),
-    ]
-    try:
-        await dp.start_polling(bot)
-    finally:
-        for task in background_tasks:
-            task.cancel()
-        await asyncio.gather(*background_tasks, return_exceptions=True)
+    # TaskGroup связывает polling и фоновые сервисы: падение сервиса
+    # отменяет polling (и наоборот), вместо молчаливо живущей половины
+    # бота после сбоя. Штатное завершение polling гасит сервисы явно —
+    # сами по себе они крутятся бесконечно.
+    async with asyncio.TaskGroup() as tg:
+        services = [
+            tg.create_task(start_notification_service()),
+            tg.create_task(start_thermometer_service()),
+        ]
+        try:
+            await dp.start_polling(bot)
+        finally:
+            for task in services:
+                task.cancel()
     logger.info("Бот завершил работу.")
 
 
@@ -0,0 +1,45 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+
+class ChatQueueMiddleware(BaseMiddleware):
+    """Middleware, упорядочивающий обработку событий в рамках одного чата.
+
+    aiogram обрабатывает обновления конкурентно, поэтому быстрые клики в
+    одном чате могут обгонять друг друга (и редактировать одно сообщение в
+    произвольном порядке). Блокировка на chat_id сохраняет порядок внутри
+    чата, а события из разных чатов обрабатываются параллельно — медленный
+    edit_message_text в одном чате не тормозит остальных.
+    """
+
+    def __init__(self) -> None:
+        self._locks: Dict[int, asyncio.Lock] = {}
+        self._pending: Dict[int, int] = {}
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        chat = data.get("event_chat")
+        if chat is None:
+            return await handler(event, data)
+
+        chat_id = chat.id
+        lock = self._locks.setdefault(chat_id, asyncio.Lock())
+        self._pending[chat_id] = self._pending.get(chat_id, 0) + 1
+        try:
+            async with lock:
+                return await handler(event, data)
+        finally:
+            remaining = self._pending[chat_id] - 1
+            if remaining:
+                self._pending[chat_id] = remaining
+            else:
+                # Никто не ждёт — убираем блокировку, чтобы словарь не рос.
+                del self._pending[chat_id]
+                del self._locks[chat_id]
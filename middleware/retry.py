@@ -0,0 +1,41 @@
+import asyncio
+from random import uniform
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import TelegramMethod
+from aiogram.methods.base import Response, TelegramType
+from loguru import logger
+
+_MAX_RETRIES = 3
+
+
+class RetryRequestMiddleware(BaseRequestMiddleware):
+    """Session-middleware, повторяющее запросы после 429 от Telegram.
+
+    При флуд-лимите Telegram присылает retry_after; без повтора такой
+    edit/send просто теряется. Middleware ждёт указанную паузу (с небольшим
+    джиттером, чтобы повторы из разных чатов не пришли одной пачкой) и
+    пробует ещё раз — обработчикам не нужен свой try/sleep/retry.
+    """
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        for _ in range(_MAX_RETRIES):
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as exc:
+                delay = exc.retry_after * uniform(1.0, 1.2)
+                logger.warning(
+                    f"Flood limit на {method.__class__.__name__}, повтор через {delay:.1f}с"
+                )
+                await asyncio.sleep(delay)
+        return await make_request(bot, method)
@@ -0,0 +1,47 @@
+from time import monotonic
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery, TelegramObject
+
+_WINDOW = 0.4
+_MAX_ENTRIES = 10_000
+
+
+class ThrottleMiddleware(BaseMiddleware):
+    """Middleware, гасящее серию одинаковых колбэков от одного пользователя.
+
+    Быстрое «дробление» по кнопке порождает несколько идентичных
+    обновлений, каждое из которых прошло бы полный путь: разбор, чтение
+    базы, edit в Telegram. Повторный колбэк с тем же callback_data в
+    пределах короткого окна получает пустой answer (чтобы убрать «часики»
+    на кнопке) и не доходит до обработчика.
+    """
+
+    def __init__(self, window: float = _WINDOW) -> None:
+        self._window = window
+        self._last_seen: Dict[Tuple[int, str], float] = {}
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        user = data.get("event_from_user")
+        if user is None or not isinstance(event, CallbackQuery):
+            return await handler(event, data)
+
+        key = (user.id, event.data or "")
+        now = monotonic()
+        last = self._last_seen.get(key)
+        if last is not None and now - last < self._window:
+            await event.answer()
+            return None
+
+        if len(self._last_seen) >= _MAX_ENTRIES:
+            cutoff = now - self._window
+            for stale in [k for k, ts in self._last_seen.items() if ts < cutoff]:
+                del self._last_seen[stale]
+        self._last_seen[key] = now
+        return await handler(event, data)
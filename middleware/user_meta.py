@@ -1,21 +1,33 @@
+import asyncio
 from typing import Any, Awaitable, Callable, Dict
 
 from aiogram import BaseMiddleware, Bot
 from aiogram.types import TelegramObject, User as AiogramUser
+from loguru import logger
 
 from db import Database
 from utils.misc import update_commands_for_user
 
+_FLUSH_INTERVAL = 2.0
+_MAX_PENDING = 10_000
+
 
 class UserMetaMiddleware(BaseMiddleware):
     """Middleware для обновления метаданных пользователя на каждом событии.
 
     - Обновляет/создаёт пользователя в БД: tg_id и username
     - Обновляет список команд для пользователя
+
+    Запись в базу не делается на каждом событии: пары (tg_id, username)
+    накапливаются в словаре (последняя запись побеждает), и фоновая
+    задача раз в пару секунд сбрасывает их одним пакетным upsert'ом в
+    worker-потоке. Обработка события не ждёт базу вовсе.
     """
 
     def __init__(self, bot: Bot):
         self.bot = bot
+        self._pending: Dict[int, str] = {}
+        self._flusher: asyncio.Task | None = None
 
     async def __call__(
         self,
@@ -27,16 +39,12 @@ class UserMetaMiddleware(BaseMiddleware):
 
         if tg_user is not None:
             try:
-                # Обновляем/создаём пользователя в БД
-                db = Database.get()
-                users = db.users
-                username_value = tg_user.username or ""
-
-                users.update_one(
-                    {"tg_id": tg_user.id},
-                    {"$set": {"tg_id": tg_user.id, "username": username_value}},
-                    upsert=True,
-                )
+                # При переполнении буфера событие просто пропускает запись:
+                # username догонит база на одном из следующих событий.
+                if len(self._pending) < _MAX_PENDING or tg_user.id in self._pending:
+                    self._pending[tg_user.id] = tg_user.username or ""
+                if self._flusher is None or self._flusher.done():
+                    self._flusher = asyncio.create_task(self._flush_later())
 
                 # Обновляем доступные команды для пользователя
                 await update_commands_for_user(tg_user.id)
@@ -45,3 +53,14 @@ class UserMetaMiddleware(BaseMiddleware):
                 pass
 
         return await handler(event, data)
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(_FLUSH_INTERVAL)
+        batch = list(self._pending.items())
+        self._pending.clear()
+        if not batch:
+            return
+        try:
+            await asyncio.to_thread(Database.get().users.upsert_user_meta_many, batch)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("UserMetaMiddleware: failed to flush user meta: {}", exc)
@@ -12,7 +12,10 @@ from bot_instance import bot
 from config import POMAGATOR_CHAT_ID, POMAGATOR_THREAD_ID
 from aiogram.enums import ParseMode
 from db.database import Database
-from db.user import User
+from utils.rate_limit import TokenBucket
+
+_SEND_CONCURRENCY = 25
+_SEND_RATE_PER_SEC = 30.0
 
 THERMOMETER_MESSAGE_BASE = (
     "Привет! Это еженедельная проверка твоего самочувствия. Как твои дела? "
@@ -29,6 +32,10 @@ DEFAULT_THERMOMETER_SETTINGS: Dict[str, Any] = {
     "weekday": 6,  # Sunday by default
     "time": "12:00",
     "last_sent_at": None,
+    # Денормализованный момент следующей отправки: по нему планировщик
+    # отбирает должников одним индексированным запросом вместо скана всех
+    # пользователей каждую минуту.
+    "next_send_at": None,
 }
 
 WEEKDAY_CHOICES: Tuple[Tuple[int, str, str], ...] = (
@@ -44,11 +51,12 @@ WEEKDAY_CHOICES: Tuple[Tuple[int, str, str], ...] = (
 TIME_CHOICES: Tuple[str, ...] = ("10:00", "12:00", "15:00", "18:00")
 
 
-def _safe_zone() -> tzinfo:
-    try:
-        return ZoneInfo("Europe/Moscow")
-    except Exception:  # noqa: BLE001
-        return timezone(timedelta(hours=3))
+# Зона фиксирована на весь процесс — создаём её один раз на импорте; без
+# tzdata откатываемся на фиксированный офсет UTC+3.
+try:
+    _TZ: tzinfo = ZoneInfo("Europe/Moscow")
+except Exception:  # noqa: BLE001
+    _TZ = timezone(timedelta(hours=3))
 
 
 def merge_thermometer_settings(raw: Dict[str, Any] | None) -> Dict[str, Any]:
@@ -69,6 +77,8 @@ def merge_thermometer_settings(raw: Dict[str, Any] | None) -> Dict[str, Any]:
         settings["time"] = raw["time"]
     if "last_sent_at" in raw:
         settings["last_sent_at"] = raw["last_sent_at"]
+    if "next_send_at" in raw:
+        settings["next_send_at"] = raw["next_send_at"]
     return settings
 
 
@@ -80,9 +90,16 @@ def _parse_time(value: str) -> dt_time:
         return dt_time.fromisoformat(default)
 
 
-def _parse_datetime(value: str | None, tz: tzinfo) -> datetime | None:
+def _parse_datetime(value: str | float | None, tz: tzinfo) -> datetime | None:
     if not value:
         return None
+    # Новые записи хранят last_sent_at числом (Unix epoch) — это дешевле
+    # разбора ISO-строки; легаси-документы со строками читаем по-старому.
+    if isinstance(value, (int, float)):
+        try:
+            return datetime.fromtimestamp(value, tz)
+        except (OverflowError, OSError, ValueError):
+            return None
     try:
         dt = datetime.fromisoformat(value)
     except ValueError:
@@ -107,6 +124,28 @@ def _current_schedule_datetime(
     return scheduled_dt
 
 
+def compute_next_send_at(
+    settings: Dict[str, Any],
+    now: datetime | None = None,
+    tz: tzinfo | None = None,
+) -> str:
+    """Момент, когда пользователь в следующий раз станет «должником».
+
+    Если текущий слот расписания уже обслужен, это следующая неделя; иначе
+    сам слот (возможно, в прошлом — тогда рассылка должна уйти сразу).
+    Все метки пишутся в одной таймзоне, поэтому ISO-строки сравнимы
+    лексикографически и в SQL, и здесь.
+    """
+    tz = tz or _TZ
+    if now is None:
+        now = datetime.now(tz)
+    scheduled_dt = _current_schedule_datetime(settings, now, tz)
+    last_sent_at = _parse_datetime(settings.get("last_sent_at"), tz)
+    if last_sent_at and last_sent_at >= scheduled_dt:
+        return (scheduled_dt + timedelta(days=7)).isoformat()
+    return scheduled_dt.isoformat()
+
+
 def _build_thermometer_keyboard() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(
         inline_keyboard=[
@@ -124,10 +163,29 @@ def _build_thermometer_keyboard() -> InlineKeyboardMarkup:
     )
 
 
+# Будильник планировщика: правка расписания из обработчиков поднимает
+# событие, и сервис пересчитывает срок сна, не дожидаясь его истечения.
+_schedule_changed = asyncio.Event()
+
+
+def notify_schedule_changed() -> None:
+    _schedule_changed.set()
+
+
+# Рамки сна между тиками: не чаще раза в секунду и не реже раза в час —
+# верхняя граница страхует от рассинхрона денормализованных меток.
+_MIN_SLEEP = 1.0
+_MAX_SLEEP = 3600.0
+_MISSING_STAMP_SLEEP = 60.0
+# Неудачная доставка (заблокировали бота и т.п.) откладывается на час, а
+# не до следующей недели: ошибка может быть и временной.
+_RETRY_DELAY = timedelta(hours=1)
+
+
 class ThermometerService:
     def __init__(self, db: Database | None = None):
         self.db = db or Database.get()
-        self.timezone = _safe_zone()
+        self.timezone = _TZ
 
     async def run(self) -> None:
         logger.info("Thermometer service: scheduler started.")
@@ -139,22 +197,62 @@ class ThermometerService:
                     logger.exception("Thermometer service: tick failed: {}", exc)
                     await asyncio.sleep(300)
                     continue
-                await asyncio.sleep(60)
+                # Вместо фиксированной минуты спим до ближайшей метки
+                # next_send_at; правка настроек будит сервис раньше срока.
+                # Сбрасываем событие до запроса: set() во время запроса
+                # должен пережить его и сразу прервать ожидание, иначе
+                # сервис проспит свежую метку на стаявшем сроке.
+                _schedule_changed.clear()
+                try:
+                    delay = await asyncio.to_thread(self._seconds_until_next_due)
+                except Exception as exc:  # noqa: BLE001
+                    logger.warning(
+                        "Thermometer service: wakeup query failed: {}", exc
+                    )
+                    delay = _MISSING_STAMP_SLEEP
+                try:
+                    await asyncio.wait_for(_schedule_changed.wait(), timeout=delay)
+                except TimeoutError:
+                    pass
         except asyncio.CancelledError:
             logger.info("Thermometer service: cancelled, stopping.")
             raise
 
+    def _seconds_until_next_due(self) -> float:
+        next_stamp, missing = self.db.users.next_thermometer_wakeup()
+        if missing:
+            # Пока есть документы без метки, держим прежний минутный шаг:
+            # тик их проставит, и сон снова станет длинным.
+            return _MISSING_STAMP_SLEEP
+        next_dt = _parse_datetime(next_stamp, self.timezone)
+        if next_dt is None:
+            return _MAX_SLEEP
+        delta = (next_dt - datetime.now(self.timezone)).total_seconds()
+        return min(max(delta, _MIN_SLEEP), _MAX_SLEEP)
+
     async def _tick(self) -> None:
         now = datetime.now(self.timezone)
-        users = self.db.users.find()
+        # Отбор должников делает SQL по частичному индексу next_send_at:
+        # сюда попадают только включённые пользователи, чей срок наступил,
+        # плюс документы без метки (легаси и свежие регистрации) — их
+        # проверяем по-старому и проставляем метку, чтобы они вышли из
+        # ежеминутной выборки. Блокирующее чтение уходит в worker-поток —
+        # event loop продолжает обслуживать чаты, пока база отдаёт строки.
+        users = await asyncio.to_thread(
+            self.db.users.find_thermometer_due, now.isoformat()
+        )
+
+        # Сначала чистая классификация: кому слать, кому лишь обновить
+        # метку. Отправки и записи в базу уходят пакетами после цикла.
+        due: list[tuple[int, Dict[str, Any], datetime]] = []
+        stamp_updates: list[tuple[int, Dict[str, Any]]] = []
         for doc in users:
             try:
                 user_id = doc.get("tg_id")
                 if not user_id:
                     continue
-                user = User(doc)
-                if not user.is_registration_complete():
-                    continue
+                # Полнота регистрации уже проверена предикатом в SQL —
+                # сюда приходят только завершённые профили.
                 settings = merge_thermometer_settings(doc.get("thermometer"))
                 if not settings.get("enabled", True):
                     continue
@@ -164,15 +262,17 @@ class ThermometerService:
                     settings.get("last_sent_at"), self.timezone
                 )
 
-                if last_sent_at and last_sent_at >= scheduled_dt:
-                    continue
-                if now < scheduled_dt:
+                if (last_sent_at and last_sent_at >= scheduled_dt) or now < scheduled_dt:
+                    # Не должник: актуализируем метку, если её нет или она
+                    # устарела, иначе документ будет попадать в выборку
+                    # каждую минуту.
+                    next_stamp = compute_next_send_at(settings, now, self.timezone)
+                    if settings.get("next_send_at") != next_stamp:
+                        settings["next_send_at"] = next_stamp
+                        stamp_updates.append((user_id, settings))
                     continue
 
-                delivered = await self._send_thermometer_message(user_id)
-                if delivered:
-                    settings["last_sent_at"] = now.isoformat()
-                    self._store_settings(user_id, settings)
+                due.append((user_id, settings, scheduled_dt))
             except Exception as exc:  # noqa: BLE001
                 logger.exception(
                     "Thermometer service: failed to process user {}: {}",
@@ -180,6 +280,42 @@ class ThermometerService:
                     exc,
                 )
 
+        if due:
+            # Отправки идут параллельно под семафором и токен-бакетом — те
+            # же рамки глобального лимита Telegram, что и в напоминаниях о
+            # событиях; 429 добирает session-middleware повторов.
+            semaphore = asyncio.Semaphore(_SEND_CONCURRENCY)
+            bucket = TokenBucket(_SEND_RATE_PER_SEC)
+
+            async def _send(tg_id: int) -> bool:
+                async with semaphore:
+                    await bucket.acquire()
+                    return await self._send_thermometer_message(tg_id)
+
+            results = await asyncio.gather(
+                *(_send(user_id) for user_id, _, _ in due), return_exceptions=True
+            )
+            now_ts = now.timestamp()
+            for (user_id, settings, scheduled_dt), delivered in zip(due, results):
+                if delivered is True:
+                    settings["last_sent_at"] = now_ts
+                    settings["next_send_at"] = (
+                        scheduled_dt + timedelta(days=7)
+                    ).isoformat()
+                else:
+                    # Метка двигается и при провале: оставить её в прошлом
+                    # значит будить сервис (и слать обречённый send_message
+                    # заблокировавшему бота пользователю) каждую секунду.
+                    settings["next_send_at"] = (now + _RETRY_DELAY).isoformat()
+                stamp_updates.append((user_id, settings))
+
+        if stamp_updates:
+            # Один пакетный UPDATE вместо пары find_one + save на каждого
+            # пользователя; блокирующая запись уходит в worker-поток.
+            await asyncio.to_thread(
+                self.db.users.set_thermometer_many, stamp_updates
+            )
+
     async def _send_thermometer_message(self, tg_id: int) -> bool:
         try:
             await bot.send_message(
@@ -207,33 +343,62 @@ async def start_thermometer_service() -> None:
     await service.run()
 
 
+# Отметка времени в уведомлении имеет минутную точность — в пределах
+# минуты форматируем её один раз, а не strftime'ом на каждый клик.
+_pomagator_ts_key: Tuple[int, int, int, int, int] | None = None
+_pomagator_ts_value = ""
+
+
+def _pomagator_timestamp(now: datetime) -> str:
+    global _pomagator_ts_key, _pomagator_ts_value
+    key = (now.year, now.month, now.day, now.hour, now.minute)
+    if key != _pomagator_ts_key:
+        _pomagator_ts_value = (
+            f"{now.day:02d}.{now.month:02d}.{now.year} {now.hour:02d}:{now.minute:02d}"
+        )
+        _pomagator_ts_key = key
+    return _pomagator_ts_value
+
+
+# Статичная часть уведомления помогаторам — один шаблон и один вызов
+# format_map вместо сборки из нескольких f-строк на каждый клик.
+_POMAGATOR_TEMPLATE = (
+    "🌡 <b>Запрос термометра</b>\n"
+    "👤 {mention}{username_part}\n"
+    "🕒 {timestamp}\n\n"
+    "Пользователь сообщил, что хочет поговорить."
+)
+
+
 def build_pomagator_payload(
     user_id: int, full_name: str | None, username: str | None
 ) -> str:
     display_name = full_name or "Пользователь"
-    mention = f'<a href="tg://user?id={user_id}">{display_name}</a>'
-    username_part = f" (@{username})" if username else ""
-    timestamp = datetime.now(_safe_zone()).strftime("%d.%m.%Y %H:%M")
-    return (
-        "🌡 <b>Запрос термометра</b>\n"
-        f"👤 {mention}{username_part}\n"
-        f"🕒 {timestamp}\n\n"
-        "Пользователь сообщил, что хочет поговорить."
+    return _POMAGATOR_TEMPLATE.format_map(
+        {
+            "mention": f'<a href="tg://user?id={user_id}">{display_name}</a>',
+            "username_part": f" (@{username})" if username else "",
+            "timestamp": _pomagator_timestamp(datetime.now(_TZ)),
+        }
     )
 
 
+# Адресат задаётся конфигом и не меняется в рантайме — признак и общие
+# параметры отправки вычисляем один раз на импорте.
+_POMAGATOR_ENABLED = bool(POMAGATOR_CHAT_ID)
+_POMAGATOR_SEND_KWARGS = {
+    "chat_id": POMAGATOR_CHAT_ID,
+    "message_thread_id": POMAGATOR_THREAD_ID,
+    "parse_mode": ParseMode.HTML,
+}
+
+
 async def forward_to_pomagators(payload: str) -> bool:
-    if not POMAGATOR_CHAT_ID:
+    if not _POMAGATOR_ENABLED:
         logger.warning("Thermometer service: POMAGATOR_CHAT_ID is not configured.")
         return False
-    send_kwargs = dict(
-        chat_id=POMAGATOR_CHAT_ID,
-        text=payload,
-        message_thread_id=POMAGATOR_THREAD_ID,
-        parse_mode=ParseMode.HTML,
-    )
     try:
-        await bot.send_message(**send_kwargs)
+        await bot.send_message(text=payload, **_POMAGATOR_SEND_KWARGS)
         return True
     except Exception as exc:  # noqa: BLE001
         logger.error("Thermometer service: failed to notify pomagators: {}", exc)
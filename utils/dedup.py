@@ -0,0 +1,39 @@
+"""Short-lived deduplication of repeated actions."""
+
+from __future__ import annotations
+
+from time import monotonic
+from typing import Dict, Hashable
+
+
+class RecentActions:
+    """Remembers keys for a TTL so repeated triggers can be absorbed.
+
+    Used by callback handlers that fire an external delivery: the throttle
+    middleware eats rapid duplicate clicks, and this registry absorbs the
+    slower ones (double taps past the throttle window, Telegram
+    redeliveries) that would repeat the delivery after the first one
+    already went out.
+    """
+
+    def __init__(self, ttl: float = 300.0, max_entries: int = 1024) -> None:
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._seen: Dict[Hashable, float] = {}
+
+    def start(self, key: Hashable) -> bool:
+        """Mark ``key``; return False if it was already marked within the TTL."""
+        now = monotonic()
+        seen_at = self._seen.get(key)
+        if seen_at is not None and now - seen_at < self._ttl:
+            return False
+        if len(self._seen) >= self._max_entries:
+            cutoff = now - self._ttl
+            for stale in [k for k, ts in self._seen.items() if ts < cutoff]:
+                del self._seen[stale]
+        self._seen[key] = now
+        return True
+
+    def forget(self, key: Hashable) -> None:
+        """Drop ``key``, e.g. after a failed delivery so a retry goes through."""
+        self._seen.pop(key, None)
@@ -12,17 +12,30 @@ def format_datetime(value: date) -> str:
     return value.strftime("%d.%m.%Y")
 
 
+# Наборы команд статичны в пределах процесса — собираем их один раз, а не
+# на каждый вызов.
+_USER_COMMANDS = (
+    BotCommand(command="sos", description="Напишите помогаторам"),
+    BotCommand(command="motherlode", description="Запросить помощь по учёбе"),
+    BotCommand(command="help", description="Что умеет бот"),
+    BotCommand(command="events", description="Посмотреть события"),
+    BotCommand(command="profile", description="Посмотреть профиль"),
+    BotCommand(command="thermometer", description="Настроить термометр"),
+    BotCommand(command="feedback", description="Отправить отзыв"),
+)
+_ADMIN_COMMANDS = _USER_COMMANDS + (
+    BotCommand(command="participants", description="Список участников"),
+)
+
+# Кому список уже отправлен: setMyCommands — сетевой вызов к Telegram, и
+# слать один и тот же набор на каждое событие незачем. После рестарта
+# каждый пользователь получит его заново один раз.
+_COMMANDS_SENT: set[int] = set()
+
+
 async def update_commands_for_user(user_id: int) -> None:
-    commands = [
-        BotCommand(command="sos", description="Напишите помогаторам"),
-        BotCommand(command="motherlode", description="Запросить помощь по учёбе"),
-        BotCommand(command="help", description="Что умеет бот"),
-        BotCommand(command="events", description="Посмотреть события"),
-        BotCommand(command="profile", description="Посмотреть профиль"),
-        BotCommand(command="thermometer", description="Настроить термометр"),
-        BotCommand(command="feedback", description="Отправить отзыв"),
-    ]
-    if user_id in ADMIN_IDS:
-        commands.append(BotCommand(command="participants", description="Список участников"))
-
-    await bot.set_my_commands(commands, scope=BotCommandScopeChat(chat_id=user_id))
+    if user_id in _COMMANDS_SENT:
+        return
+    commands = _ADMIN_COMMANDS if user_id in ADMIN_IDS else _USER_COMMANDS
+    await bot.set_my_commands(list(commands), scope=BotCommandScopeChat(chat_id=user_id))
+    _COMMANDS_SENT.add(user_id)
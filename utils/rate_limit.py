@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import asyncio
+from time import monotonic
+
+
+class TokenBucket:
+    """Paces coroutines to a global requests-per-second budget.
+
+    Used by the broadcast paths to stay under Telegram's bot-wide send
+    limit; a semaphore bounds how many requests are in flight, the bucket
+    bounds how fast they start. Refill is computed lazily from the
+    monotonic clock, so an idle bucket costs nothing.
+    """
+
+    def __init__(self, rate: float):
+        self._rate = rate
+        self._capacity = rate
+        self._tokens = rate
+        self._updated = monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = monotonic()
+                self._tokens = min(
+                    self._capacity, self._tokens + (now - self._updated) * self._rate
+                )
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self._tokens) / self._rate)
@@ -4,16 +4,19 @@ from typing import Optional
 
 from constants import BACHELOR_DIRECTIONS, MASTER_DIRECTIONS, POSTGRADUATE_DIRECTION
 
+# Direction lists are constants, so the direction -> track mapping is built
+# once at import; lookups below are a single hash probe instead of scanning
+# the lists on every call.
+_DIRECTION_TRACK: dict[str, str] = {
+    **{direction: "bachelor" for direction in BACHELOR_DIRECTIONS},
+    **{direction: "master" for direction in MASTER_DIRECTIONS},
+    POSTGRADUATE_DIRECTION: "postgraduate",
+}
+
 
 def get_direction_track(direction: Optional[str]) -> Optional[str]:
     if not direction:
         return None
-    normalized = direction.strip()
-    if normalized in BACHELOR_DIRECTIONS:
-        return "bachelor"
-    if normalized in MASTER_DIRECTIONS:
-        return "master"
-    if normalized == POSTGRADUATE_DIRECTION:
-        return "postgraduate"
-    return None
-
+    # Stored directions come back clean; only fall back to strip() when the
+    # raw string misses (e.g. free-form input with stray whitespace).
+    return _DIRECTION_TRACK.get(direction) or _DIRECTION_TRACK.get(direction.strip())